@@ -8,41 +8,80 @@ import time
 class ScreenProcessor:
     """
     Class for processing screen recordings.
+
+    Only the region of interest (ROI) is captured and processed, with a margin around it so the blur and edge
+    detection behave at the ROI's edges as they would on the full screen. The mask and the intermediate images
+    are allocated once and reused for every frame.
+
+    Attributes:
+        fields (list of str): The keys of the dictionary returned by process_frame, in order.
+        roi (tuple of int): The left, top, right and bottom screen coordinates of the ROI, edges included.
+        pad (int): The margin in pixels captured around the ROI.
+        display (bool): Whether to show the captured region with the sensor indicators.
     """
 
-    @staticmethod
-    def process_frame():
+    fields = ['left', 'right', 'midleft', 'midright']
+
+    def __init__(self, roi=(380, 500, 1640, 600), pad=8, display=True):
+        """
+        Initializes the ScreenProcessor and allocates its buffers.
+
+        Args:
+            roi (tuple of int): The left, top, right and bottom screen coordinates of the ROI, edges included.
+            pad (int): The margin in pixels captured around the ROI.
+            display (bool): Whether to show the captured region with the sensor indicators.
+        """
+        self.roi = roi
+        self.pad = pad
+        self.display = display
+
+        # Screen bounding box of the capture, and the offset that maps capture coordinates to the screen. The
+        # right and bottom edges of the ROI are inside it, as they were for the filled polygon, so the exclusive
+        # bounding box ends one pixel past them
+        left, top, right, bottom = roi
+        self.bbox = (left - pad, top - pad, right + 1 + pad, bottom + 1 + pad)
+        self.offset = np.array([left - pad, top - pad])
+        height, width = bottom + 1 - top + 2 * pad, right + 1 - left + 2 * pad
+
+        self._gray = np.empty((height, width), dtype=np.uint8)
+        self._blurred = np.empty((height, width), dtype=np.uint8)
+        self._edges = np.empty((height, width), dtype=np.uint8)
+        self._masked = np.empty((height, width), dtype=np.uint8)
+        self._display = np.empty((height, width, 3), dtype=np.uint8)
+
+        # Mask out the margin, keeping only edges inside the ROI
+        self._mask = np.zeros((height, width), dtype=np.uint8)
+        self._mask[pad:height - pad, pad:width - pad] = 255
+
+    def _to_display(self, point):
+        """
+        Maps a screen point to the captured image.
+        """
+        return int(point[0] - self.offset[0]), int(point[1] - self.offset[1])
+
+    def process_frame(self):
         """
-        Processes a single frame from the screen recording, detects edges, applies a region of interest (ROI),
+        Processes a single frame from the screen recording, detects edges within the region of interest (ROI),
         and identifies key points and lines. Visual indicators are drawn based on the detected features.
         
         Returns:
             dict: A dictionary containing the status of detected points (left, right, midleft, midright).
         """
-        # Capture the screen within the specified bounding box
-        frame = np.array(ImageGrab.grab(bbox=(0, 0, 1920, 1080)))
-        
-        # Convert the frame to RGB format
-        frame = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
+        # Capture the ROI and its margin only
+        frame = np.asarray(ImageGrab.grab(bbox=self.bbox))
         
-        # Convert the frame to grayscale
-        processed_frame = cv.cvtColor(frame, cv.COLOR_RGB2GRAY)
+        # Convert the RGB capture to grayscale in one step. BGR2GRAY keeps the channel weighting of the former
+        # BGR2RGB then RGB2GRAY conversion, which the edge thresholds were tuned with
+        cv.cvtColor(frame, cv.COLOR_BGR2GRAY, dst=self._gray)
         
         # Apply Gaussian blur to the grayscale frame
-        processed_frame = cv.GaussianBlur(processed_frame, (5, 5), 5)
-
-        # Define the region of interest (ROI) as a polygon
-        polygons = np.array([[(380, 600), (1640, 600), (1640, 500), (380, 500)]])
+        cv.GaussianBlur(self._gray, (5, 5), 5, dst=self._blurred)
 
         # Apply Canny edge detection to the blurred frame
-        processed_frame = cv.Canny(processed_frame, 100, 150)
-
-        # Create a mask for the ROI
-        mask = np.zeros_like(processed_frame)
-        cv.fillPoly(mask, [polygons], 255)
+        cv.Canny(self._blurred, 100, 150, edges=self._edges)
 
-        # Apply the mask to the edge-detected frame
-        masked_frame = cv.bitwise_and(processed_frame, mask)
+        # Apply the ROI mask to the edge-detected frame
+        masked_frame = cv.bitwise_and(self._edges, self._mask, dst=self._masked)
 
         # Detect lines using Hough transform
         lines = cv.HoughLinesP(masked_frame, 2, np.pi / 180, 100, np.array([]), minLineLength=125, maxLineGap=10)
@@ -52,27 +91,24 @@ class ScreenProcessor:
 
         all_points = []
 
-        # Collect mean points from contours
+        # Collect mean points from contours, in screen coordinates
         if contours is not None:
             for contour in contours:
-                contour = np.mean(contour, axis=1)
+                contour = np.mean(contour, axis=1) + self.offset
                 all_points.extend(contour)
 
-        # Collect points and vectorized lines from the detected lines
+        # Collect points in screen coordinates and vectorized lines from the detected lines
         if lines is not None:
             for line in lines:
                 x1, y1, x2, y2 = line.reshape(4)
-                all_points.extend([(x1, y1), (x2, y2), (x2 - x1, y2 - y1)])
+                all_points.extend([(x1, y1) + self.offset, (x2, y2) + self.offset, (x2 - x1, y2 - y1)])
 
-        all_points = np.array(all_points)
+        all_points = np.array(all_points, dtype=np.float64).reshape(-1, 2)
 
         try:
             # Filter points for the right and left sections
-            right_points = [point for point in all_points if 1400 > point[0] > 1020]
-            right_points = np.asarray(right_points)
-
-            left_points = [point for point in all_points if 520 < point[0] < 900]
-            left_points = np.asarray(left_points)
+            right_points = all_points[(all_points[:, 0] < 1400) & (all_points[:, 0] > 1020)]
+            left_points = all_points[(all_points[:, 0] > 520) & (all_points[:, 0] < 900)]
 
             # Calculate percentiles for right points
             if len(right_points) > 2:
@@ -86,10 +122,6 @@ class ScreenProcessor:
             else:
                 lq4 = (370, 500)
 
-            # Colors for visual indicators
-            on_color = (0, 0, 255)
-            off_color = (255, 255, 255)
-
             # Initialize data dictionary
             data = {
                 "left": 0,
@@ -98,53 +130,46 @@ class ScreenProcessor:
                 'midright': 0,
             }
 
-            # Process and draw left point indicator
+            # Sensor points, in screen coordinates
             left_point = (380, 540)
-            if left_point[0] > lq4[0]:
-                color = off_color
-            else:
-                data['left'] = 1
-                color = on_color
-            cv.circle(frame, left_point, 10, color, -1)
-            cv.line(frame, (960, 820), left_point, color, 2)
-
-            # Process and draw mid-left point indicator
             midleft_point = (700, 540)
-            if midleft_point[0] > lq4[0]:
-                color = off_color
-            else:
-                data['midleft'] = 1
-                color = on_color
-            cv.circle(frame, midleft_point, 10, color, -1)
-            cv.line(frame, (960, 820), midleft_point, color, 2)
-
-            # Process and draw right point indicator
             right_point = (1640, 540)
-            if right_point[0] < rq1[0]:
-                color = off_color
-            else:
-                data['right'] = 1
-                color = on_color
-            cv.circle(frame, right_point, 10, color, -1)
-            cv.line(frame, (960, 820), right_point, color, 2)
-
-            # Process and draw mid-right point indicator
             midright_point = (1220, 540)
-            if midright_point[0] < rq1[0]:
-                color = off_color
-            else:
-                data['midright'] = 1
-                color = on_color
-            cv.circle(frame, midright_point, 10, color, -1)
-            cv.line(frame, (960, 820), midright_point, color, 2)
 
-            # Draw a circle at the center
-            cv.circle(frame, (960, 820), 10, color, -1)
+            if left_point[0] <= lq4[0]:
+                data['left'] = 1
+            if midleft_point[0] <= lq4[0]:
+                data['midleft'] = 1
+            if right_point[0] >= rq1[0]:
+                data['right'] = 1
+            if midright_point[0] >= rq1[0]:
+                data['midright'] = 1
 
-            # Display the frame with visual indicators
-            cv.imshow('Computer Vision', cv.resize(frame, (1280, 720)))
-            cv.waitKey(33)
+            if self.display:
+                self._draw(frame, data, {'left': left_point, 'midleft': midleft_point, 'right': right_point,
+                                         'midright': midright_point})
 
             return data
         except Exception as e:
             print(e)
+
+    def _draw(self, frame, data, points):
+        """
+        Shows the captured region with a circle for each sensor, filled red when on, and a line to it from the
+        bottom centre of the screen.
+        """
+        # Colors for visual indicators
+        on_color = (0, 0, 255)
+        off_color = (255, 255, 255)
+
+        display = cv.cvtColor(frame, cv.COLOR_RGB2BGR, dst=self._display)
+        centre = self._to_display((960, 820))  # Below the captured region, so lines run off its bottom edge
+        for name, point in points.items():
+            color = on_color if data[name] else off_color
+            point = self._to_display(point)
+            cv.circle(display, point, 10, color, -1)
+            cv.line(display, centre, point, color, 2)
+
+        # Display the frame with visual indicators, without capping the capture rate
+        cv.imshow('Computer Vision', display)
+        cv.waitKey(1)
@@ -0,0 +1,91 @@
+import time
+from collections import deque
+
+
+class StreamAligner:
+    """
+    Joins telemetry frames with the screen result captured closest to them in time.
+
+    Screen results are read from a SharedFrameChannel and kept in a short history, so a telemetry frame can be
+    paired with a result captured just before it even if a newer one has since been published. When the newest
+    result was captured before the telemetry frame, the aligner waits briefly for the next one, since it may be
+    closer. Telemetry frames with no screen result inside the tolerance are dropped rather than joined with stale
+    flags.
+
+    Attributes:
+        channel (SharedFrameChannel): The channel screen results are read from.
+        tolerance (float): The largest capture time difference, in seconds, that still counts as aligned.
+        max_wait (float): The longest time, in seconds, to wait for a newer screen result.
+        history (deque): The most recent screen results, as (sequence, timestamp, data) tuples, oldest first.
+        aligned (int): The number of telemetry frames joined with a screen result.
+        dropped (int): The number of telemetry frames dropped for lack of an aligned screen result.
+    """
+
+    def __init__(self, channel, tolerance=0.05, max_wait=0.05, history=8):
+        """
+        Initializes the StreamAligner.
+
+        Args:
+            channel (SharedFrameChannel): The channel screen results are read from.
+            tolerance (float): The largest capture time difference, in seconds, that still counts as aligned.
+            max_wait (float): The longest time, in seconds, to wait for a newer screen result.
+            history (int): The number of screen results kept.
+        """
+        self.channel = channel
+        self.tolerance = tolerance
+        self.max_wait = max_wait
+        self.history = deque(maxlen=history)
+        self.aligned = 0
+        self.dropped = 0
+
+    def poll(self):
+        """
+        Adds the latest screen result to the history if it has not been seen yet.
+
+        Returns:
+            bool: True if a new screen result was added.
+        """
+        sequence, timestamp, data = self.channel.read_dict()
+        if not sequence or (self.history and self.history[-1][0] == sequence):
+            return False
+        self.history.append((sequence, timestamp, data))
+        return True
+
+    def nearest(self, timestamp):
+        """
+        Finds the screen result captured closest to a timestamp.
+
+        Args:
+            timestamp (float): The capture time to match, from time.perf_counter.
+
+        Returns:
+            tuple or None: The (sequence, timestamp, data) of the closest screen result, or None if there is none.
+        """
+        return min(self.history, key=lambda sample: abs(sample[1] - timestamp), default=None)
+
+    def align(self, timestamp):
+        """
+        Finds the screen result that goes with a telemetry frame.
+
+        Args:
+            timestamp (float): The capture time of the telemetry frame, from time.perf_counter.
+
+        Returns:
+            tuple or None: The screen data and its capture time offset from the telemetry frame in seconds, or
+                           None if no screen result was captured within the tolerance.
+        """
+        self.poll()
+        # A result captured after the frame may still be in flight, so give it a chance to arrive
+        deadline = time.perf_counter() + self.max_wait
+        while not self.history or self.history[-1][1] < timestamp:
+            if not self.channel.wait(self.history[-1][0] if self.history else 0, deadline - time.perf_counter()):
+                break
+            self.poll()
+
+        sample = self.nearest(timestamp)
+        if sample is None or abs(sample[1] - timestamp) > self.tolerance:
+            self.dropped += 1
+            return None
+
+        self.aligned += 1
+        return sample[2], sample[1] - timestamp
@@ -0,0 +1,270 @@
+import json
+import os
+import numpy as np
+from data_processing import DataProcessor
+from replay import TelemetryReplayer
+
+# Per-frame header columns, stored ahead of the telemetry columns
+FRAME_COLUMNS = {
+    'session_uid': np.dtype('<u8'),
+    'frame_identifier': np.dtype('<u4'),
+    'session_time': np.dtype('<f4'),
+}
+
+# Columns archived by default: everything DataProcessor consumes plus the lap number used for indexing
+ARCHIVE_COLS = {packet_type: list(keys) for packet_type, keys in DataProcessor.cols.items()}
+ARCHIVE_COLS['lap_data'] = ARCHIVE_COLS['lap_data'] + ['current_lap_num']
+
+
+class TelemetryArchiveWriter:
+    """
+    Writes decoded frames column-wise to an archive directory, one fixed-width binary file per column plus a
+    meta.json describing the columns and indexing the rows by session, lap and frame_identifier.
+
+    Attributes:
+        path (str): The archive directory.
+        cols (dict): The fields archived from each packet type.
+        columns (dict): The dtype and per-row shape of every column, by name.
+        rows (int): The number of rows in the archive.
+        chunk_size (int): The number of rows buffered in memory before they are appended to the column files.
+    """
+
+    def __init__(self, path, cols=None, chunk_size=4096):
+        """
+        Opens an archive for appending, creating it if it does not exist. Rows flushed to the column files after
+        meta.json was last written, by a writer that was never closed, are cut off first, so new rows line up
+        with the row count and index in meta.json.
+
+        Args:
+            path (str): The archive directory.
+            cols (dict, optional): The fields archived from each packet type. Defaults to ARCHIVE_COLS.
+                                   current_lap_num is always added, as the index is built from it. Ignored
+                                   when appending to an existing archive.
+            chunk_size (int): The number of rows buffered before they are written out.
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as file:
+                meta = json.load(file)
+            self.cols = meta['cols']
+            self.rows = meta['rows']
+        else:
+            self.cols = {packet_type: list(keys) for packet_type, keys in (cols or ARCHIVE_COLS).items()}
+            self.rows = 0
+            # close indexes the rows by lap, so the lap number is archived whatever cols asks for
+            if 'current_lap_num' not in self.cols.setdefault('lap_data', []):
+                self.cols['lap_data'].append('current_lap_num')
+
+        self.columns = dict((name, (dtype, ())) for name, dtype in FRAME_COLUMNS.items())
+        for packet_type, keys in self.cols.items():
+            packet_class = next(packet_class for frame_key, packet_class in DataProcessor.packet_types.values()
+                                if frame_key == packet_type)
+            for key in keys:
+                field_dtype = packet_class.LAYOUT.dtype[key]
+                self.columns[key] = (field_dtype.base, field_dtype.shape)
+
+        for name, (dtype, shape) in self.columns.items():
+            column_path = os.path.join(path, f"{name}.bin")
+            size = self.rows * dtype.itemsize * int(np.prod(shape, dtype=int))
+            if os.path.exists(column_path) and os.path.getsize(column_path) > size:
+                os.truncate(column_path, size)
+
+        # Preallocated chunk buffers, one per column
+        self.buffers = {name: np.zeros((chunk_size,) + shape, dtype=dtype)
+                        for name, (dtype, shape) in self.columns.items()}
+        self.buffered = 0
+
+    def append(self, frame):
+        """
+        Appends one frame.
+
+        Args:
+            frame (dict): A complete frame from DataProcessor.collect_frames, decoded with at least self.cols.
+        """
+        row = self.buffered
+        for name in FRAME_COLUMNS:
+            self.buffers[name][row] = frame[name]
+        for packet_type, keys in self.cols.items():
+            packet_data = frame[packet_type]
+            for key in keys:
+                self.buffers[key][row] = packet_data[key]
+
+        self.buffered += 1
+        if self.buffered == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Appends the buffered rows to the column files.
+        """
+        if not self.buffered:
+            return
+        for name, buffer in self.buffers.items():
+            with open(os.path.join(self.path, f"{name}.bin"), 'ab') as file:
+                buffer[:self.buffered].tofile(file)
+        self.rows += self.buffered
+        self.buffered = 0
+
+    def close(self):
+        """
+        Writes out the buffered rows and rebuilds the index in meta.json.
+        """
+        self.flush()
+        columns = {name: {'dtype': dtype.str, 'shape': list(shape)} for name, (dtype, shape) in self.columns.items()}
+        meta = {'rows': self.rows, 'cols': self.cols, 'columns': columns, 'sessions': {}}
+
+        if self.rows:
+            archive = TelemetryArchive(self.path, meta)
+            meta['sessions'] = build_index(archive.column('session_uid'), archive.column('current_lap_num'))
+
+        with open(os.path.join(self.path, 'meta.json'), 'w') as file:
+            json.dump(meta, file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def build_index(session_uids, lap_nums):
+    """
+    Indexes archive rows by session and lap.
+
+    Args:
+        session_uids (np.ndarray): The session_uid column.
+        lap_nums (np.ndarray): The current_lap_num column.
+
+    Returns:
+        dict: Maps each session_uid, as a string, to its [start, stop) rows and the [start, stop) rows of each
+              lap within it, from the first to the last row of that lap.
+    """
+    sessions = {}
+    boundaries = np.flatnonzero(np.diff(session_uids)) + 1
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [len(session_uids)]))
+
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        session = sessions.setdefault(str(int(session_uids[start])), {'rows': [start, stop], 'laps': {}})
+        session['rows'] = [min(session['rows'][0], start), max(session['rows'][1], stop)]
+
+        laps = lap_nums[start:stop]
+        for lap in np.unique(laps).tolist():
+            positions = np.flatnonzero(laps == lap)
+            lap_rows = [start + int(positions[0]), start + int(positions[-1]) + 1]
+            if str(lap) in session['laps']:
+                previous = session['laps'][str(lap)]
+                lap_rows = [min(previous[0], lap_rows[0]), max(previous[1], lap_rows[1])]
+            session['laps'][str(lap)] = lap_rows
+    return sessions
+
+
+class TelemetryArchive:
+    """
+    Reads an archive written by TelemetryArchiveWriter. Columns are opened with np.memmap, so only the columns
+    and rows that are actually touched are read from disk.
+
+    Attributes:
+        path (str): The archive directory.
+        rows (int): The number of rows in the archive.
+        columns (dict): The dtype and per-row shape of every column, by name.
+        sessions (dict): The row index by session_uid and lap, as built by build_index.
+    """
+
+    def __init__(self, path, meta=None):
+        """
+        Opens an archive.
+
+        Args:
+            path (str): The archive directory.
+            meta (dict, optional): The archive metadata. Defaults to reading meta.json.
+        """
+        self.path = path
+        if meta is None:
+            with open(os.path.join(path, 'meta.json')) as file:
+                meta = json.load(file)
+        self.rows = meta['rows']
+        self.columns = {name: (np.dtype(column['dtype']), tuple(column['shape']))
+                        for name, column in meta['columns'].items()}
+        self.sessions = meta['sessions']
+        self._memmaps = {}
+
+    def column(self, name):
+        """
+        Memory-maps one column.
+
+        Args:
+            name (str): The column name.
+
+        Returns:
+            np.memmap: A read-only (rows,) + shape array backed by the column file.
+        """
+        if name not in self._memmaps:
+            dtype, shape = self.columns[name]
+            self._memmaps[name] = np.memmap(os.path.join(self.path, f"{name}.bin"), dtype=dtype, mode='r',
+                                            shape=(self.rows,) + shape)
+        return self._memmaps[name]
+
+    def select(self, session_uid=None, lap=None, frames=None):
+        """
+        Finds the rows of a session, lap or frame_identifier window.
+
+        Args:
+            session_uid (int, optional): Restrict to this session. Required when lap or frames is given.
+            lap (int, optional): Restrict to this lap number.
+            frames (tuple, optional): Restrict to frame_identifier values in [first, last). Assumes
+                                      frame_identifier increases within the selected rows.
+
+        Returns:
+            slice: The selected rows.
+        """
+        if session_uid is None:
+            return slice(0, self.rows)
+
+        session = self.sessions[str(session_uid)]
+        start, stop = session['laps'][str(lap)] if lap is not None else session['rows']
+
+        if frames is not None:
+            frame_ids = self.column('frame_identifier')[start:stop]
+            first, last = np.searchsorted(frame_ids, frames)
+            start, stop = start + int(first), start + int(last)
+        return slice(start, stop)
+
+    def read(self, columns, session_uid=None, lap=None, frames=None):
+        """
+        Reads selected columns over a session, lap or frame_identifier window.
+
+        Args:
+            columns (iterable of str): The columns to read.
+            session_uid (int, optional): Restrict to this session.
+            lap (int, optional): Restrict to this lap number.
+            frames (tuple, optional): Restrict to frame_identifier values in [first, last).
+
+        Returns:
+            dict: Memory-mapped views of the selected rows, by column name.
+        """
+        rows = self.select(session_uid, lap, frames)
+        return {name: self.column(name)[rows] for name in columns}
+
+
+def archive_recording(recording_path, archive_path, cols=None):
+    """
+    Decodes a TelemetryRecorder recording into an archive.
+
+    Args:
+        recording_path (str): The recording to decode.
+        archive_path (str): The archive directory to append to.
+        cols (dict, optional): The fields archived from each packet type. Defaults to ARCHIVE_COLS.
+
+    Returns:
+        int: The number of rows in the archive.
+    """
+    with TelemetryArchiveWriter(archive_path, cols) as writer:
+        data_processor = DataProcessor(cols=writer.cols)
+        for frame in data_processor.collect_frames(TelemetryReplayer(recording_path).replay(None)):
+            writer.append(frame)
+    return writer.rows
@@ -0,0 +1,159 @@
+import asyncio
+import struct
+from data_processing import DataProcessor, FrameAssembler
+
+
+class TelemetryProtocol(asyncio.DatagramProtocol):
+    """
+    An asyncio datagram protocol that hands every received datagram to an AsyncDataProcessor.
+    """
+
+    def __init__(self, collector):
+        """
+        Initializes the TelemetryProtocol.
+
+        Args:
+            collector (AsyncDataProcessor): The collector processing the datagrams.
+        """
+        self.collector = collector
+
+    def datagram_received(self, data, addr):
+        """
+        Passes a received datagram to the collector.
+        """
+        self.collector.process_datagram(data)
+
+    def error_received(self, exc):
+        """
+        Reports a socket error without closing the endpoint.
+        """
+        print(f"Error occurred while receiving packet data: {exc}")
+
+
+class AsyncDataProcessor:
+    """
+    An asyncio alternative to DataProcessor.collect_packet, so the collector can share one event loop with other
+    tasks such as storage writers or a metrics endpoint.
+
+    Datagrams are decoded and assembled into frames with the same DataProcessor logic. Complete frames are
+    published to a bounded queue for async iteration and kept as the latest frame for non-blocking reads. Closing
+    the collector queues a None sentinel, so consumers waiting for a frame finish once the buffered frames are
+    read.
+
+    Attributes:
+        data_processor (DataProcessor): Supplies the address, packet types, columns and decoding.
+        filtered (bool): Whether frames are flattened to DataProcessor.cols, as collect_packet does.
+        maxsize (int): The number of frames buffered for async iteration. The oldest is dropped when full.
+        latest (dict or None): The most recent complete frame.
+        dropped (int): The number of frames dropped from a full queue.
+    """
+
+    def __init__(self, data_processor=None, filtered=True, maxsize=100):
+        """
+        Initializes the AsyncDataProcessor.
+
+        Args:
+            data_processor (DataProcessor, optional): Supplies the address and decoding. Defaults to a
+                                                      DataProcessor on 127.0.0.1:20777.
+            filtered (bool): Whether frames are flattened to DataProcessor.cols.
+            maxsize (int): The number of frames buffered for async iteration.
+        """
+        self.data_processor = data_processor or DataProcessor()
+        self.filtered = filtered
+        self.maxsize = maxsize
+        self.latest = None
+        self.dropped = 0
+        self.transport = None
+        self.queue = None
+        self.assembler = FrameAssembler(
+            packet_type for packet_type, _ in self.data_processor.packet_types.values())
+
+    async def start(self):
+        """
+        Binds the datagram endpoint on the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: TelemetryProtocol(self),
+            local_addr=(self.data_processor.ip, self.data_processor.port))
+
+    def close(self):
+        """
+        Closes the datagram endpoint and wakes any consumer waiting for a frame.
+        """
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+            self._publish(None)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def process_datagram(self, data):
+        """
+        Decodes a datagram and publishes the frame it completes, if any.
+
+        Args:
+            data (bytes): The raw datagram.
+        """
+        try:
+            frame = self.data_processor.process_datagram(data, self.assembler)
+        except struct.error as e:
+            self.data_processor.stats.decode_errors += 1
+            print(f"Error occurred while decoding packet data: {e}")
+            return
+
+        if frame is None:
+            return
+        if self.filtered:
+            frame = self.data_processor.filter_frame(frame)
+
+        self.latest = frame
+        self._publish(frame)
+
+    def _publish(self, frame):
+        """
+        Queues a frame, or the None sentinel, dropping the oldest frame if the queue is full.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+    def latest_frame(self):
+        """
+        Returns the most recent complete frame without waiting.
+
+        Returns:
+            dict or None: The latest frame, or None if no frame has been completed yet.
+        """
+        return self.latest
+
+    async def next_frame(self):
+        """
+        Waits for the next buffered frame.
+
+        Returns:
+            dict or None: The next complete frame, or None once the collector is closed and every buffered frame
+                          has been read.
+        """
+        frame = await self.queue.get()
+        if frame is None:
+            self.queue.put_nowait(None)  # Leave the sentinel for the other waiting consumers
+        return frame
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.queue is None:
+            raise StopAsyncIteration
+        frame = await self.next_frame()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
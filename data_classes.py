@@ -1,4 +1,146 @@
 import struct
+import numpy as np
+
+NUM_CARS = 22  # The number of car records in every per-car packet
+
+
+class PacketLayout:
+    """
+    Describes a fixed-width binary record once, so it can be decoded with a single precompiled
+    struct.Struct call or viewed as a NumPy structured array.
+
+    Attributes:
+        fields (list of tuple): (name, struct format character, count) for each field, in wire order.
+        names (list of str): The field names, in wire order.
+        struct (struct.Struct): Precompiled little-endian decoder for a whole record.
+        dtype (np.dtype): Packed little-endian structured dtype matching the struct layout.
+        size (int): The size of one record in bytes.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.names = [name for name, _, _ in fields]
+        self.struct = struct.Struct('<' + ''.join(f"{count}{code}" for _, code, count in fields))
+        self.dtype = np.dtype([(name, '<' + code, (count,)) if count > 1 else (name, '<' + code)
+                               for name, code, count in fields])
+        self.size = self.struct.size
+        self._record_dtype = np.dtype((np.record, self.dtype))  # Lets view skip the recarray dtype conversion
+
+        if self.dtype.itemsize != self.size:
+            raise ValueError(f"Layout size mismatch: struct {self.size} bytes, dtype {self.dtype.itemsize} bytes")
+
+        # Map each field to its position in the flat tuple returned by unpack_from
+        self._plan = []
+        position = 0
+        for name, _, count in fields:
+            self._plan.append((name, position, count))
+            position += count
+        self._flat = all(count == 1 for _, _, count in fields)
+        self._projections = {}
+
+    def unpack(self, data, offset=0):
+        """
+        Decodes one record from a buffer without slicing it.
+
+        Args:
+            data (bytes, bytearray or memoryview): The buffer holding the record.
+            offset (int): The byte offset of the record within the buffer.
+
+        Returns:
+            dict: The decoded fields. Array fields are returned as lists.
+        """
+        values = self.struct.unpack_from(data, offset)
+        if self._flat:
+            return dict(zip(self.names, values))
+        return {name: values[position] if count == 1 else list(values[position:position + count])
+                for name, position, count in self._plan}
+
+    def view(self, data, offset=0, count=1):
+        """
+        Views consecutive records in a buffer as a NumPy record array without copying.
+
+        Args:
+            data (bytes, bytearray or memoryview): The buffer holding the records.
+            offset (int): The byte offset of the first record within the buffer.
+            count (int): The number of consecutive records to view.
+
+        Returns:
+            np.recarray: A (count,) record array backed by data. It is read-only when data is bytes.
+        """
+        return np.frombuffer(data, dtype=self._record_dtype, count=count, offset=offset).view(np.recarray)
+
+    def project(self, names):
+        """
+        Returns a decoder for a subset of the fields, compiled on first use and cached per projection.
+
+        Args:
+            names (iterable of str): The fields to decode, in the order they should appear in the output.
+
+        Returns:
+            PacketProjection: The compiled decoder for the projection.
+        """
+        names = tuple(names)
+        projection = self._projections.get(names)
+        if projection is None:
+            projection = self._projections[names] = PacketProjection(self, names)
+        return projection
+
+
+class PacketProjection:
+    """
+    Decodes only selected fields of a PacketLayout. Unselected fields are compiled into struct pad bytes,
+    so they are skipped by unpack_from instead of being decoded and discarded.
+
+    Attributes:
+        layout (PacketLayout): The full layout being projected.
+        names (tuple of str): The selected fields, in output order.
+        struct (struct.Struct): Precompiled decoder for the selected fields only.
+    """
+
+    def __init__(self, layout, names):
+        unknown = set(names) - set(layout.names)
+        if unknown:
+            raise KeyError(f"Fields not in layout: {sorted(unknown)}")
+
+        self.layout = layout
+        self.names = names
+
+        # Build the format in wire order, padding over every field that is not selected
+        selected = set(names)
+        codes = []
+        positions = {}
+        position = 0
+        padding = 0
+        for name, code, count in layout.fields:
+            if name in selected:
+                if padding:
+                    codes.append(f"{padding}x")
+                    padding = 0
+                codes.append(f"{count}{code}")
+                positions[name] = (position, count)
+                position += count
+            else:
+                padding += struct.calcsize(f"<{count}{code}")
+        self.struct = struct.Struct('<' + ''.join(codes))
+
+        # Reorder the unpacked values into the requested output order
+        self._plan = [(name,) + positions[name] for name in names]
+
+    def unpack(self, data, offset=0):
+        """
+        Decodes the selected fields of one record from a buffer without slicing it.
+
+        Args:
+            data (bytes, bytearray or memoryview): The buffer holding the record.
+            offset (int): The byte offset of the record within the buffer.
+
+        Returns:
+            dict: The selected fields in projection order. Array fields are returned as lists.
+        """
+        values = self.struct.unpack_from(data, offset)
+        return {name: values[position] if count == 1 else list(values[position:position + count])
+                for name, position, count in self._plan}
+
 
 class PacketHeader:
     """
@@ -19,30 +161,38 @@ class PacketHeader:
         secondary_player_car_index (int): The index of the secondary player's car.
     """
 
-    def __init__(self, data):
+    LAYOUT = PacketLayout([
+        ('packet_format', 'H', 1),
+        ('game_year', 'B', 1),
+        ('game_major_version', 'B', 1),
+        ('game_minor_version', 'B', 1),
+        ('packet_version', 'B', 1),
+        ('packet_id', 'B', 1),
+        ('session_uid', 'Q', 1),
+        ('session_time', 'f', 1),
+        ('frame_identifier', 'I', 1),
+        ('overall_frame_identifier', 'I', 1),
+        ('player_car_index', 'B', 1),
+        ('secondary_player_car_index', 'B', 1)
+    ])
+
+    def __init__(self, data, offset=0):
         self.data = data
+        self.offset = offset
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """
         Converts the PacketHeader instance to a dictionary.
 
+        Args:
+            fields (iterable of str, optional): Only decode these fields, in this order. Defaults to all fields.
+
         Returns:
-            dict: A dictionary containing all the attributes of the instance.
+            dict: A dictionary containing the requested attributes of the instance.
         """
-        return {
-            "packet_format": int.from_bytes(self.data[0:2], byteorder='little'),
-            "game_year": int.from_bytes(self.data[2:3], byteorder='little'),
-            "game_major_version": int.from_bytes(self.data[3:4], byteorder='little'),
-            "game_minor_version": int.from_bytes(self.data[4:5], byteorder='little'),
-            "packet_version": int.from_bytes(self.data[5:6], byteorder='little'),
-            "packet_id": int.from_bytes(self.data[6:7], byteorder='little'),
-            "session_uid": int.from_bytes(self.data[7:15], byteorder='little'),
-            "session_time": struct.unpack('<f', self.data[15:19])[0],
-            "frame_identifier": int.from_bytes(self.data[19:23], byteorder='little'),
-            "overall_frame_identifier": int.from_bytes(self.data[23:27], byteorder='little'),
-            "player_car_index": int.from_bytes(self.data[27:28], byteorder='little'),
-            "secondary_player_car_index": int.from_bytes(self.data[28:29], byteorder='little')
-        }
+        if fields is not None:
+            return self.LAYOUT.project(fields).unpack(self.data, self.offset)
+        return self.LAYOUT.unpack(self.data, self.offset)
 
 
 class CarMotionData:
@@ -70,36 +220,44 @@ class CarMotionData:
         roll (float): The roll angle.
     """
 
-    def __init__(self, data):
+    LAYOUT = PacketLayout([
+        ('world_position_x', 'f', 1),
+        ('world_position_y', 'f', 1),
+        ('world_position_z', 'f', 1),
+        ('world_velocity_x', 'f', 1),
+        ('world_velocity_y', 'f', 1),
+        ('world_velocity_z', 'f', 1),
+        ('world_forward_dir_x', 'h', 1),
+        ('world_forward_dir_y', 'h', 1),
+        ('world_forward_dir_z', 'h', 1),
+        ('world_right_dir_x', 'h', 1),
+        ('world_right_dir_y', 'h', 1),
+        ('world_right_dir_z', 'h', 1),
+        ('g_force_lateral', 'f', 1),
+        ('g_force_longitudinal', 'f', 1),
+        ('g_force_vertical', 'f', 1),
+        ('yaw', 'f', 1),
+        ('pitch', 'f', 1),
+        ('roll', 'f', 1)
+    ])
+
+    def __init__(self, data, offset=0):
         self.data = data
+        self.offset = offset
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """
         Converts the CarMotionData instance to a dictionary.
 
+        Args:
+            fields (iterable of str, optional): Only decode these fields, in this order. Defaults to all fields.
+
         Returns:
-            dict: A dictionary containing all the attributes of the instance.
+            dict: A dictionary containing the requested attributes of the instance.
         """
-        return {
-            "world_position_x": struct.unpack('<f', self.data[0:4])[0],
-            "world_position_y": struct.unpack('<f', self.data[4:8])[0],
-            "world_position_z": struct.unpack('<f', self.data[8:12])[0],
-            "world_velocity_x": struct.unpack('<f', self.data[12:16])[0],
-            "world_velocity_y": struct.unpack('<f', self.data[16:20])[0],
-            "world_velocity_z": struct.unpack('<f', self.data[20:24])[0],
-            "world_forward_dir_x": struct.unpack('<h', self.data[24:26])[0],
-            "world_forward_dir_y": struct.unpack('<h', self.data[26:28])[0],
-            "world_forward_dir_z": struct.unpack('<h', self.data[28:30])[0],
-            "world_right_dir_x": struct.unpack('<h', self.data[30:32])[0],
-            "world_right_dir_y": struct.unpack('<h', self.data[32:34])[0],
-            "world_right_dir_z": struct.unpack('<h', self.data[34:36])[0],
-            "g_force_lateral": struct.unpack('<f', self.data[36:40])[0],
-            "g_force_longitudinal": struct.unpack('<f', self.data[40:44])[0],
-            "g_force_vertical": struct.unpack('<f', self.data[44:48])[0],
-            "yaw": struct.unpack('<f', self.data[48:52])[0],
-            "pitch": struct.unpack('<f', self.data[52:56])[0],
-            "roll": struct.unpack('<f', self.data[56:60])[0]
-        }
+        if fields is not None:
+            return self.LAYOUT.project(fields).unpack(self.data, self.offset)
+        return self.LAYOUT.unpack(self.data, self.offset)
 
 
 class LapData:
@@ -138,47 +296,55 @@ class LapData:
         pit_stop_should_serve_pen (int): Whether the pit stop should serve a penalty.
     """
 
-    def __init__(self, data):
-       self.data = data
-       
-    def to_dict(self):
+    LAYOUT = PacketLayout([
+        ('last_lap_time_ms', 'I', 1),
+        ('current_lap_time_ms', 'I', 1),
+        ('sector1_time_ms', 'H', 1),
+        ('sector1_time_minutes', 'B', 1),
+        ('sector2_time_ms', 'H', 1),
+        ('sector2_time_minutes', 'B', 1),
+        ('delta_to_car_in_front_ms', 'H', 1),
+        ('delta_to_race_leader_ms', 'H', 1),
+        ('lap_distance', 'f', 1),
+        ('total_distance', 'f', 1),
+        ('safety_car_delta', 'f', 1),
+        ('car_position', 'B', 1),
+        ('current_lap_num', 'B', 1),
+        ('pit_status', 'B', 1),
+        ('num_pit_stops', 'B', 1),
+        ('sector', 'B', 1),
+        ('current_lap_invalid', 'B', 1),
+        ('penalties', 'B', 1),
+        ('total_warnings', 'B', 1),
+        ('corner_cutting_warnings', 'B', 1),
+        ('num_unserved_drive_through_pens', 'B', 1),
+        ('num_unserved_stop_go_pens', 'B', 1),
+        ('grid_position', 'B', 1),
+        ('driver_status', 'B', 1),
+        ('result_status', 'B', 1),
+        ('pit_lane_timer_active', 'B', 1),
+        ('pit_lane_time_in_lane_ms', 'H', 1),
+        ('pit_stop_timer_in_ms', 'H', 1),
+        ('pit_stop_should_serve_pen', 'B', 1)
+    ])
+
+    def __init__(self, data, offset=0):
+        self.data = data
+        self.offset = offset
+
+    def to_dict(self, fields=None):
         """
         Converts the LapData instance to a dictionary.
 
+        Args:
+            fields (iterable of str, optional): Only decode these fields, in this order. Defaults to all fields.
+
         Returns:
-            dict: A dictionary containing all the attributes of the instance.
+            dict: A dictionary containing the requested attributes of the instance.
         """
-        return {
-            "last_lap_time_ms": int.from_bytes(self.data[0:4], byteorder='little'),
-            "current_lap_time_ms": int.from_bytes(self.data[4:8], byteorder='little'),
-            "sector1_time_ms": int.from_bytes(self.data[8:10], byteorder='little'),
-            "sector1_time_minutes": int.from_bytes(self.data[10:11], byteorder='little'),
-            "sector2_time_ms": int.from_bytes(self.data[11:13], byteorder='little'),
-            "sector2_time_minutes": int.from_bytes(self.data[13:14], byteorder='little'),
-            "delta_to_car_in_front_ms": int.from_bytes(self.data[14:16], byteorder='little'),
-            "delta_to_race_leader_ms": int.from_bytes(self.data[16:18], byteorder='little'),
-            "lap_distance": struct.unpack('<f', self.data[18:22])[0],
-            "total_distance": struct.unpack('<f', self.data[22:26])[0],
-            "safety_car_delta": struct.unpack('<f', self.data[26:30])[0],
-            "car_position": int.from_bytes(self.data[30:31], byteorder='little'),
-            "current_lap_num": int.from_bytes(self.data[31:32], byteorder='little'),
-            "pit_status": int.from_bytes(self.data[32:33], byteorder='little'),
-            "num_pit_stops": int.from_bytes(self.data[33:34], byteorder='little'),
-            "sector": int.from_bytes(self.data[34:35], byteorder='little'),
-            "current_lap_invalid": int.from_bytes(self.data[35:36], byteorder='little'),
-            "penalties": int.from_bytes(self.data[36:37], byteorder='little'),
-            "total_warnings": int.from_bytes(self.data[37:38], byteorder='little'),
-            "corner_cutting_warnings": int.from_bytes(self.data[38:39], byteorder='little'),
-            "num_unserved_drive_through_pens": int.from_bytes(self.data[39:40], byteorder='little'),
-            "num_unserved_stop_go_pens": int.from_bytes(self.data[40:41], byteorder='little'),
-            "grid_position": int.from_bytes(self.data[41:42], byteorder='little'),
-            "driver_status": int.from_bytes(self.data[42:43], byteorder='little'),
-            "result_status": int.from_bytes(self.data[43:44], byteorder='little'),
-            "pit_lane_timer_active": int.from_bytes(self.data[44:45], byteorder='little'),
-            "pit_lane_time_in_lane_ms": int.from_bytes(self.data[45:47], byteorder='little'),
-            "pit_stop_timer_in_ms": int.from_bytes(self.data[47:49], byteorder='little'),
-            "pit_stop_should_serve_pen": int.from_bytes(self.data[49:50], byteorder='little')
-        }
+        if fields is not None:
+            return self.LAYOUT.project(fields).unpack(self.data, self.offset)
+        return self.LAYOUT.unpack(self.data, self.offset)
 
 class CarData:
     """
@@ -190,15 +356,13 @@ class CarData:
     """
 
     def __init__(self, data):
-        self.header = PacketHeader(data[0:29])
+        self.data = data
+        self.header = PacketHeader(data)
         self.car_motion_data = []
-        offset = 29
-        car_data_size = 60  # Each CarMotionData object occupies 60 bytes
-        num_cars = 22
-
-        for i in range(num_cars):
-            car_data = data[offset + i * car_data_size: offset + (i + 1) * car_data_size]
-            self.car_motion_data.append(CarMotionData(car_data))
+        offset = PacketHeader.LAYOUT.size
+        car_data_size = CarMotionData.LAYOUT.size  # Each CarMotionData object occupies 60 bytes
+        for i in range(NUM_CARS):
+            self.car_motion_data.append(CarMotionData(data, offset + i * car_data_size))
 
     def to_dict(self):
         """
@@ -212,6 +376,15 @@ class CarData:
             "car_motion_data": [car_data.to_dict() for car_data in self.car_motion_data]
         }
 
+    def to_records(self):
+        """
+        Decodes the CarMotionData of every car at once as a record array viewing the packet buffer.
+
+        Returns:
+            np.recarray: A (22,) record array with one CarMotionData record per car.
+        """
+        return parse_packet_car_motion_records(self.data)
+
 class CarTelemetryData:
     """
     This class represents telemetry data for a car, parsed from raw binary data.
@@ -235,40 +408,49 @@ class CarTelemetryData:
         surface_type (list of int): The type of surface the tyres are currently on.
     """
 
-    def __init__(self, data):
+    LAYOUT = PacketLayout([
+        ('speed', 'H', 1),
+        ('throttle', 'f', 1),
+        ('steer', 'f', 1),
+        ('brake', 'f', 1),
+        ('clutch', 'B', 1),
+        ('gear', 'B', 1),
+        ('engine_rpm', 'H', 1),
+        ('drs', 'B', 1),
+        ('rev_lights_percent', 'B', 1),
+        ('rev_lights_bit_value', 'H', 1),
+        ('brakes_temperature', 'H', 4),
+        ('tyres_surface_temperature', 'B', 4),
+        ('tyres_inner_temperature', 'B', 4),
+        ('engine_temperature', 'H', 1),
+        ('tyres_pressure', 'f', 4),
+        ('surface_type', 'B', 4)
+    ])
+
+    def __init__(self, data, offset=0):
         """
         Initializes the CarTelemetryData instance from raw binary data.
 
         Args:
             data (bytes): The raw binary data from which the telemetry data is parsed.
+            offset (int): The byte offset of the record within data.
         """
         self.data = data
+        self.offset = offset
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """
         Converts the CarTelemetryData instance to a dictionary.
 
+        Args:
+            fields (iterable of str, optional): Only decode these fields, in this order. Defaults to all fields.
+
         Returns:
-            dict: A dictionary containing all the attributes of the instance.
+            dict: A dictionary containing the requested attributes of the instance.
         """
-        return {
-            "speed": int.from_bytes(self.data[0:2], byteorder='little'),
-            "throttle": struct.unpack('<f', self.data[2:6])[0],
-            "steer": struct.unpack('<f', self.data[6:10])[0],
-            "brake": struct.unpack('<f', self.data[10:14])[0],
-            "clutch": int.from_bytes(self.data[14:15], byteorder='little'),
-            "gear": int.from_bytes(self.data[15:16], byteorder='little'),
-            "engine_rpm": int.from_bytes(self.data[16:18], byteorder='little'),
-            "drs": int.from_bytes(self.data[18:19], byteorder='little'),
-            "rev_lights_percent": int.from_bytes(self.data[19:20], byteorder='little'),
-            "rev_lights_bit_value": int.from_bytes(self.data[20:22], byteorder='little'),
-            "brakes_temperature": [int.from_bytes(self.data[i:i + 2], byteorder='little') for i in range(22, 30, 2)],
-            "tyres_surface_temperature": [int.from_bytes(self.data[i:i + 1], byteorder='little') for i in range(30, 34)],
-            "tyres_inner_temperature": [int.from_bytes(self.data[i:i + 1], byteorder='little') for i in range(34, 38)],
-            "engine_temperature": int.from_bytes(self.data[38:40], byteorder='little'),
-            "tyres_pressure": [struct.unpack('<f', self.data[i:i + 4])[0] for i in range(40, 56, 4)],
-            "surface_type": [int.from_bytes(self.data[i:i + 1], byteorder='little') for i in range(56, 60)]
-        }
+        if fields is not None:
+            return self.LAYOUT.project(fields).unpack(self.data, self.offset)
+        return self.LAYOUT.unpack(self.data, self.offset)
     
 class CarStatusData:
     """
@@ -302,49 +484,58 @@ class CarStatusData:
         network_paused (int): The network paused status.
     """
 
-    def __init__(self, data):
+    LAYOUT = PacketLayout([
+        ('traction_control', 'B', 1),
+        ('anti_lock_brakes', 'B', 1),
+        ('fuel_mix', 'B', 1),
+        ('front_brake_bias', 'B', 1),
+        ('pit_limiter_status', 'B', 1),
+        ('fuel_in_tank', 'f', 1),
+        ('fuel_capacity', 'f', 1),
+        ('fuel_remaining_laps', 'f', 1),
+        ('max_rpm', 'H', 1),
+        ('idle_rpm', 'H', 1),
+        ('max_gears', 'B', 1),
+        ('drs_allowed', 'B', 1),
+        ('drs_activation_distance', 'H', 1),
+        ('actual_tyre_compound', 'B', 1),
+        ('visual_tyre_compound', 'B', 1),
+        ('tyres_age_laps', 'B', 1),
+        ('vehicle_fia_flags', 'B', 1),
+        ('engine_power_ice', 'f', 1),
+        ('engine_power_mguk', 'f', 1),
+        ('ers_store_energy', 'f', 1),
+        ('ers_deploy_mode', 'B', 1),
+        ('ers_harvested_this_lap_mguk', 'f', 1),
+        ('ers_harvested_this_lap_mguh', 'f', 1),
+        ('ers_deployed_this_lap', 'f', 1),
+        ('network_paused', 'B', 1)
+    ])
+
+    def __init__(self, data, offset=0):
         """
         Initializes the CarStatusData instance from raw binary data.
 
         Args:
             data (bytes): The raw binary data from which the car status data is parsed.
+            offset (int): The byte offset of the record within data.
         """
         self.data = data
+        self.offset = offset
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """
         Converts the CarStatusData instance to a dictionary.
 
+        Args:
+            fields (iterable of str, optional): Only decode these fields, in this order. Defaults to all fields.
+
         Returns:
-            dict: A dictionary containing all the attributes of the instance.
+            dict: A dictionary containing the requested attributes of the instance.
         """
-        return {
-            "traction_control": int.from_bytes(self.data[0:1], byteorder='little'),
-            "anti_lock_brakes": int.from_bytes(self.data[1:2], byteorder='little'),
-            "fuel_mix": int.from_bytes(self.data[2:3], byteorder='little'),
-            "front_brake_bias": int.from_bytes(self.data[3:4], byteorder='little'),
-            "pit_limiter_status": int.from_bytes(self.data[4:5], byteorder='little'),
-            "fuel_in_tank": struct.unpack('<f', self.data[5:9])[0],
-            "fuel_capacity": struct.unpack('<f', self.data[9:13])[0],
-            "fuel_remaining_laps": struct.unpack('<f', self.data[13:17])[0],
-            "max_rpm": int.from_bytes(self.data[17:19], byteorder='little'),
-            "idle_rpm": int.from_bytes(self.data[19:21], byteorder='little'),
-            "max_gears": int.from_bytes(self.data[21:22], byteorder='little'),
-            "drs_allowed": int.from_bytes(self.data[22:23], byteorder='little'),
-            "drs_activation_distance": int.from_bytes(self.data[23:25], byteorder='little'),
-            "actual_tyre_compound": int.from_bytes(self.data[25:26], byteorder='little'),
-            "visual_tyre_compound": int.from_bytes(self.data[26:27], byteorder='little'),
-            "tyres_age_laps": int.from_bytes(self.data[27:28], byteorder='little'),
-            "vehicle_fia_flags": int.from_bytes(self.data[28:29], byteorder='little'),
-            "engine_power_ice": struct.unpack('<f', self.data[29:33])[0],
-            "engine_power_mguk": struct.unpack('<f', self.data[33:37])[0],
-            "ers_store_energy": struct.unpack('<f', self.data[37:41])[0],
-            "ers_deploy_mode": int.from_bytes(self.data[41:42], byteorder='little'),
-            "ers_harvested_this_lap_mguk": struct.unpack('<f', self.data[42:46])[0],
-            "ers_harvested_this_lap_mguh": struct.unpack('<f', self.data[46:50])[0],
-            "ers_deployed_this_lap": struct.unpack('<f', self.data[50:54])[0],
-            "network_paused": int.from_bytes(self.data[54:55], byteorder='little')
-        }
+        if fields is not None:
+            return self.LAYOUT.project(fields).unpack(self.data, self.offset)
+        return self.LAYOUT.unpack(self.data, self.offset)
         
 class PacketLapData:
     """
@@ -356,15 +547,13 @@ class PacketLapData:
     """
 
     def __init__(self, data):
-        self.header = PacketHeader(data[0:29])
+        self.data = data
+        self.header = PacketHeader(data)
         self.lap_data = []
-        offset = 29
-        car_data_size = 50  # Each LapData object occupies 50 bytes
-        num_cars = 22
-
-        for i in range(num_cars):
-            car_data = data[offset + i * car_data_size: offset + (i + 1) * car_data_size]
-            self.lap_data.append(LapData(car_data))
+        offset = PacketHeader.LAYOUT.size
+        car_data_size = LapData.LAYOUT.size  # Each LapData object occupies 50 bytes
+        for i in range(NUM_CARS):
+            self.lap_data.append(LapData(data, offset + i * car_data_size))
 
     def to_dict(self):
         """
@@ -378,18 +567,27 @@ class PacketLapData:
             "lap_data": [lap_data.to_dict() for lap_data in self.lap_data]
         }
 
+    def to_records(self):
+        """
+        Decodes the LapData of every car at once as a record array viewing the packet buffer.
+
+        Returns:
+            np.recarray: A (22,) record array with one LapData record per car.
+        """
+        return parse_packet_lap_records(self.data)
+
 # Define the parsing functions for each packet type
 def parse_packet_car_motion_data(data):
     """
-    Parses the given raw binary data as a PacketCarMotionData instance.
+    Parses the given raw binary data as a CarData instance.
 
     Args:
         data (bytes): The raw binary data of the packet.
 
     Returns:
-        PacketCarMotionData: The parsed PacketCarMotionData instance.
+        dict: The parsed CarData instance as a dictionary.
     """
-    return PacketCarMotionData(data).to_dict()
+    return CarData(data).to_dict()
 
 def parse_packet_lap_data(data):
     """
@@ -399,7 +597,33 @@ def parse_packet_lap_data(data):
         data (bytes): The raw binary data of the packet.
 
     Returns:
-        PacketLapData: The parsed PacketLapData instance.
+        dict: The parsed PacketLapData instance as a dictionary.
     """
     return PacketLapData(data).to_dict()
 
+def parse_packet_car_motion_records(data):
+    """
+    Parses the motion data of every car in the given raw binary data without copying it or creating per-car
+    objects.
+
+    Args:
+        data (bytes, bytearray or memoryview): The raw binary data of the packet.
+
+    Returns:
+        np.recarray: A (22,) record array of CarMotionData records.
+    """
+    return CarMotionData.LAYOUT.view(data, PacketHeader.LAYOUT.size, NUM_CARS)
+
+def parse_packet_lap_records(data):
+    """
+    Parses the lap data of every car in the given raw binary data without copying it or creating per-car
+    objects.
+
+    Args:
+        data (bytes, bytearray or memoryview): The raw binary data of the packet.
+
+    Returns:
+        np.recarray: A (22,) record array of LapData records.
+    """
+    return LapData.LAYOUT.view(data, PacketHeader.LAYOUT.size, NUM_CARS)
+
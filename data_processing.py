@@ -1,94 +1,513 @@
 import socket
-from data_classes import *  
+import sys
+import time
+from collections import OrderedDict
+from data_classes import *
+from metrics import LatencyHistogram
+from replay import TelemetryRecorder
+
+# Linux socket option reporting the number of datagrams dropped because the receive buffer was full.
+# Python does not export the constant, and other platforms have no equivalent.
+SO_RXQ_OVFL = getattr(socket, 'SO_RXQ_OVFL', 40 if sys.platform.startswith('linux') else None)
+
+
+class FrameAssembler:
+    """
+    Groups decoded packets into complete frames, one per game tick.
+
+    Packets are keyed on the session_uid and frame_identifier of their header, so a frame only ever combines
+    packets sent for the same tick. Partial frames that arrived before a completed frame are dropped, as their
+    missing packets were lost or will arrive too late to be useful.
+
+    Attributes:
+        packet_types (set): The packet types that make up a complete frame.
+        max_pending (int): The maximum number of partial frames kept before the oldest is dropped.
+        pending (OrderedDict): Partial frames in arrival order, keyed on (session_uid, frame_identifier).
+        dropped (int): The number of partial frames dropped so far.
+    """
+
+    def __init__(self, packet_types, max_pending=8):
+        """
+        Initializes the FrameAssembler.
+
+        Args:
+            packet_types (iterable of str): The packet types that make up a complete frame.
+            max_pending (int): The maximum number of partial frames kept before the oldest is dropped.
+        """
+        self.packet_types = set(packet_types)
+        self.max_pending = max_pending
+        self.pending = OrderedDict()
+        self.dropped = 0
+
+    def add(self, header, packet_type, packet_data):
+        """
+        Adds a decoded packet to its frame.
+
+        Args:
+            header (dict): The decoded packet header, including session_uid, frame_identifier and session_time.
+            packet_type (str): The frame key of the packet, e.g. 'car_motion'.
+            packet_data (dict): The decoded packet body.
+
+        Returns:
+            dict or None: The complete frame if this packet completed it, otherwise None. A frame holds the
+                          session_uid, frame_identifier and session_time of its tick plus one entry per packet type.
+        """
+        key = (header['session_uid'], header['frame_identifier'])
+        frame = self.pending.get(key)
+        if frame is None:
+            frame = self.pending[key] = {
+                'session_uid': header['session_uid'],
+                'frame_identifier': header['frame_identifier'],
+                'session_time': header['session_time'],
+            }
+            if len(self.pending) > self.max_pending:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+
+        frame[packet_type] = packet_data
+        if not self.packet_types.issubset(frame):
+            return None
+
+        # Discard the completed frame and every older partial frame
+        while self.pending:
+            pending_key, _ = self.pending.popitem(last=False)
+            if pending_key == key:
+                break
+            self.dropped += 1
+        return frame
+
+
+class CollectorStats:
+    """
+    Tracks whether the collector keeps up with the game: packet counts, frame_identifier gaps, out-of-order
+    arrivals, incomplete frames, decode times and socket buffer overflows.
+
+    Gaps are counted against the smallest frame_identifier step seen for each packet ID, since the game only
+    sends packets every few frames when its UDP send rate is below its frame rate.
+
+    Attributes:
+        packets (dict): The number of datagrams received per packet ID.
+        frames (int): The number of complete frames emitted.
+        incomplete_frames (int): The number of partial frames dropped by the frame assembler.
+        gaps (int): The number of sends missing from the frame_identifier sequence of the collected packet IDs.
+        out_of_order (int): The number of datagrams older than the last one received with the same packet ID.
+        decode_errors (int): The number of datagrams that could not be decoded.
+        socket_overflows (int or None): The number of datagrams dropped because the socket buffer was full,
+                                        or None where the platform does not report it.
+        decode_time (LatencyHistogram): The time taken to decode each datagram.
+        log_interval (float or None): Seconds between log lines. None disables logging.
+        fields (list of str): The names of the values returned by values, for publishing through a
+                              SharedFrameChannel.
+    """
+
+    fields = ['packets', 'frames', 'incomplete_frames', 'gaps', 'out_of_order', 'decode_errors', 'socket_overflows',
+              'decode_p50', 'decode_p99']
+
+    def __init__(self, tracked_packet_ids, log_interval=10.0):
+        """
+        Initializes the CollectorStats.
+
+        Args:
+            tracked_packet_ids (iterable of int): The packet IDs checked for gaps and reordering.
+            log_interval (float or None): Seconds between log lines. None disables logging.
+        """
+        self.tracked_packet_ids = set(tracked_packet_ids)
+        self.log_interval = log_interval
+        self.packets = {}
+        self.frames = 0
+        self.incomplete_frames = 0
+        self.gaps = 0
+        self.out_of_order = 0
+        self.decode_errors = 0
+        self.socket_overflows = None
+        self.decode_time = LatencyHistogram()
+        self._last_frame = {}
+        self._stride = {}
+        self._last_log = None
+        self._last_log_frames = 0
+
+    def record_packet(self, header):
+        """
+        Counts a datagram and checks its frame_identifier against the last one with the same packet ID.
+
+        Args:
+            header (dict): The decoded header, including packet_id, session_uid and frame_identifier.
+        """
+        packet_id = header['packet_id']
+        self.packets[packet_id] = self.packets.get(packet_id, 0) + 1
+        if packet_id not in self.tracked_packet_ids:
+            return
+
+        session_uid, frame_identifier = header['session_uid'], header['frame_identifier']
+        last = self._last_frame.get(packet_id)
+        if last is None or last[0] != session_uid:
+            self._last_frame[packet_id] = (session_uid, frame_identifier)
+            return
+
+        step = frame_identifier - last[1]
+        if step <= 0:
+            self.out_of_order += 1
+            return
+
+        stride = self._stride.get(packet_id)
+        if stride is None or step < stride:
+            stride = self._stride[packet_id] = step
+        self.gaps += step // stride - 1
+        self._last_frame[packet_id] = (session_uid, frame_identifier)
+
+    def record_frame(self, incomplete_frames):
+        """
+        Counts a complete frame and logs a summary line if the log interval has elapsed.
+
+        Args:
+            incomplete_frames (int): The number of partial frames the assembler has dropped so far.
+        """
+        self.frames += 1
+        self.incomplete_frames = incomplete_frames
+
+        if self.log_interval is None:
+            return
+        now = time.perf_counter()
+        if self._last_log is None:
+            self._last_log = now
+        elif now - self._last_log >= self.log_interval:
+            self.log(self.frames - self._last_log_frames, now - self._last_log)
+            self._last_log = now
+            self._last_log_frames = self.frames
+
+    def log(self, frames, elapsed):
+        """
+        Prints a one-line summary of the stats.
+
+        Args:
+            frames (int): The number of frames emitted over the interval being reported.
+            elapsed (float): The length of the interval in seconds.
+        """
+        decode_time = self.decode_time.snapshot()
+        print(f"Collector: {frames / elapsed:.1f} frames/s, {self.gaps} gaps, {self.out_of_order} out of order, "
+              f"{self.incomplete_frames} incomplete, {self.decode_errors} errors, "
+              f"{self.socket_overflows if self.socket_overflows is not None else 'n/a'} overflows, "
+              f"decode p50 {decode_time['p50'] * 1e6:.0f}us p99 {decode_time['p99'] * 1e6:.0f}us")
+
+    def snapshot(self):
+        """
+        Returns the current stats.
+
+        Returns:
+            dict: A copy of every counter, plus a summary of the decode time histogram.
+        """
+        return {
+            'packets': dict(self.packets),
+            'frames': self.frames,
+            'incomplete_frames': self.incomplete_frames,
+            'gaps': self.gaps,
+            'out_of_order': self.out_of_order,
+            'decode_errors': self.decode_errors,
+            'socket_overflows': self.socket_overflows,
+            'decode_time': self.decode_time.snapshot(),
+        }
+
+    def values(self):
+        """
+        Returns the current stats as numbers, in fields order, so another process can read them from a
+        SharedFrameChannel.
+
+        Returns:
+            list of float: The total datagram count, the counters and the p50 and p99 decode times in seconds.
+                           socket_overflows is NaN where the platform does not report it.
+        """
+        return [sum(self.packets.values()), self.frames, self.incomplete_frames, self.gaps, self.out_of_order,
+                self.decode_errors, self.socket_overflows if self.socket_overflows is not None else float('nan'),
+                self.decode_time.percentile(50), self.decode_time.percentile(99)]
+
+
+class PacketRing:
+    """
+    A preallocated ring of receive buffers. Datagrams are received straight into the next slot with recv_into
+    and decoded from a memoryview of it, so the receive path allocates no bytes objects.
+
+    A slot is overwritten once the ring wraps around, so views returned by receive stay valid for the next
+    len(buffers) - 1 datagrams only.
+
+    Attributes:
+        buffers (list of bytearray): The preallocated slots.
+        views (list of memoryview): A memoryview of each slot, created once.
+        index (int): The slot the next datagram is received into.
+        track_overflows (bool): Whether datagrams are received with recvmsg_into to read SO_RXQ_OVFL.
+        overflows (int or None): The socket's dropped datagram count, when tracked.
+    """
+
+    def __init__(self, slots=64, slot_size=2048, track_overflows=False):
+        """
+        Initializes the PacketRing.
+
+        Args:
+            slots (int): The number of datagrams that can be held at once.
+            slot_size (int): The size of each slot in bytes. Must hold the largest datagram.
+            track_overflows (bool): Whether to read the SO_RXQ_OVFL drop counter sent with each datagram.
+                                    The option must already be enabled on the socket.
+        """
+        self.buffers = [bytearray(slot_size) for _ in range(slots)]
+        self.views = [memoryview(buffer) for buffer in self.buffers]
+        self.index = 0
+        self.track_overflows = track_overflows
+        self.overflows = 0 if track_overflows else None
+        self._ancillary_size = socket.CMSG_SPACE(4) if track_overflows else 0
+
+    def receive(self, udp_socket):
+        """
+        Receives one datagram into the next slot.
+
+        Args:
+            udp_socket (socket.socket): The socket to receive from.
+
+        Returns:
+            tuple: The memoryview of the slot and the number of bytes received into it.
+        """
+        view = self.views[self.index]
+        self.index = (self.index + 1) % len(self.views)
+        if not self.track_overflows:
+            return view, udp_socket.recv_into(view)
+
+        size, ancillary, _, _ = udp_socket.recvmsg_into([view], self._ancillary_size)
+        for level, kind, value in ancillary:
+            if level == socket.SOL_SOCKET and kind == SO_RXQ_OVFL:
+                self.overflows = int.from_bytes(value[:4], byteorder=sys.byteorder)
+        return view, size
+
 
 class DataProcessor:
     """
     A class to process and collect telemetry data packets from a UDP source.
 
+    The UDP socket is bound once and kept open across frames, so no packets are lost between frames.
+
+    Attributes:
+        ip (str): The IP address to bind to.
+        port (int): The port number to bind to.
+        ring_size (int): The number of slots in the receive ring. 0 receives each datagram as a new bytes object.
+        record_path (str or None): The file every received datagram is recorded to, if any.
+        packet_types (dict): Maps each collected packet ID to its frame key and data class.
+        cols (dict): The fields consumed from each packet type, in output order. Only these fields are decoded.
+        header_cols (list): The header fields used to assemble frames.
+        stats (CollectorStats): Packet loss, reordering and decode latency counters for this processor.
+
     Methods:
         collect_packet: Listens for UDP packets on a specified IP and port, processes them, and yields the data.
+        collect_frames: Listens for UDP packets, or reads given datagrams, and yields complete, unfiltered frames.
     """
 
-    def collect_packet(self):
+    packet_types = {
+        0: ('car_motion', CarMotionData),
+        2: ('lap_data', LapData),
+        6: ('telemetry_data', CarTelemetryData),
+        7: ('car_status', CarStatusData),
+    }
+
+    cols = {
+        "lap_data": ['last_lap_time_ms', 'current_lap_time_ms', 'lap_distance', 'current_lap_invalid'],
+        "car_motion": ['world_position_x', 'world_position_y', 'world_position_z', 'world_velocity_x',
+                       'world_velocity_y', 'world_velocity_z', 'world_forward_dir_x', 'world_forward_dir_y',
+                       'world_forward_dir_z', 'world_right_dir_x', 'world_right_dir_y', 'world_right_dir_z',
+                       'g_force_lateral', 'g_force_longitudinal', 'g_force_vertical', 'yaw', 'pitch',
+                       'roll'],
+        "telemetry_data": ['speed', 'throttle', 'steer', 'brake', 'drs', 'surface_type',
+                           'clutch', 'gear'],
+    }
+
+    header_cols = ['packet_id', 'session_uid', 'session_time', 'frame_identifier']
+
+    def __init__(self, ip="127.0.0.1", port=20777, ring_size=64, record_path=None, cols=None, log_interval=10.0):
         """
-        Collects and processes UDP packets from a racing game.
+        Initializes the DataProcessor. The socket and receive ring are only created when collection starts, so
+        the instance can be handed to a child process before use.
+
+        Args:
+            ip (str): The IP address to bind to.
+            port (int): The port number to bind to.
+            ring_size (int): The number of slots in the receive ring. 0 receives each datagram as a new bytes
+                             object instead.
+            record_path (str, optional): A file to record every received datagram to with a TelemetryRecorder.
+            cols (dict, optional): Overrides the fields consumed from each packet type for this instance.
+            log_interval (float, optional): Seconds between collector stats log lines. None disables them.
+        """
+        self.ip = ip
+        self.port = port
+        self.ring_size = ring_size
+        self.record_path = record_path
+        if cols is not None:
+            self.cols = cols
+        self.stats = CollectorStats(self.packet_types, log_interval)
+        self.udp_socket = None
+
+    def open(self):
+        """
+        Binds the UDP socket if it is not already open.
+
+        Returns:
+            socket.socket: The bound UDP socket.
+        """
+        if self.udp_socket is None:
+            self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.udp_socket.bind((self.ip, self.port))
+            if SO_RXQ_OVFL is not None:
+                try:
+                    self.udp_socket.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+                    self.stats.socket_overflows = 0
+                except OSError:
+                    pass
+        return self.udp_socket
+
+    def close(self):
+        """
+        Closes the UDP socket.
+        """
+        if self.udp_socket is not None:
+            self.udp_socket.close()
+            self.udp_socket = None
+
+    def process_datagram(self, data, assembler, size=None):
+        """
+        Decodes a single datagram and adds it to its frame.
+
+        Args:
+            data (bytes or memoryview): The raw datagram, or a receive buffer starting with it.
+            assembler (FrameAssembler): The assembler collecting packets into frames.
+            size (int, optional): The length of the datagram within data. Defaults to len(data).
+
+        Returns:
+            dict or None: The complete frame if this datagram completed one, otherwise None. The frame is stamped
+                          with received_at, the time.perf_counter reading when its last datagram was processed.
+        """
+        start = time.perf_counter()
+        if size is None:
+            size = len(data)
+        if size < 29:
+            raise struct.error(f"datagram of {size} bytes is shorter than the packet header")
 
-        This method listens for incoming UDP packets, extracts relevant data based on the packet ID,
-        and processes the data using predefined data classes. It yields the processed data for further use.
+        header = PacketHeader(data).to_dict(self.header_cols)
+        packet_id = header['packet_id']
+        self.stats.record_packet(header)
+
+        if packet_id not in self.packet_types:
+            self.stats.decode_time.record(time.perf_counter() - start)
+            return None
+
+        packet_type, packet_class = self.packet_types[packet_id]
+        if size < 29 + packet_class.LAYOUT.size:
+            raise struct.error(f"packet {packet_id} of {size} bytes is too short")
+
+        # Only decode the fields consumed downstream. Code that needs every car's record views the packet with
+        # parse_packet_car_motion_records or parse_packet_lap_records instead
+        packet_data = packet_class(data, 29).to_dict(self.cols.get(packet_type, ()))
+        frame = assembler.add(header, packet_type, packet_data)
+
+        self.stats.decode_time.record(time.perf_counter() - start)
+        if frame is not None:
+            frame['received_at'] = start
+            self.stats.record_frame(assembler.dropped)
+        return frame
+
+    def receive_datagrams(self):
+        """
+        Receives datagrams from the persistent socket, recording them if a recording path is set.
 
         Yields:
-            dict: A dictionary containing processed telemetry data, which may include car motion data, 
-                  lap data, telemetry data, and car status data.
+            tuple: The datagram, or the receive buffer starting with it, and its length in bytes.
         """
-        def listen_udp(ip, port):
-            """
-            Listens for UDP packets and processes them.
+        udp_socket = self.open()
+        track_overflows = self.stats.socket_overflows is not None and hasattr(udp_socket, 'recvmsg_into')
+        ring = PacketRing(self.ring_size, track_overflows=track_overflows) if self.ring_size else None
+        recorder = TelemetryRecorder(self.record_path) if self.record_path else None
 
-            Args:
-                ip (str): The IP address to bind to.
-                port (int): The port number to bind to.
+        try:
+            while True:
+                if ring is not None:
+                    data, size = ring.receive(udp_socket)
+                    if track_overflows:
+                        self.stats.socket_overflows = ring.overflows
+                else:
+                    data = udp_socket.recv(2048)
+                    size = len(data)
 
-            Yields:
-                dict: A dictionary containing the processed data from the UDP packets.
-            """
-            udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            udp_socket.bind((ip, port))
+                if recorder is not None:
+                    recorder.write(data, size)
+                yield data, size
+        finally:
+            if recorder is not None:
+                recorder.close()
 
-            encountered_packet_ids = set()
-            stored_data = {}
+    def collect_frames(self, datagrams=None):
+        """
+        Assembles datagrams into complete frames.
+
+        Args:
+            datagrams (iterable of bytes, optional): The datagrams to process, e.g. from a TelemetryReplayer.
+                                                     Defaults to listening on the persistent socket.
 
+        Yields:
+            dict: A complete frame, holding the session_uid, frame_identifier and session_time of its tick, the
+                  received_at capture time and the decoded data of each packet type.
+        """
+        if datagrams is None:
+            source = self.receive_datagrams()
+        else:
+            source = ((data, len(data)) for data in datagrams)
+        assembler = FrameAssembler(packet_type for packet_type, _ in self.packet_types.values())
+
+        for data, size in source:
             try:
-                while len(encountered_packet_ids) < 4:  # Changed to avoid hardcoded value
-                    data, address = udp_socket.recvfrom(2000)
-                    packet_header = PacketHeader(data)
-                    packet_header_dict = packet_header.to_dict()
-                    packet_id = packet_header_dict['packet_id']
-
-                    if packet_id in [0, 2, 6, 7] and packet_id not in encountered_packet_ids:
-                        encountered_packet_ids.add(packet_id)
-
-                        if packet_id == 0:
-                            stored_data['car_motion'] = CarMotionData(data[29:]).to_dict()
-                        elif packet_id == 2:
-                            stored_data['lap_data'] = LapData(data[29:]).to_dict()
-                        elif packet_id == 6:
-                            stored_data['telemetry_data'] = CarTelemetryData(data[29:]).to_dict()
-                        elif packet_id == 7:
-                            stored_data['car_status'] = CarStatusData(data[29:]).to_dict()
-
-                yield stored_data
-
-            except Exception as e:
-                print(f"Error occurred while collecting packet data: {e}")
-            finally:
-                udp_socket.close()
+                frame = self.process_datagram(data, assembler, size)
+            except struct.error as e:
+                self.stats.decode_errors += 1
+                print(f"Error occurred while decoding packet data: {e}")
+                continue
+
+            if frame is not None:
+                yield frame
 
+    def filter_frame(self, frame):
+        """
+        Flattens a complete frame into the columns listed in cols.
+
+        Args:
+            frame (dict): A complete frame from collect_frames.
+
+        Returns:
+            dict: The consumed telemetry values, in cols order.
+        """
+        filtered_data = {}
+        for packet_type, keys in self.cols.items():
+            packet_data = frame.get(packet_type, {})
+            filtered_values = {key: packet_data.get(key, None) for key in keys}
+
+            if filtered_values:
+                filtered_data.update(filtered_values)
+
+        # Summing surface_type values for aggregation
+        filtered_data['surface_type'] = sum(filtered_data.get('surface_type', []))
+        return filtered_data
+
+    def collect_packet(self, datagrams=None):
+        """
+        Collects and processes UDP packets from a racing game.
+
+        This method listens for incoming UDP packets on a persistent socket, assembles the packets of each game
+        tick into a frame, and yields the consumed columns of every complete frame.
+
+        Args:
+            datagrams (iterable of bytes, optional): The datagrams to process, e.g. from a TelemetryReplayer.
+                                                     Defaults to listening on the persistent socket.
+
+        Yields:
+            dict: A dictionary containing processed telemetry data, which may include car motion data,
+                  lap data, telemetry data, and car status data.
+        """
         try:
-            for data in listen_udp("127.0.0.1", 20777):
-                cols = {
-                    "lap_data": ['last_lap_time_ms', 'current_lap_time_ms', 'lap_distance', 'current_lap_invalid'],
-                    "car_motion": ['world_position_x', 'world_position_y', 'world_position_z', 'world_velocity_x',
-                                   'world_velocity_y', 'world_velocity_z', 'world_forward_dir_x', 'world_forward_dir_y',
-                                   'world_forward_dir_z', 'world_right_dir_x', 'world_right_dir_y', 'world_right_dir_z',
-                                   'g_force_lateral', 'g_force_longitudinal', 'g_force_vertical', 'yaw', 'pitch',
-                                   'roll'],
-                    "telemetry_data": ['speed', 'throttle', 'steer', 'brake', 'drs', 'surface_type',
-                                       'clutch', 'gear'],
-                }
-
-                filtered_data = {}
-                for packet_type, keys in cols.items():
-                    packet_data = data.get(packet_type, {})
-                    filtered_values = {key: packet_data.get(key, None) for key in keys}
-
-                    if filtered_values:
-                        filtered_data.update(filtered_values)
-
-                # Summing surface_type values for aggregation
-                filtered_data['surface_type'] = sum(filtered_data.get('surface_type', []))
+            for frame in self.collect_frames(datagrams):
                 # Uncomment the following line to throttle data collection
                 # time.sleep(0.33)
-                yield filtered_data
+                yield self.filter_frame(frame)
 
         except Exception as e:
             print("Data Collection Problem:", e)
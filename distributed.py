@@ -0,0 +1,773 @@
+import argparse
+import collections
+import hashlib
+import hmac
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import random
+import socket
+import struct
+import threading
+import time
+
+# Every message is a 4-byte big-endian payload length, the HMAC-SHA256 of the payload under the shared secret and
+# the pickled message dict
+_HEADER = struct.Struct('!I')
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+# The environment variable the shared secret is read from when none is given
+SECRET_ENV = 'F1NEAT_SECRET'
+
+# The largest payload accepted, so an unauthenticated peer cannot make the reader allocate without bound
+MAX_MESSAGE_SIZE = 64 << 20
+
+
+class AuthenticationError(ConnectionError):
+    """
+    Raised when a message does not carry a valid HMAC for the shared secret.
+    """
+
+
+def load_secret(secret=None):
+    """
+    Resolves the shared secret that authenticates messages between a coordinator and its workers.
+
+    Args:
+        secret (str or bytes, optional): The secret. Defaults to the SECRET_ENV environment variable.
+
+    Returns:
+        bytes: The secret.
+
+    Raises:
+        ValueError: If no secret is given and SECRET_ENV is not set.
+    """
+    secret = secret or os.environ.get(SECRET_ENV)
+    if not secret:
+        raise ValueError(f"Distributed evaluation needs a shared secret; pass one or set {SECRET_ENV}")
+    return secret.encode() if isinstance(secret, str) else secret
+
+
+def send_message(sock, message, secret):
+    """
+    Sends one message over a socket.
+
+    Messages are pickled and signed with the shared secret, so the receiver only unpickles messages from peers
+    that know the secret.
+
+    Args:
+        sock (socket.socket): The connected socket.
+        message (dict): The message, with its kind under 'type'.
+        secret (bytes): The shared secret.
+    """
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    digest = hmac.new(secret, payload, hashlib.sha256).digest()
+    sock.sendall(_HEADER.pack(len(payload)) + digest + payload)
+
+
+def _recv_exact(sock, size):
+    """
+    Reads exactly size bytes, or returns None if the connection closes first.
+    """
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock, secret):
+    """
+    Receives one message from a socket, checking its HMAC before unpickling it.
+
+    Args:
+        sock (socket.socket): The connected socket.
+        secret (bytes): The shared secret.
+
+    Returns:
+        dict or None: The message, or None if the connection was closed.
+
+    Raises:
+        AuthenticationError: If the message is too large or was not signed with the shared secret.
+    """
+    header = _recv_exact(sock, _HEADER.size + _DIGEST_SIZE)
+    if header is None:
+        return None
+    size = _HEADER.unpack_from(header)[0]
+    if size > MAX_MESSAGE_SIZE:
+        raise AuthenticationError(f"message of {size} bytes exceeds {MAX_MESSAGE_SIZE}")
+    payload = _recv_exact(sock, size)
+    if payload is None:
+        return None
+    if not hmac.compare_digest(header[_HEADER.size:], hmac.new(secret, payload, hashlib.sha256).digest()):
+        raise AuthenticationError("message signature does not match the shared secret")
+    return pickle.loads(payload)
+
+
+def parse_address(address):
+    """
+    Splits a HOST:PORT string.
+
+    Args:
+        address (str): The address, e.g. '192.168.0.10:5555'.
+
+    Returns:
+        tuple: The host and the port.
+    """
+    host, _, port = address.rpartition(':')
+    return host or 'localhost', int(port)
+
+
+class _WorkerConnection:
+    """
+    The coordinator's side of one connected worker.
+    """
+
+    def __init__(self, sock, address, secret):
+        self.sock = sock
+        self.secret = secret
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        self.lock = threading.Lock()  # Serializes sends from the scheduling thread
+        self.last_seen = time.perf_counter()
+        self.ready = False  # Set once the worker's hello has been handled
+        self.alive = True
+        self.task_id = None  # The task the worker is running, if any
+        self.completed = 0
+
+    def send(self, message):
+        with self.lock:
+            send_message(self.sock, message, self.secret)
+
+    def close(self):
+        self.alive = False
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class EvaluationCoordinator:
+    """
+    Dispatches genome evaluations to workers connected over TCP and gathers their results.
+
+    Each worker owns one evaluation backend, such as a game rig, a replay dataset or a track simulator, and runs
+    one task at a time. Workers may connect and disconnect at any time. A worker that closes its connection or
+    sends no heartbeat for heartbeat_timeout seconds is dropped and its task is sent to another worker, up to
+    max_retries times per task. Once no tasks are waiting, idle workers steal work by also running the task that
+    has been running longest; the first result wins and the other copy is cancelled.
+
+    Messages are pickled, so every message is signed with a secret shared with the workers and unsigned messages
+    drop the connection. The coordinator listens on the loopback interface unless given another host.
+
+    evaluate_many has the signature SuccessiveHalving.evaluate expects, so a coordinator can evaluate the rungs
+    of a generation.
+
+    Attributes:
+        host (str): The interface to listen on.
+        port (int): The port to listen on.
+        secret (bytes): The secret messages are signed with.
+        heartbeat_timeout (float): Seconds of silence after which a worker is dropped.
+        max_retries (int): The number of times a task is resent after its worker fails.
+        steal (bool): Whether idle workers duplicate the longest-running task.
+        worker_wait (float): Seconds to wait for any worker to connect while tasks are waiting.
+        generation (int or None): Sent with every task, so workers can label what they record.
+        workers (list of _WorkerConnection): The connected workers.
+        retries (int): The number of tasks resent after a worker failed.
+        steals (int): The number of tasks duplicated by idle workers.
+        dropped (int): The number of workers dropped.
+    """
+
+    def __init__(self, host='127.0.0.1', port=5555, heartbeat_timeout=5.0, max_retries=2, steal=True,
+                 worker_wait=60.0, secret=None):
+        """
+        Initializes the EvaluationCoordinator. Call start to begin accepting workers.
+
+        Args:
+            host (str): The interface to listen on. Workers on other machines need the address of a LAN interface,
+                        or '0.0.0.0' for all of them.
+            port (int): The port to listen on. 0 picks a free port, available as port after start.
+            heartbeat_timeout (float): Seconds of silence after which a worker is dropped.
+            max_retries (int): The number of times a task is resent after its worker fails.
+            steal (bool): Whether idle workers duplicate the longest-running task.
+            worker_wait (float): Seconds to wait for any worker to connect while tasks are waiting.
+            secret (str or bytes, optional): The secret shared with the workers. Defaults to the SECRET_ENV
+                                             environment variable.
+        """
+        self.host = host
+        self.port = port
+        self.secret = load_secret(secret)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries = max_retries
+        self.steal = steal
+        self.worker_wait = worker_wait
+        self.generation = None
+        self.workers = []
+        self.retries = 0
+        self.steals = 0
+        self.dropped = 0
+        self.events = queue.Queue()  # (worker, message) pairs from the connection threads
+        self.task_ids = itertools.count()
+        self.server = None
+
+    def start(self):
+        """
+        Starts listening for workers.
+        """
+        self.server = socket.create_server((self.host, self.port))
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        print(f"Evaluation coordinator listening on {self.host}:{self.port}")
+
+    def _accept_loop(self):
+        """
+        Accepts worker connections and starts a reader thread for each.
+        """
+        while True:
+            try:
+                sock, address = self.server.accept()
+            except OSError:
+                return  # The server socket was closed
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            worker = _WorkerConnection(sock, address, self.secret)
+            threading.Thread(target=self._read_loop, args=(worker,), daemon=True).start()
+
+    def _read_loop(self, worker):
+        """
+        Forwards a worker's messages to the scheduling thread, recording heartbeats as they arrive.
+        """
+        try:
+            while True:
+                message = recv_message(worker.sock, self.secret)
+                if message is None:
+                    break
+                worker.last_seen = time.perf_counter()
+                if message['type'] != 'heartbeat':
+                    self.events.put((worker, message))
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            print(f"Error reading from worker {worker.name}: {e}")
+        self.events.put((worker, {'type': 'disconnect'}))
+
+    def _drop(self, worker, tasks, pending):
+        """
+        Removes a failed worker and resends its task if no other copy of it is running.
+        """
+        if not worker.alive and worker not in self.workers:
+            return
+        print(f"Dropping worker {worker.name}")
+        worker.close()
+        if worker in self.workers:
+            self.workers.remove(worker)
+            self.dropped += 1
+        task = tasks.get(worker.task_id)
+        worker.task_id = None
+        if task is None or task['done']:
+            return
+        task['running'].pop(worker, None)
+        if task['running']:
+            return  # A stolen copy is still running
+        if task['attempts'] > self.max_retries:
+            raise RuntimeError(f"Evaluation of genome {task['genome_id']} failed {task['attempts']} times")
+        self.retries += 1
+        pending.appendleft(task['task_id'])
+
+    def _handle(self, worker, message, tasks, pending, results):
+        """
+        Applies one message from a worker to the state of the current evaluation.
+        """
+        kind = message['type']
+        if kind == 'hello':
+            worker.name = message.get('name') or worker.name
+            worker.ready = True
+            self.workers.append(worker)
+            print(f"Worker {worker.name} connected with the {message.get('backend', 'unknown')} backend")
+        elif kind == 'disconnect':
+            self._drop(worker, tasks, pending)
+        elif kind in ('result', 'error'):
+            if message['task_id'] == worker.task_id:
+                worker.task_id = None
+            task = tasks.get(message['task_id'])
+            if task is None or task['done']:
+                return  # A cancelled copy or a task from an earlier call
+            task['running'].pop(worker, None)
+            if kind == 'result':
+                task['done'] = True
+                worker.completed += 1
+                results[task['genome_id']] = message['result']
+                for other in task['running']:
+                    # Stop the other copies of a stolen task
+                    try:
+                        other.send({'type': 'cancel', 'task_id': task['task_id']})
+                    except OSError:
+                        pass
+            else:
+                print(f"Worker {worker.name} failed genome {task['genome_id']}: {message['error']}")
+                if not task['running']:
+                    if task['attempts'] > self.max_retries:
+                        raise RuntimeError(f"Evaluation of genome {task['genome_id']} failed "
+                                           f"{task['attempts']} times")
+                    self.retries += 1
+                    pending.appendleft(task['task_id'])
+
+    def _send_task(self, worker, task, budget, tasks, pending):
+        """
+        Sends a task to an idle worker, dropping the worker if the send fails.
+        """
+        worker.task_id = task['task_id']
+        task['running'][worker] = time.perf_counter()
+        task['attempts'] += 1
+        try:
+            worker.send({'type': 'task', 'task_id': task['task_id'], 'genome_id': task['genome_id'],
+                         'genome': task['genome'], 'budget': budget, 'generation': self.generation})
+        except OSError:
+            self._drop(worker, tasks, pending)
+
+    def _dispatch(self, budget, tasks, pending):
+        """
+        Hands waiting tasks to idle workers, then lets the remaining idle workers steal running tasks.
+        """
+        for worker in list(self.workers):
+            if worker.task_id is not None or not worker.alive:
+                continue
+            while pending and tasks[pending[0]]['done']:
+                pending.popleft()
+            if pending:
+                self._send_task(worker, tasks[pending.popleft()], budget, tasks, pending)
+            elif self.steal:
+                # Duplicate the task that has been running longest on a single worker
+                running = [task for task in tasks.values() if not task['done'] and len(task['running']) == 1]
+                if running:
+                    task = min(running, key=lambda task: min(task['running'].values()))
+                    self.steals += 1
+                    task['attempts'] -= 1  # A stolen copy is not a retry
+                    self._send_task(worker, task, budget, tasks, pending)
+
+    def _check_heartbeats(self, tasks, pending):
+        """
+        Drops workers that have been silent for longer than heartbeat_timeout.
+        """
+        now = time.perf_counter()
+        for worker in list(self.workers):
+            if now - worker.last_seen > self.heartbeat_timeout:
+                print(f"Worker {worker.name} missed its heartbeats")
+                self._drop(worker, tasks, pending)
+
+    def evaluate_many(self, genomes, budget):
+        """
+        Evaluates genomes on the connected workers.
+
+        Args:
+            genomes (list of tuple): The genome ID and genome pairs.
+            budget (float): The time budget of each evaluation in seconds.
+
+        Returns:
+            dict: The result each worker returned, by genome ID.
+        """
+        if self.server is None:
+            self.start()
+        tasks = {}
+        for genome_id, genome in genomes:
+            task_id = next(self.task_ids)
+            tasks[task_id] = {'task_id': task_id, 'genome_id': genome_id, 'genome': genome, 'attempts': 0,
+                              'running': {}, 'done': False}
+        pending = collections.deque(tasks)
+        results = {}
+        idle_since = time.perf_counter()
+
+        while len(results) < len(tasks):
+            self._dispatch(budget, tasks, pending)
+            try:
+                worker, message = self.events.get(timeout=min(1.0, self.heartbeat_timeout / 2))
+                self._handle(worker, message, tasks, pending, results)
+            except queue.Empty:
+                pass
+            self._check_heartbeats(tasks, pending)
+
+            if self.workers:
+                idle_since = time.perf_counter()
+            elif time.perf_counter() - idle_since > self.worker_wait:
+                raise RuntimeError(f"No evaluation workers connected for {self.worker_wait:.0f} s")
+        return results
+
+    def log(self):
+        """
+        Prints a one-line summary of the workers and the failures handled.
+        """
+        completed = ', '.join(f"{worker.name} {worker.completed}" for worker in self.workers)
+        print(f"{len(self.workers)} evaluation workers ({completed}), {self.retries} retries, {self.steals} steals, "
+              f"{self.dropped} dropped")
+
+    def close(self):
+        """
+        Tells the workers to shut down and stops listening.
+        """
+        for worker in self.workers:
+            try:
+                worker.send({'type': 'shutdown'})
+            except OSError:
+                pass
+            worker.close()
+        self.workers = []
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+
+class EvaluationWorker:
+    """
+    Connects to an EvaluationCoordinator and runs the tasks it sends through a backend.
+
+    The backend is called as backend(genome_id, genome, budget) and returns the result dict the coordinator
+    passes back to SuccessiveHalving. Heartbeats are sent from a separate thread, so long evaluations do not look
+    like a dead worker. Backends may check cancelled to stop a run whose result is no longer needed, and read
+    task for the rest of the task message, such as its generation.
+
+    Attributes:
+        address (tuple): The coordinator's host and port.
+        backend (callable): Evaluates one genome.
+        name (str): The name the coordinator knows the worker by.
+        secret (bytes): The secret messages are signed with.
+        heartbeat_interval (float): Seconds between heartbeats.
+        reconnect_delay (float): Seconds to wait before reconnecting after losing the coordinator.
+        task (dict or None): The task being run.
+        cancelled (threading.Event): Set when the coordinator cancels the task being run.
+    """
+
+    def __init__(self, address, backend, name=None, heartbeat_interval=1.0, reconnect_delay=2.0, secret=None):
+        """
+        Initializes the EvaluationWorker.
+
+        Args:
+            address (tuple or str): The coordinator's host and port, or a HOST:PORT string.
+            backend (callable): Called as backend(genome_id, genome, budget) to evaluate one genome.
+            name (str, optional): The name the coordinator knows the worker by. Defaults to the host name.
+            heartbeat_interval (float): Seconds between heartbeats.
+            reconnect_delay (float): Seconds to wait before reconnecting after losing the coordinator.
+            secret (str or bytes, optional): The secret shared with the coordinator. Defaults to the SECRET_ENV
+                                             environment variable.
+        """
+        self.address = parse_address(address) if isinstance(address, str) else address
+        self.backend = backend
+        self.name = name or socket.gethostname()
+        self.secret = load_secret(secret)
+        self.heartbeat_interval = heartbeat_interval
+        self.reconnect_delay = reconnect_delay
+        self.task = None
+        self.cancelled = threading.Event()
+        self.cancelled_tasks = set()
+        self.sock = None
+        self.lock = threading.Lock()
+
+    def send(self, message):
+        with self.lock:
+            send_message(self.sock, message, self.secret)
+
+    def run(self, reconnect=True):
+        """
+        Serves tasks until the coordinator sends shutdown.
+
+        Args:
+            reconnect (bool): Whether to keep reconnecting when the coordinator is unreachable or the connection
+                              drops, rather than returning.
+        """
+        while True:
+            try:
+                self.sock = socket.create_connection(self.address, timeout=10.0)
+            except OSError as e:
+                if not reconnect:
+                    raise
+                print(f"Error connecting to coordinator: {e}")
+                time.sleep(self.reconnect_delay)
+                continue
+            self.sock.settimeout(None)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self._serve() or not reconnect:
+                return
+            time.sleep(self.reconnect_delay)
+
+    def _heartbeat_loop(self, stop):
+        """
+        Sends heartbeats until stop is set or the connection fails.
+        """
+        while not stop.wait(self.heartbeat_interval):
+            try:
+                self.send({'type': 'heartbeat'})
+            except OSError:
+                return
+
+    def _read_loop(self, tasks):
+        """
+        Queues tasks and applies cancellations as they arrive. Queues None when the connection ends.
+        """
+        try:
+            while True:
+                message = recv_message(self.sock, self.secret)
+                if message is None or message['type'] == 'shutdown':
+                    tasks.put(message)
+                    return
+                if message['type'] == 'task':
+                    tasks.put(message)
+                elif message['type'] == 'cancel':
+                    self.cancelled_tasks.add(message['task_id'])
+                    if self.task is not None and self.task['task_id'] == message['task_id']:
+                        self.cancelled.set()
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            print(f"Error reading from coordinator: {e}")
+            tasks.put(None)
+
+    def _serve(self):
+        """
+        Runs tasks over one connection.
+
+        Returns:
+            bool: True if the coordinator sent shutdown, False if the connection was lost.
+        """
+        tasks = queue.Queue()
+        stop = threading.Event()
+        try:
+            self.send({'type': 'hello', 'name': self.name,
+                       'backend': getattr(self.backend, '__name__', type(self.backend).__name__)})
+        except OSError as e:
+            print(f"Error greeting coordinator: {e}")
+            return False
+        threading.Thread(target=self._heartbeat_loop, args=(stop,), daemon=True).start()
+        threading.Thread(target=self._read_loop, args=(tasks,), daemon=True).start()
+
+        try:
+            while True:
+                message = tasks.get()
+                if message is None or message['type'] == 'shutdown':
+                    return message is not None
+                self.task = message
+                self.cancelled.clear()
+                if message['task_id'] in self.cancelled_tasks:
+                    self.cancelled.set()
+                try:
+                    if self.cancelled.is_set():
+                        reply = {'type': 'result', 'task_id': message['task_id'], 'result': None}
+                    else:
+                        result = self.backend(message['genome_id'], message['genome'], message['budget'])
+                        reply = {'type': 'result', 'task_id': message['task_id'], 'result': result}
+                except Exception as e:
+                    print(f"Error evaluating genome {message['genome_id']}: {e}")
+                    reply = {'type': 'error', 'task_id': message['task_id'], 'error': repr(e)}
+                self.task = None
+                self.cancelled_tasks.discard(message['task_id'])
+                try:
+                    self.send(reply)
+                except OSError:
+                    return False
+        finally:
+            stop.set()
+            self.sock.close()
+
+
+def load_config(config_file='neat_config.cfg'):
+    """
+    Loads the NEAT configuration the way process_neat_process does, so workers decode genomes identically.
+
+    Args:
+        config_file (str): The NEAT configuration file.
+
+    Returns:
+        neat.Config: The NEAT configuration object.
+    """
+    import neat
+    from model_functions import ModelFunctions
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         config_file)
+    config.genome_config.add_activation("sig_soft_act", ModelFunctions.leaky_relu)
+    return config
+
+
+def simulator_backend(track_path, config, rate=10.0):
+    """
+    Builds a backend that drives genomes in a track simulator.
+
+    Args:
+        track_path (str): The track_simulator.py Track file.
+        config (neat.Config): The NEAT configuration object.
+        rate (float): The control rate in Hz.
+
+    Returns:
+        callable: The backend.
+    """
+    from features import FeatureBuilder
+    from model_functions import ModelFunctions
+    from networks import VECTOR_ACTIVATIONS
+    from track_simulator import Track, TrackSimulator, run_episode
+    model_functions = ModelFunctions(None)
+    VECTOR_ACTIVATIONS['sig_soft_act'] = model_functions.leaky_relu_batch
+    track_simulator = TrackSimulator(Track.load(track_path))
+    features = FeatureBuilder(num_inputs=config.genome_config.num_inputs)
+
+    def simulator(genome_id, genome, budget):
+        return run_episode(genome, config, track_simulator, model_functions, budget, rate, features)
+    return simulator
+
+
+def replay_backend(dataset_path, config):
+    """
+    Builds a backend that scores genomes against a recorded dataset with offline_evaluation.score_genomes.
+
+    The score stands in for the mean reward and the genome counts as surviving the whole budget.
+
+    Args:
+        dataset_path (str): The offline_evaluation.py OfflineDataset file.
+        config (neat.Config): The NEAT configuration object.
+
+    Returns:
+        callable: The backend.
+    """
+    from model_functions import ModelFunctions
+    from networks import VECTOR_ACTIVATIONS
+    from offline_evaluation import OfflineDataset, score_genomes
+    model_functions = ModelFunctions(None)
+    VECTOR_ACTIVATIONS['sig_soft_act'] = model_functions.leaky_relu_batch
+    dataset = OfflineDataset.load(dataset_path)
+
+    def replay(genome_id, genome, budget):
+        score = score_genomes([(genome_id, genome)], config, dataset, model_functions)[genome_id]
+        return {'mean_reward': score, 'elapsed': budget, 'ticks': len(dataset.inputs), 'budget': budget}
+    return replay
+
+
+class StandInBackend:
+    """
+    A backend for testing the protocol without the game or any recordings.
+
+    Each evaluation sleeps for a fraction of its budget and returns a reward derived from the genome's connection
+    weights, so repeated evaluations of a genome agree. It can be made to fail or hang to exercise retries,
+    heartbeats and work-stealing.
+
+    Attributes:
+        time_scale (float): Seconds slept per second of budget.
+        failure_rate (float): The probability of raising an error instead of returning a result.
+        hang_rate (float): The probability of sleeping hang_time seconds, or until cancelled, before returning.
+        hang_time (float): How long a hanging evaluation sleeps.
+        worker (EvaluationWorker or None): The worker running the backend, checked for cancellation.
+    """
+
+    __name__ = 'stand-in'
+
+    def __init__(self, time_scale=0.001, failure_rate=0.0, hang_rate=0.0, hang_time=30.0, seed=None):
+        """
+        Initializes the StandInBackend.
+
+        Args:
+            time_scale (float): Seconds slept per second of budget.
+            failure_rate (float): The probability of raising an error instead of returning a result.
+            hang_rate (float): The probability of an evaluation hanging.
+            hang_time (float): How long a hanging evaluation sleeps, unless cancelled.
+            seed (int, optional): Seeds the failures and hangs.
+        """
+        self.time_scale = time_scale
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.hang_time = hang_time
+        self.rng = random.Random(seed)
+        self.worker = None
+
+    def __call__(self, genome_id, genome, budget):
+        if self.rng.random() < self.failure_rate:
+            raise RuntimeError("stand-in failure")
+        delay = self.hang_time if self.rng.random() < self.hang_rate else budget * self.time_scale
+        if self.worker is not None:
+            self.worker.cancelled.wait(delay)
+        else:
+            time.sleep(delay)
+        weights = sum(connection.weight for connection in genome.connections.values() if connection.enabled)
+        return {'mean_reward': weights / (1 + len(genome.connections)), 'elapsed': budget, 'ticks': 0,
+                'budget': budget}
+
+
+def _run_stand_in(address, name, failure_rate, hang_rate, seed, secret):
+    """
+    Runs a stand-in worker process for the local command.
+    """
+    backend = StandInBackend(failure_rate=failure_rate, hang_rate=hang_rate, seed=seed)
+    worker = EvaluationWorker(address, backend, name=name, secret=secret)
+    backend.worker = worker
+    worker.run()
+
+
+def main():
+    """
+    Runs an evaluation worker, or a coordinator with local stand-in workers to test the protocol.
+    """
+    parser = argparse.ArgumentParser(description="Distributed genome evaluation.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    worker_parser = subparsers.add_parser('worker', help="Serve evaluations for a coordinator.")
+    worker_parser.add_argument('coordinator', help="The coordinator's HOST:PORT.")
+    backend = worker_parser.add_mutually_exclusive_group(required=True)
+    backend.add_argument('--simulator', metavar='TRACK', help="Drive genomes in a track_simulator.py track.")
+    backend.add_argument('--replay', metavar='DATASET', help="Score genomes against an offline dataset.")
+    backend.add_argument('--stand-in', action='store_true', help="Return stand-in results.")
+    worker_parser.add_argument('--config', default='neat_config.cfg', help="The NEAT configuration file.")
+    worker_parser.add_argument('--name', help="The name to report to the coordinator.")
+    worker_parser.add_argument('--secret', help=f"The secret shared with the coordinator. Defaults to {SECRET_ENV}, "
+                                                "which keeps it out of the process list.")
+
+    local_parser = subparsers.add_parser('local', help="Evaluate a random population on localhost stand-in workers.")
+    local_parser.add_argument('--workers', type=int, default=4)
+    local_parser.add_argument('--generations', type=int, default=2)
+    local_parser.add_argument('--failure-rate', type=float, default=0.05)
+    local_parser.add_argument('--hang-rate', type=float, default=0.02)
+    local_parser.add_argument('--config', default='neat_config.cfg', help="The NEAT configuration file.")
+    args = parser.parse_args()
+
+    if args.command == 'worker':
+        if args.stand_in:
+            backend = StandInBackend()
+        else:
+            config = load_config(args.config)
+            backend = simulator_backend(args.simulator, config) if args.simulator \
+                else replay_backend(args.replay, config)
+        worker = EvaluationWorker(args.coordinator, backend, name=args.name, secret=args.secret)
+        if args.stand_in:
+            backend.worker = worker
+        worker.run()
+        return
+
+    import neat
+    from evaluation import SuccessiveHalving
+    import secrets
+    config = load_config(args.config)
+    secret = secrets.token_bytes(32)  # Only the stand-in workers started here can connect
+    coordinator = EvaluationCoordinator(host='127.0.0.1', port=0, heartbeat_timeout=3.0, max_retries=5,
+                                        secret=secret)
+    coordinator.start()
+    processes = [multiprocessing.Process(target=_run_stand_in, daemon=True,
+                                         args=(('127.0.0.1', coordinator.port), f"stand-in-{index}",
+                                               args.failure_rate, args.hang_rate, index, secret))
+                 for index in range(args.workers)]
+    for process in processes:
+        process.start()
+
+    population = neat.Population(config)
+
+    def eval_genomes(genomes, config):
+        coordinator.generation = population.generation
+        start = time.perf_counter()
+        SuccessiveHalving(min_budget=15, max_budget=120, eta=3).evaluate(genomes,
+                                                                          evaluate_many=coordinator.evaluate_many)
+        print(f"Generation evaluated in {time.perf_counter() - start:.1f} s")
+        coordinator.log()
+
+    try:
+        population.run(eval_genomes, args.generations)
+    finally:
+        coordinator.close()
+        for process in processes:
+            process.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+import hashlib
+import json
+import math
+import os
+
+
+def budget_invariant_fitness(mean_reward, elapsed, budget, max_budget):
+    """
+    Scores a run so that runs with different time budgets are comparable.
+
+    The original fitness is mean_reward + 0.1 * elapsed over a full-length run. Here the survival bonus is based
+    on the fraction of the budget the genome survived, scaled to the full budget, so surviving a short run scores
+    the same bonus as surviving a full one.
+
+    Args:
+        mean_reward (float): The mean reward over the run.
+        elapsed (float): Seconds the genome drove before the run ended.
+        budget (float): The run's time budget in seconds.
+        max_budget (float): The full time budget in seconds.
+
+    Returns:
+        float: The fitness.
+    """
+    return mean_reward + 0.1 * min(elapsed / budget, 1.0) * max_budget
+
+
+class SuccessiveHalving:
+    """
+    Evaluates a generation in rungs of increasing time budget, promoting only the best genomes to longer runs.
+
+    Every genome first drives for min_budget seconds. After each rung the top 1 / eta of the genomes by fitness
+    are driven again with eta times the budget, up to max_budget. Fitness uses budget_invariant_fitness, so
+    genomes eliminated early keep scores comparable with those that ran to the end. A genome promoted past a
+    rung can still score less on its longer run, e.g. by crashing late, than a genome it beat scored on the
+    short one, so the genomes eliminated at each rung are shifted to rank below every genome promoted past it,
+    keeping their order within the rung.
+
+    Promoted genomes are driven again from the start, so when max_budget is below eta times min_budget the extra
+    rungs would cost more than they save. There is then a single rung and every genome gets the full budget.
+
+    Attributes:
+        min_budget (float): The budget of the first rung in seconds.
+        max_budget (float): The budget of the last rung in seconds.
+        eta (int): The factor the budget grows and the field shrinks by between rungs.
+        history (list of dict): The budget, genome count and best fitness of every rung run.
+    """
+
+    def __init__(self, min_budget, max_budget, eta=3):
+        """
+        Initializes SuccessiveHalving.
+
+        Args:
+            min_budget (float): The budget of the first rung in seconds.
+            max_budget (float): The budget of the last rung in seconds.
+            eta (int): The factor the budget grows and the field shrinks by between rungs. Must be at least 2.
+        """
+        if eta < 2:
+            raise ValueError("eta must be at least 2")
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.eta = eta
+        self.history = []
+
+    def budgets(self):
+        """
+        The budget of each rung.
+
+        Returns:
+            list of float: The rung budgets in seconds, ending with max_budget.
+        """
+        if self.max_budget < self.eta * self.min_budget:
+            return [self.max_budget]
+        budgets = []
+        budget = self.min_budget
+        while budget < self.max_budget:
+            budgets.append(budget)
+            budget *= self.eta
+        budgets.append(self.max_budget)
+        return budgets
+
+    def evaluate(self, genomes, evaluate=None, evaluate_many=None):
+        """
+        Evaluates a generation and sets every genome's fitness.
+
+        Args:
+            genomes (list of tuple): The genome ID and genome pairs of the generation.
+            evaluate (callable, optional): Called as evaluate(genome_id, genome, budget) to drive a genome for up
+                                           to budget seconds. Returns a dict holding at least the run's
+                                           mean_reward and elapsed time.
+            evaluate_many (callable, optional): Called as evaluate_many(genomes, budget) to run a whole rung at
+                                                once, e.g. in parallel. Returns the result of each genome by
+                                                genome ID. Used instead of evaluate when given.
+
+        Returns:
+            dict: The last result of each genome, by genome ID.
+        """
+        results = {}
+        candidates = list(genomes)
+        budgets = self.budgets()
+        eliminated = []  # The genomes dropped after each rung, best first
+
+        for rung, budget in enumerate(budgets):
+            if not candidates:
+                break
+            if evaluate_many is not None:
+                rung_results = evaluate_many(candidates, budget)
+            else:
+                rung_results = dict((genome_id, evaluate(genome_id, genome, budget))
+                                    for genome_id, genome in candidates)
+            for genome_id, genome in candidates:
+                result = rung_results[genome_id]
+                genome.fitness = budget_invariant_fitness(result['mean_reward'], result['elapsed'], budget,
+                                                          self.max_budget)
+                results[genome_id] = result
+
+            candidates.sort(key=lambda pair: pair[1].fitness, reverse=True)
+            self.history.append({'budget': budget, 'genomes': len(candidates), 'best': candidates[0][1].fitness})
+            print(f"Rung {rung + 1}/{len(budgets)}: {len(candidates)} genomes at {budget:.0f} s, "
+                  f"best fitness {candidates[0][1].fitness:.2f}")
+            promoted = math.ceil(len(candidates) / self.eta) if rung < len(budgets) - 1 else len(candidates)
+            eliminated.append(candidates[promoted:])
+            candidates = candidates[:promoted]
+
+        # Working back from the last rung, shift each rung's eliminated genomes below the lowest fitness of the
+        # genomes that got further
+        floor = min((genome.fitness for _, genome in candidates), default=None)
+        for dropped in reversed(eliminated):
+            if not dropped:
+                continue
+            if floor is not None:
+                shift = min(0.0, floor - 1.0 - dropped[0][1].fitness)
+                for _, genome in dropped:
+                    genome.fitness += shift
+            floor = dropped[-1][1].fitness
+        return results
+
+
+def fingerprint(*parts):
+    """
+    Hashes whatever determines what a fitness value means, such as the NEAT config file and the reward function
+    source, so cached fitness from a different setup is not reused.
+
+    Args:
+        *parts (str or bytes): The parts to hash, in order.
+
+    Returns:
+        str: The hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        part = part.encode() if isinstance(part, str) else part
+        digest.update(len(part).to_bytes(8, 'little'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def genome_hash(genome):
+    """
+    Hashes the parts of a genome that determine its network.
+
+    Nodes and enabled connections are serialized in key order with exact float representations, so equal
+    networks hash equally regardless of genome key, innovation history or disabled connections.
+
+    Args:
+        genome (neat.DefaultGenome): The genome.
+
+    Returns:
+        str: The hex SHA-256 digest.
+    """
+    nodes = [[key, node.bias.hex(), node.response.hex(), node.activation, node.aggregation]
+             for key, node in sorted(genome.nodes.items())]
+    connections = [[list(key), connection.weight.hex()]
+                   for key, connection in sorted(genome.connections.items()) if connection.enabled]
+    canonical = json.dumps([nodes, connections], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class FitnessCache:
+    """
+    A persistent record of the runs of every evaluated genome, keyed by genome_hash.
+
+    Genomes whose network has already been driven enough times recently get their fitness from the cache instead
+    of driving again. Runs are stored as results rather than fitness values, so cached fitness is recomputed with
+    budget_invariant_fitness against the current generation's full budget. Only runs of a generation's full budget
+    are stored: a genome eliminated in an early successive halving rung has not earned the rank a rescaled short
+    run would give it, so it is driven again instead.
+
+    The file records a fingerprint of the setup the runs were measured under, and is ignored when it does not
+    match. Entries last evaluated in a later generation than the current one are stale too, as they come from an
+    earlier run that got further before the population restarted at generation 0.
+
+    Attributes:
+        path (str or None): The JSON file the cache is loaded from and saved to, if any.
+        fingerprint (str or None): The fingerprint of the current setup, from fingerprint.
+        reuse (bool): Whether cached results are used at all.
+        evaluations (int): The number of runs a genome needs before its cached fitness is used. Fitness is the
+                           mean over its last evaluations runs.
+        max_age (int or None): The number of generations after its last run that an entry stays valid.
+        entries (dict): The runs and last evaluated generation of every genome, by hash.
+        hits (int): The number of genomes scored from the cache.
+    """
+
+    def __init__(self, path=None, reuse=True, evaluations=1, max_age=None, fingerprint=None):
+        """
+        Initializes the FitnessCache, loading it from path if the file exists and was saved with the same
+        fingerprint.
+
+        Args:
+            path (str, optional): The JSON file to persist the cache to.
+            reuse (bool): Whether cached results are used at all.
+            evaluations (int): The number of runs a genome needs before its cached fitness is used.
+            max_age (int, optional): The number of generations after its last run that an entry stays valid.
+                                     Defaults to no limit.
+            fingerprint (str, optional): The fingerprint of the current setup, from fingerprint.
+        """
+        self.path = path
+        self.reuse = reuse
+        self.evaluations = evaluations
+        self.max_age = max_age
+        self.fingerprint = fingerprint
+        self.entries = {}
+        self.hits = 0
+        if path is not None and os.path.exists(path):
+            with open(path) as file:
+                saved = json.load(file)
+            if saved.get('fingerprint') == fingerprint and 'entries' in saved:
+                self.entries = saved['entries']
+            else:
+                print(f"Ignoring {path}: it was saved with a different config or reward function")
+
+    def _stale(self, entry, generation):
+        if entry['generation'] > generation:
+            return True  # Left by an earlier run
+        return self.max_age is not None and generation - entry['generation'] > self.max_age
+
+    def lookup(self, genome, generation, max_budget):
+        """
+        Finds the cached fitness of a genome.
+
+        Args:
+            genome (neat.DefaultGenome): The genome.
+            generation (int): The current generation.
+            max_budget (float): The current generation's full time budget in seconds.
+
+        Returns:
+            float or None: The mean fitness of the genome's cached runs, or None if it needs to be evaluated.
+        """
+        entry = self.entries.get(genome_hash(genome))
+        if not self.reuse or entry is None or self._stale(entry, generation) \
+                or len(entry['results']) < self.evaluations:
+            return None
+        fitnesses = [budget_invariant_fitness(result['mean_reward'], result['elapsed'], result['budget'], max_budget)
+                     for result in entry['results']]
+        return sum(fitnesses) / len(fitnesses)
+
+    def split(self, genomes, generation, max_budget):
+        """
+        Scores the genomes that can be taken from the cache.
+
+        Args:
+            genomes (list of tuple): The genome ID and genome pairs of the generation.
+            generation (int): The current generation.
+            max_budget (float): The current generation's full time budget in seconds.
+
+        Returns:
+            list of tuple: The genome ID and genome pairs that still need to be evaluated.
+        """
+        pending = []
+        for genome_id, genome in genomes:
+            fitness = self.lookup(genome, generation, max_budget)
+            if fitness is None:
+                pending.append((genome_id, genome))
+            else:
+                genome.fitness = fitness
+                self.hits += 1
+        return pending
+
+    def store(self, genome, result, generation, max_budget=None):
+        """
+        Records a run of a genome if it had the full budget.
+
+        Args:
+            genome (neat.DefaultGenome): The genome.
+            result (dict): The run's mean_reward, elapsed time and budget.
+            generation (int): The generation the run belongs to.
+            max_budget (float, optional): The generation's full time budget in seconds. Runs with a shorter
+                                          budget are not stored. Defaults to storing every run.
+        """
+        if max_budget is not None and result['budget'] < max_budget:
+            return
+        key = genome_hash(genome)
+        entry = self.entries.get(key)
+        if entry is None or self._stale(entry, generation):
+            entry = self.entries[key] = {'results': []}
+        entry['generation'] = generation
+        entry['results'].append({'mean_reward': result['mean_reward'], 'elapsed': result['elapsed'],
+                                 'budget': result['budget']})
+        del entry['results'][:-self.evaluations]
+
+    def save(self, generation=None):
+        """
+        Writes the cache to path, dropping entries that have aged out.
+
+        Args:
+            generation (int, optional): The current generation, used to drop stale entries.
+        """
+        if generation is not None:
+            self.entries = dict((key, entry) for key, entry in self.entries.items()
+                                if not self._stale(entry, generation))
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as file:
+            json.dump({'fingerprint': self.fingerprint, 'entries': self.entries}, file)
+        os.replace(temporary, self.path)
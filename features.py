@@ -0,0 +1,110 @@
+import math
+import numpy as np
+
+# Network inputs in input node order as (field, offset, scale) tuples; each input is (value - offset) / scale.
+# The order matches the telemetry columns of DataProcessor.cols followed by ScreenProcessor.fields.
+INPUT_SCHEMA = [
+    # Lap data
+    ('last_lap_time_ms', 0.0, 120000.0),
+    ('current_lap_time_ms', 0.0, 120000.0),
+    ('lap_distance', 0.0, 7000.0),
+    ('current_lap_invalid', 0.0, 1.0),
+    # Car motion
+    ('world_position_x', 0.0, 1000.0),
+    ('world_position_y', 0.0, 1000.0),
+    ('world_position_z', 0.0, 1000.0),
+    ('world_velocity_x', 0.0, 100.0),
+    ('world_velocity_y', 0.0, 100.0),
+    ('world_velocity_z', 0.0, 100.0),
+    ('world_forward_dir_x', 0.0, 32767.0),  # Normalised int16 vectors
+    ('world_forward_dir_y', 0.0, 32767.0),
+    ('world_forward_dir_z', 0.0, 32767.0),
+    ('world_right_dir_x', 0.0, 32767.0),
+    ('world_right_dir_y', 0.0, 32767.0),
+    ('world_right_dir_z', 0.0, 32767.0),
+    ('g_force_lateral', 0.0, 5.0),
+    ('g_force_longitudinal', 0.0, 5.0),
+    ('g_force_vertical', 0.0, 5.0),
+    ('yaw', 0.0, math.pi),
+    ('pitch', 0.0, math.pi),
+    ('roll', 0.0, math.pi),
+    # Car telemetry
+    ('speed', 0.0, 350.0),
+    ('throttle', 0.0, 1.0),
+    ('steer', 0.0, 1.0),
+    ('brake', 0.0, 1.0),
+    ('drs', 0.0, 1.0),
+    ('surface_type', 0.0, 10.0),  # Summed over the four wheels
+    ('clutch', 0.0, 100.0),
+    ('gear', 0.0, 8.0),
+    # Screen
+    ('left', 0.0, 1.0),
+    ('right', 0.0, 1.0),
+    ('midleft', 0.0, 1.0),
+    ('midright', 0.0, 1.0),
+]
+
+
+class FeatureBuilder:
+    """
+    Builds the network input vector from a merged telemetry and screen frame according to a fixed schema.
+
+    Inputs are looked up by name, so they do not depend on dictionary order, and are written into one reused
+    buffer. The schema is checked against the network and the available fields up front, so a change to
+    DataProcessor.cols or ScreenProcessor.fields fails immediately instead of silently shifting the inputs.
+
+    Attributes:
+        names (list of str): The field of each input, in input node order.
+        offsets (np.ndarray): The value subtracted from each field.
+        scales (np.ndarray): The value each field is divided by after the offset is subtracted.
+        buffer (np.ndarray): The input vector, overwritten by every build.
+    """
+
+    def __init__(self, schema=INPUT_SCHEMA, num_inputs=None, fields=None):
+        """
+        Initializes the FeatureBuilder and validates its schema.
+
+        Args:
+            schema (list of tuple): The (field, offset, scale) of each input, in input node order.
+            num_inputs (int, optional): The number of network inputs, e.g. config.genome_config.num_inputs.
+            fields (iterable of str, optional): Every field the frames provide. When given, the schema must use
+                                                exactly these fields.
+
+        Raises:
+            ValueError: If the schema does not match num_inputs or fields.
+        """
+        self.names = [name for name, _, _ in schema]
+        self.offsets = np.array([offset for _, offset, _ in schema], dtype=np.float64)
+        self.scales = np.array([scale for _, _, scale in schema], dtype=np.float64)
+        self.buffer = np.zeros(len(self.names))
+
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Input schema lists a field more than once")
+        if num_inputs is not None and num_inputs != len(self.names):
+            raise ValueError(f"Input schema has {len(self.names)} features but the network expects {num_inputs}")
+        if fields is not None:
+            fields = list(fields)
+            missing = [name for name in self.names if name not in fields]
+            unused = [field for field in fields if field not in self.names]
+            if missing or unused:
+                raise ValueError(f"Input schema does not match the frame fields: missing {missing}, unused {unused}")
+
+    def build(self, frame):
+        """
+        Fills the input vector from a frame.
+
+        Args:
+            frame (dict): The merged telemetry and screen data, holding every schema field.
+
+        Returns:
+            np.ndarray: The normalized inputs. The buffer is reused, so copy it to keep the values.
+
+        Raises:
+            KeyError: If the frame is missing a schema field.
+        """
+        buffer = self.buffer
+        for index, name in enumerate(self.names):
+            buffer[index] = frame[name]
+        buffer -= self.offsets
+        buffer /= self.scales
+        return buffer
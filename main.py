@@ -3,162 +3,315 @@ import os
 import multiprocessing
 import atexit
 import sys
+import argparse
+import inspect
 from bson import ObjectId
-import numpy as np
-import vgamepad as vg
 from model_functions import ModelFunctions
-from data_processing import DataProcessor
+from data_processing import DataProcessor, CollectorStats
 from CV import ScreenProcessor
-import keyboard
 from db import MongoDB
+from shared_channel import SharedFrameChannel
+from metrics import RewardAccumulator
+from scheduler import FixedRateScheduler
+from evaluation import SuccessiveHalving, FitnessCache, fingerprint
+from reset_coordinator import ResetCoordinator
+from offline_evaluation import OfflineEvaluator
+from track_simulator import SimulatorEvaluator
+from distributed import EvaluationCoordinator, EvaluationWorker, parse_address, SECRET_ENV
+from alignment import StreamAligner
+from networks import NetworkCache, VECTOR_ACTIVATIONS
+from features import FeatureBuilder
 
-from plotting import App
-from PyQt5.QtWidgets import QApplication
 import neat
 
+# Evaluation modes that score genomes without the game, so they need no gamepad, database or capture processes
+HEADLESS_EVALUATIONS = ('offline', 'simulator')
+
 def cleanup_processes(collect, screen, neat):
     """
     Terminate the given processes and perform cleanup.
 
     Args:
-        collect (multiprocessing.Process): The process collecting packet data.
-        screen (multiprocessing.Process): The process processing screen data.
+        collect (multiprocessing.Process or None): The process collecting packet data, None when headless.
+        screen (multiprocessing.Process or None): The process processing screen data, None when headless.
         neat (multiprocessing.Process): The process running the NEAT algorithm.
     """
     print("Cleaning up processes...")
-    collect.terminate()  # Terminate the packet collection process
-    screen.terminate()   # Terminate the screen processing process
-    neat.terminate()     # Terminate the NEAT algorithm process
+    for process in (collect, screen, neat):
+        if process is not None:
+            process.terminate()  # Terminate the packet collection, screen processing and NEAT processes
 
-def collect_packet_process(result_queue, data_processor):
+def collect_packet_process(telemetry_channel, data_processor, stats_channel=None):
     """
-    Process to collect packet data from the DataProcessor and put it into a queue.
+    Process to collect packet data from the DataProcessor and publish the latest frame to a shared channel.
 
     Args:
-        result_queue (multiprocessing.Queue): The queue to put collected data into.
+        telemetry_channel (SharedFrameChannel): The channel the latest telemetry frame is written to.
         data_processor (DataProcessor): The instance of DataProcessor to collect packet data.
+        stats_channel (SharedFrameChannel, optional): The channel the collector stats are published to about once
+                                                      a second, with CollectorStats.fields.
     """
+    published = 0.0  # When the collector stats were last published
     while True:
-        # Collect game data from DataProcessor and put it into the result queue
-        for game_data in data_processor.collect_packet():
-            result_queue.put(game_data)
-            # Maintain a maximum queue size to avoid excessive memory usage
-            if result_queue.qsize() == 99:
-                result_queue.get()
-
-def process_screen_process(result_queue, screen_processor):
+        try:
+            # Collect game data from DataProcessor and overwrite the latest frame, stamped with the time its
+            # last packet arrived
+            for frame in data_processor.collect_frames():
+                game_data = data_processor.filter_frame(frame)
+                game_data['session_time'] = frame['session_time']  # Lets resets detect when the game is running
+                telemetry_channel.write(game_data, frame['received_at'])
+                if stats_channel is not None and frame['received_at'] - published >= 1.0:
+                    stats_channel.write_values(data_processor.stats.values())
+                    published = frame['received_at']
+        except Exception as e:
+            # Collection restarts on the same bound socket
+            print("Data Collection Problem:", e)
+
+def process_screen_process(screen_channel, screen_processor):
     """
-    Process to capture and process screen data from ScreenProcessor and put it into a queue.
+    Process to capture and process screen data from ScreenProcessor and publish the latest result to a shared
+    channel.
 
     Args:
-        result_queue (multiprocessing.Queue): The queue to put screen data into.
+        screen_channel (SharedFrameChannel): The channel the latest screen data is written to.
         screen_processor (ScreenProcessor): The instance of ScreenProcessor to process screen data.
     """
     while True:
         try:
-            # Capture and process a single frame from the screen
+            # Capture and process a single frame from the screen, stamped with the time capture started
+            captured_at = time.perf_counter()
             screen_data = screen_processor.process_frame()
-            result_queue.put(screen_data)
-            # Maintain a maximum queue size to avoid excessive memory usage
-            if result_queue.qsize() == 99:
-                result_queue.get()
+            if screen_data is not None:
+                screen_channel.write(screen_data, captured_at)
         except Exception as e:
             print(f"Error in process_screen_process: {e}")
 
-def process_neat_process(result_queue_neat, result_queue_collect, result_queue_screen):
+def process_neat_process(result_queue_neat, telemetry_channel, screen_channel, evaluation='live', dataset_path=None,
+                         track_path=None, listen_address=None, worker_address=None, stats_channel=None,
+                         secret=None):
     """
     Process to run the NEAT algorithm, evaluating genomes and interacting with the game.
 
     Args:
         result_queue_neat (multiprocessing.Queue): The queue to put NEAT results into.
-        result_queue_collect (multiprocessing.Queue): The queue containing collected game data.
-        result_queue_screen (multiprocessing.Queue): The queue containing screen data.
+        telemetry_channel (SharedFrameChannel): The channel holding the latest collected game data.
+        screen_channel (SharedFrameChannel): The channel holding the latest screen data.
+        evaluation (str): 'live' drives every genome in the game, 'offline' scores genomes against the recorded
+                          dataset only, 'prescreen' scores them offline and drives only the best quarter, and
+                          'simulator' drives them in parallel track simulators instead of the game, and
+                          'distributed' sends them to the evaluation workers connected to listen_address.
+        dataset_path (str, optional): The OfflineDataset file used by the offline and prescreen modes.
+        track_path (str, optional): The Track file used by the simulator mode.
+        listen_address (str, optional): The HOST:PORT the distributed mode's coordinator listens on.
+        worker_address (str, optional): The HOST:PORT of a coordinator. When given, this process drives the
+                                        genomes the coordinator sends instead of running NEAT itself.
+        stats_channel (SharedFrameChannel, optional): The channel the collector publishes its stats to, logged
+                                                      after every generation.
+        secret (str, optional): The secret shared between the distributed coordinator and its workers. Defaults
+                                to the F1NEAT_SECRET environment variable.
     """
+    telemetry_sequence = 0  # Sequence number of the last telemetry frame acted on
+    aligner = StreamAligner(screen_channel)  # Pairs telemetry frames with the nearest screen result
+    scheduler = FixedRateScheduler(rate=10.0)  # Runs the control loop at a fixed rate
+    generation = None  # The generation being evaluated
+    pop_nums = {}  # The position of each genome in its generation
+
+    def evaluate_genome(genome_id, genome, run_time, stop=None):
+        """
+        Drive the game with one genome for up to run_time seconds.
+
+        Args:
+            genome_id (int): The genome ID.
+            genome (neat.DefaultGenome): The genome to evaluate.
+            run_time (float): The time budget in seconds.
+            stop (threading.Event, optional): Ends the run early when set.
+
+        Returns:
+            dict: The mean reward, the elapsed time, the number of control ticks and the time budget.
+        """
+        nonlocal telemetry_sequence
+        rewards = RewardAccumulator()  # Running reward statistics of this evaluation
+        data = None
+        # Compile the genome once per evaluation, reusing the network of a surviving genome
+        individual = networks.get(genome_id, genome, config)
+        start_time = time.time()  # Record the start time
+        scheduler.start()  # The first tick is due now
+
+        while time.time() - start_time <= run_time and rewards.mean >= -2 and not (stop and stop.is_set()):
+            it_time = time.time()  # Record iteration time
+            if not mf.is_window_open():  # Ensure the game window is open
+                mf.unminimize_window()
+
+            try:
+                # Wait for a telemetry frame newer than the last one acted on, then join it with the screen
+                # result captured closest to it, skipping the frame if none is close enough
+                telemetry_channel.wait(telemetry_sequence)
+                telemetry_sequence, telemetry_time, game_data = telemetry_channel.read_dict()
+                aligned = aligner.align(telemetry_time)
+                if aligned is None:
+                    scheduler.wait()  # A skipped frame still ends its tick, so the loop keeps to the control rate
+                    continue
+                screen_data, screen_offset = aligned
+                game_data.update(screen_data)  # Combine game data with screen data
+                output = individual.activate(features.build(game_data))  # Compute output using the neural network
+                action = [mf.action_head(output[0])]  # Map the output to speed and steering actions
+                press = mf.perform_action(action)  # Perform the action in the game
+                rewards.add(mf.calculate_reward(game_data))  # Calculate and accumulate reward
+
+                # Update game data with additional information
+                game_data.update({
+                    'steer_action': press[0][0],
+                    "steer_prop": press[0][1],
+                    "steer_intensity": press[0][2],
+                    'speed_action': press[1][0],
+                    "speed_prop": press[1][1],
+                    "speed_intensity": press[1][2],
+                    'reward': rewards.mean,
+                    'reward_ewma': rewards.ewma,
+                    'elapsed_time': time.time() - start_time,
+                    'screen_offset': screen_offset
+                })
+                data = {"_id": ObjectId(), "generation": generation, 'genome_id': genome_id,
+                        "pop_num": pop_nums.get(genome_id),
+                        **game_data}
+                data_collection.insert_document(data)  # Insert data into MongoDB
+                result_queue_neat.put(data)  # Put data into the NEAT results queue
+
+                # Maintain a maximum queue size to avoid excessive memory usage
+                if result_queue_neat.qsize() == 5:
+                    result_queue_neat.get()
+
+                # Ensure the agent stays within deviation limits and handles special cases
+                if mf.within_deviation(data):
+                    mf.escape_pits()
+                scheduler.wait()  # Wait for the next tick's deadline
+
+            except Exception as e:
+                print(f"Error in main neat loop: {e}")
+                break
+        else:
+            if data is not None and not mf.within_deviation(data):
+                # Handle cases where the agent is not within deviation limits
+                mf.reset_world(timeout=10)
+
+        return {'mean_reward': rewards.mean, 'elapsed': time.time() - start_time, 'ticks': rewards.count,
+                'budget': run_time}
+
+    def drive_genome(genome_id, genome, budget):
+        """
+        Drive one genome sent by an evaluation coordinator, in worker mode.
+
+        Args:
+            genome_id (int): The genome ID.
+            genome (neat.DefaultGenome): The genome to evaluate.
+            budget (float): The time budget in seconds.
+
+        Returns:
+            dict: The result of evaluate_genome.
+        """
+        nonlocal generation
+        generation = worker.task.get('generation')
+        networks.prune([(genome_id, genome)])  # Only keep the network of the genome being driven
+        return evaluate_genome(genome_id, genome, budget, stop=worker.cancelled)
+
     def eval_genomes(genomes, config):
         """
         Evaluate NEAT genomes and update their fitness.
 
+        Genomes are evaluated with successive halving: every genome gets a short run first and only the best
+        are promoted to longer runs, up to the generation's full run time.
+
         Args:
             genomes (list of tuple): A list of genome ID and genome pairs.
             config (neat.Config): The NEAT configuration object.
         """
-        pop = 0
-
-        for genome_id, genome in genomes:
-            total_reward = [0]  # Initialize list to keep track of total rewards
-            pop += 1
-            start_time = time.time()  # Record the start time
-            run_time = 15 + (p.generation * 5) if p.generation < 20 else 120  # Set runtime based on generation
-
-            while time.time() - start_time <= run_time and np.mean(total_reward) >= -2:
-                it_time = time.time()  # Record iteration time
-                if not mf.is_window_open():  # Ensure the game window is open
-                    mf.unminimize_window()
-
-                try:
-                    # Create a neural network from the genome
-                    individual = neat.nn.RecurrentNetwork.create(genome, config)
-                    screen_data = result_queue_screen.get()  # Retrieve screen data from the queue
-                    game_data = result_queue_collect.get()  # Retrieve game data from the queue
-                    game_data.update(screen_data)  # Combine game data with screen data
-                    action = individual.activate(list(game_data.values()))  # Compute action using the neural network
-                    press = mf.perform_action(action)  # Perform the action in the game
-                    total_reward.append(mf.calculate_reward(game_data))  # Calculate and append reward
-
-                    # Update game data with additional information
-                    game_data.update({
-                        'steer_action': press[0][0],
-                        "steer_prop": press[0][1],
-                        "steer_intensity": press[0][2],
-                        'speed_action': press[1][0],
-                        "speed_prop": press[1][1],
-                        "speed_intensity": press[1][2],
-                        'reward': np.mean(total_reward),
-                        'elapsed_time': time.time() - start_time
-                    })
-                    data = {"_id": ObjectId(), "generation": p.generation, 'genome_id': genome_id,
-                            "pop_num": pop,
-                            **game_data}
-                    data_collection.insert_document(data)  # Insert data into MongoDB
-                    result_queue_neat.put(data)  # Put data into the NEAT results queue
-
-                    # Maintain a maximum queue size to avoid excessive memory usage
-                    if result_queue_neat.qsize() == 5:
-                        result_queue_neat.get()
-
-                    # Ensure the agent stays within deviation limits and handles special cases
-                    if mf.within_deviation(data):
-                        mf.escape_pits()
-                    time.sleep(0.1)  # Small delay to avoid overloading the system
-
-                except Exception as e:
-                    print(f"Error in main neat loop: {e}")
-                    break
-            else:
-                # Set the fitness of the genome based on rewards and elapsed time
-                genome.fitness = np.mean(total_reward) + ((time.time() - start_time) * 0.1)
-                if not mf.within_deviation(data):
-                    # Handle cases where the agent is not within deviation limits
-                    keyboard.press('esc')
-                    time.sleep(0.3)
-                    keyboard.release('esc')
-                    time.sleep(0.3)
-                    keyboard.press('enter')
-                    time.sleep(0.3)
-                    keyboard.release('enter')
-                    time.sleep(10)
-
-    # Initialize gamepad and model functions
-    gamepad = vg.VX360Gamepad()
-    mf = ModelFunctions(gamepad)
-
-    # Initialize MongoDB connection
-    data_collection = MongoDB(host='localhost', port=27017, db_name='Goatifi', collection_name=f"Goatifi")
+        nonlocal aligner, scheduler, generation, pop_nums
+        aligner = StreamAligner(screen_channel)  # Pairs telemetry frames with the nearest screen result
+        networks.prune(genomes)  # Forget the networks of genomes that did not survive
+        scheduler = FixedRateScheduler(rate=10.0)  # Runs the control loop at a fixed rate
+        generation = p.generation
+        pop_nums = dict((genome_id, pop) for pop, (genome_id, _) in enumerate(genomes, start=1))
+
+        run_time = 15 + (p.generation * 5) if p.generation < 20 else 120  # Set runtime based on generation
+        # Take the fitness of already driven networks from the cache and evaluate the rest
+        pending = fitness_cache.split(genomes, p.generation, run_time)
+        print(f"{len(genomes) - len(pending)} of {len(genomes)} genomes scored from the fitness cache")
+        rejected = []
+        if evaluation == 'prescreen' and pending:
+            # Only drive the genomes that score best against the recorded sessions
+            pending, rejected, scores = offline.prescreen(pending, fraction=0.25)
+        # Score every remaining genome on a short run, then promote the best to longer runs, on the connected
+        # rigs in distributed mode
+        halving = SuccessiveHalving(min_budget=15, max_budget=run_time, eta=3)
+        if evaluation == 'distributed':
+            coordinator.generation = p.generation
+            results = halving.evaluate(pending, evaluate_many=coordinator.evaluate_many)
+            coordinator.log()
+        else:
+            results = halving.evaluate(pending, evaluate_genome)
+        for genome_id, genome in pending:
+            # Only the genomes that reached the last rung have a full-length run to cache
+            fitness_cache.store(genome, results[genome_id], p.generation, max_budget=run_time)
+        fitness_cache.save(p.generation)
+
+        if rejected:
+            # Genomes rejected offline rank below every genome driven live or scored from the cache, in order
+            # of their offline score
+            rejected_ids = set(genome_id for genome_id, _ in rejected)
+            floor = min(genome.fitness for genome_id, genome in genomes
+                        if genome_id not in rejected_ids and genome.fitness is not None) - 1
+            best = scores[rejected[0][0]]
+            for genome_id, genome in rejected:
+                genome.fitness = floor - (best - scores[genome_id])
+        scheduler.log()  # Report the control rate achieved over the generation
+        if stats_channel is not None and stats_channel.sequence:
+            # Report packet loss and decode latency as last published by the collector process
+            _, _, collector = stats_channel.read_dict()
+            print(f"Collector: {collector['frames']:.0f} frames from {collector['packets']:.0f} datagrams, "
+                  f"{collector['gaps']:.0f} gaps, {collector['out_of_order']:.0f} out of order, "
+                  f"{collector['incomplete_frames']:.0f} incomplete, {collector['decode_errors']:.0f} errors, "
+                  f"decode p50 {collector['decode_p50'] * 1e6:.0f}us p99 {collector['decode_p99'] * 1e6:.0f}us")
+
+    if evaluation in HEADLESS_EVALUATIONS and not worker_address:
+        # Without the game only the activations, action head and reward of the model functions are used
+        mf = ModelFunctions(None)
+        data_collection = None
+    else:
+        # Initialize gamepad and model functions. vgamepad needs the ViGEmBus driver, so it is only imported here
+        import vgamepad as vg
+        gamepad = vg.VX360Gamepad()
+        # Resets wait for telemetry to show the car is drivable instead of sleeping for a fixed time
+        mf = ModelFunctions(gamepad, reset_coordinator=ResetCoordinator(telemetry_channel))
+
+        # Initialize MongoDB connection
+        data_collection = MongoDB(host='localhost', port=27017, db_name='Goatifi', collection_name=f"Goatifi")
     local_dir = os.path.dirname(__file__)
     config_file = os.path.join(local_dir, 'neat_config.cfg')
     config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
                          config_file)
-    config.genome_config.add_activation("sig_soft_act", mf.sig_soft)
+    config.genome_config.add_activation("sig_soft_act", mf.leaky_relu)
+    VECTOR_ACTIVATIONS["sig_soft_act"] = mf.leaky_relu_batch  # Used by MatrixRecurrentNetwork
+    networks = NetworkCache()  # Compiled networks of the current generation, by genome key
+    # Measured runs of every driven network, reused for unchanged genomes in later generations. Runs measured
+    # under another config, reward function or action head are discarded
+    with open(config_file, 'rb') as file:
+        setup = fingerprint(file.read(), inspect.getsource(ModelFunctions.calculate_reward),
+                            mf.head_weights.tobytes())
+    fitness_cache = FitnessCache(os.path.join(local_dir, 'neat_models', 'fitness_cache.json'), evaluations=1,
+                                 max_age=10, fingerprint=setup)
+    # Network inputs, checked against the network and the channel fields before training starts
+    features = FeatureBuilder(num_inputs=config.genome_config.num_inputs,
+                              fields=[key for keys in DataProcessor.cols.values() for key in keys] +
+                              ScreenProcessor.fields)
+    # Scores genomes against recorded sessions across all cores, without the game
+    offline = OfflineEvaluator(dataset_path, config) if evaluation in ('offline', 'prescreen') else None
+    # Drives every genome of a rung at once in track simulators across all cores
+    simulator = SimulatorEvaluator(track_path, config) if evaluation == 'simulator' else None
+    # Sends genomes to evaluation workers on other rigs
+    coordinator = EvaluationCoordinator(*parse_address(listen_address), secret=secret) \
+        if evaluation == 'distributed' else None
+    # Drives the genomes a coordinator sends, in worker mode
+    worker = EvaluationWorker(worker_address, drive_genome, secret=secret) if worker_address else None
     p = neat.Population(config)
 
     # Add reporters for logging and checkpointing NEAT process
@@ -168,52 +321,106 @@ def process_neat_process(result_queue_neat, result_queue_collect, result_queue_s
     p.add_reporter(neat.Checkpointer(1, filename_prefix="neat_models/"))
 
     try:
-        data_collection.open_connection()  # Open connection to MongoDB
-        winner = p.run(eval_genomes, 100)  # Run NEAT algorithm
+        if data_collection is not None:
+            data_collection.open_connection()  # Open connection to MongoDB
+        if worker is not None:
+            worker.run()  # Serve evaluations until the coordinator shuts down
+            return None
+        # Run NEAT algorithm
+        if evaluation == 'offline':
+            winner = p.run(offline.eval_genomes, 100)
+        elif evaluation == 'simulator':
+            winner = p.run(simulator.eval_genomes, 100)
+        else:
+            winner = p.run(eval_genomes, 100)
         return winner
     except Exception as e:
         print(f"Error running NEAT: {e}")
     except KeyboardInterrupt:
         # Handle keyboard interrupt gracefully
-        data_collection.close_connection()
-        collect_process.terminate()
-        screen_process.terminate()
-        neat_process.terminate()
+        if data_collection is not None:
+            data_collection.close_connection()
+        cleanup_processes(collect_process, screen_process, neat_process)
         sys.exit(0)
     finally:
         # Ensure all resources are cleaned up properly
-        data_collection.close_connection()
-        collect_process.terminate()
-        screen_process.terminate()
-        neat_process.terminate()
+        if offline is not None:
+            offline.close()
+        if simulator is not None:
+            simulator.close()
+        if coordinator is not None:
+            coordinator.close()
+        if data_collection is not None:
+            data_collection.close_connection()
+        cleanup_processes(collect_process, screen_process, neat_process)
         sys.exit(0)
 
 if __name__ == "__main__":
-    # Create instances of data processors
-    screen_processor = ScreenProcessor()
-    data_processor = DataProcessor()
+    parser = argparse.ArgumentParser(description="Train NEAT genomes to drive in F1 23.")
+    parser.add_argument('--evaluation', choices=['live', 'offline', 'prescreen', 'simulator', 'distributed'],
+                        default='live',
+                        help="Drive every genome, score them against recorded sessions, prescreen offline, drive "
+                             "them in track simulators, or send them to distributed.py evaluation workers.")
+    parser.add_argument('--dataset', help="The offline_evaluation.py dataset used by offline and prescreen.")
+    parser.add_argument('--track', help="The track_simulator.py track used by the simulator evaluation.")
+    parser.add_argument('--listen', default='127.0.0.1:5555',
+                        help="The HOST:PORT the distributed evaluation waits for workers on. Give a LAN "
+                             "interface address for workers on other machines.")
+    parser.add_argument('--worker', metavar='HOST:PORT',
+                        help="Drive genomes for the coordinator at HOST:PORT instead of running NEAT.")
+    parser.add_argument('--secret', help=f"The secret the distributed coordinator and workers sign messages with. "
+                                         f"Defaults to {SECRET_ENV}, which keeps it out of the process list.")
+    args = parser.parse_args()
+    if args.evaluation in ('offline', 'prescreen') and not args.dataset:
+        parser.error("--dataset is required for offline and prescreen evaluation")
+    if args.evaluation == 'simulator' and not args.track:
+        parser.error("--track is required for simulator evaluation")
+    if (args.evaluation == 'distributed' or args.worker) and not (args.secret or os.environ.get(SECRET_ENV)):
+        parser.error(f"--secret or {SECRET_ENV} is required for distributed evaluation")
+
+    headless = args.evaluation in HEADLESS_EVALUATIONS and not args.worker
 
-    # Create queues for inter-process communication
-    result_queue_collect = multiprocessing.Queue(maxsize=100)
-    result_queue_screen = multiprocessing.Queue(maxsize=100)
+    # Create latest-value shared memory channels for telemetry and screen data, and a queue for NEAT results
+    telemetry_channel = SharedFrameChannel([key for keys in DataProcessor.cols.values() for key in keys] +
+                                           ['session_time'])
+    screen_channel = SharedFrameChannel(ScreenProcessor.fields)
+    stats_channel = SharedFrameChannel(CollectorStats.fields)  # The collector's packet loss and latency stats
     result_queue_neat = multiprocessing.Queue(maxsize=100)
 
-    # Create and start processes for collecting data, processing screen, and running NEAT
-    collect_process = multiprocessing.Process(target=collect_packet_process,
-                                              args=(result_queue_collect, data_processor))
-    screen_process = multiprocessing.Process(target=process_screen_process,
-                                             args=(result_queue_screen, screen_processor))
+    # Create and start processes for collecting data, processing screen, and running NEAT. Headless evaluations
+    # read neither the game's telemetry nor the screen
+    collect_process = screen_process = None
+    if not headless:
+        # Create instances of data processors
+        screen_processor = ScreenProcessor()
+        data_processor = DataProcessor()
+        collect_process = multiprocessing.Process(target=collect_packet_process,
+                                                  args=(telemetry_channel, data_processor, stats_channel))
+        screen_process = multiprocessing.Process(target=process_screen_process,
+                                                 args=(screen_channel, screen_processor))
     neat_process = multiprocessing.Process(target=process_neat_process,
-                                           args=(result_queue_neat, result_queue_collect, result_queue_screen))
+                                           args=(result_queue_neat, telemetry_channel, screen_channel,
+                                                 args.evaluation, args.dataset, args.track, args.listen,
+                                                 args.worker, stats_channel, args.secret))
 
-    # Register cleanup function to ensure proper resource release
+    # Register cleanup functions to ensure proper resource release
+    atexit.register(telemetry_channel.close)
+    atexit.register(screen_channel.close)
+    atexit.register(stats_channel.close)
     atexit.register(lambda: cleanup_processes(collect_process, screen_process, neat_process))
 
-    collect_process.start()
-    screen_process.start()
+    if not headless:
+        collect_process.start()
+        screen_process.start()
     neat_process.start()
+    if headless:
+        # Nothing to plot without the game, so wait for training to finish
+        neat_process.join()
+        sys.exit(neat_process.exitcode)
 
     # Start the PyQt5 application for plotting results
+    from plotting import App
+    from PyQt5.QtWidgets import QApplication
     app = QApplication(sys.argv)
     thisapp = App(result_queue_neat)
     thisapp.show()
@@ -0,0 +1,196 @@
+import math
+from collections import deque
+
+
+class LatencyHistogram:
+    """
+    A fixed-memory histogram of durations with power-of-two microsecond buckets.
+
+    Bucket i counts durations in [2 ** (i - 1), 2 ** i) microseconds, with bucket 0 holding everything under
+    one microsecond and the last bucket everything above the range.
+
+    Attributes:
+        buckets (list of int): The count in each bucket.
+        count (int): The number of recorded durations.
+        total (float): The sum of the recorded durations in seconds.
+        min (float): The shortest recorded duration in seconds.
+        max (float): The longest recorded duration in seconds.
+    """
+
+    def __init__(self, num_buckets=24):
+        """
+        Initializes the LatencyHistogram.
+
+        Args:
+            num_buckets (int): The number of buckets. 24 buckets cover up to about 8 seconds.
+        """
+        self.buckets = [0] * num_buckets
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds):
+        """
+        Records one duration.
+
+        Args:
+            seconds (float): The duration in seconds.
+        """
+        microseconds = int(seconds * 1e6)
+        index = min(microseconds.bit_length(), len(self.buckets) - 1) if microseconds > 0 else 0
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent):
+        """
+        Estimates a percentile from the bucket counts.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The upper bound of the bucket holding the percentile, in seconds, capped at max.
+        """
+        if not self.count:
+            return 0.0
+        target = percent / 100 * self.count
+        cumulative = 0
+        for index, bucket in enumerate(self.buckets):
+            cumulative += bucket
+            if cumulative >= target:
+                return min((1 << index) / 1e6, self.max)
+        return self.max
+
+    def snapshot(self):
+        """
+        Summarizes the histogram.
+
+        Returns:
+            dict: The count, mean, min, max, p50, p90 and p99 in seconds, plus the raw bucket counts.
+        """
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'buckets': list(self.buckets),
+        }
+
+
+class RewardAccumulator:
+    """
+    Running statistics of a reward stream in constant time and memory per sample.
+
+    The mean and variance use Welford's algorithm, the exponentially weighted moving average reacts to recent
+    rewards, and the windowed min and max are kept with monotonic deques over the last window samples.
+
+    Attributes:
+        count (int): The number of rewards added.
+        mean (float): The mean of all rewards, 0 before the first one.
+        ewma (float): The exponentially weighted moving average, 0 before the first reward.
+        alpha (float): The weight of the newest reward in the EWMA.
+        window (int): The number of most recent rewards the min and max cover.
+        last (float): The most recent reward.
+    """
+
+    def __init__(self, alpha=0.1, window=100):
+        """
+        Initializes the RewardAccumulator.
+
+        Args:
+            alpha (float): The weight of the newest reward in the EWMA, between 0 and 1.
+            window (int): The number of most recent rewards the min and max cover.
+        """
+        self.alpha = alpha
+        self.window = window
+        self.count = 0
+        self.mean = 0.0
+        self.ewma = 0.0
+        self.last = 0.0
+        self._m2 = 0.0
+        self._min = deque()  # (index, reward) with increasing rewards
+        self._max = deque()  # (index, reward) with decreasing rewards
+
+    def add(self, reward):
+        """
+        Adds one reward.
+
+        Args:
+            reward (float): The reward.
+        """
+        index = self.count
+        self.count += 1
+        self.last = reward
+
+        delta = reward - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (reward - self.mean)
+        self.ewma = reward if index == 0 else self.ewma + self.alpha * (reward - self.ewma)
+
+        while self._min and self._min[-1][1] >= reward:
+            self._min.pop()
+        self._min.append((index, reward))
+        while self._max and self._max[-1][1] <= reward:
+            self._max.pop()
+        self._max.append((index, reward))
+
+        # Drop rewards that have left the window
+        oldest = self.count - self.window
+        if self._min[0][0] < oldest:
+            self._min.popleft()
+        if self._max[0][0] < oldest:
+            self._max.popleft()
+
+    @property
+    def variance(self):
+        """
+        The population variance of all rewards.
+        """
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        """
+        The population standard deviation of all rewards.
+        """
+        return math.sqrt(self.variance)
+
+    @property
+    def window_min(self):
+        """
+        The smallest of the last window rewards.
+        """
+        return self._min[0][1] if self._min else 0.0
+
+    @property
+    def window_max(self):
+        """
+        The largest of the last window rewards.
+        """
+        return self._max[0][1] if self._max else 0.0
+
+    def snapshot(self):
+        """
+        Summarizes the rewards.
+
+        Returns:
+            dict: The count, mean, standard deviation, EWMA, last reward and windowed min and max.
+        """
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std': self.std,
+            'ewma': self.ewma,
+            'last': self.last,
+            'window_min': self.window_min,
+            'window_max': self.window_max,
+        }
@@ -1,18 +1,48 @@
-import keyboard
 import time
-import win32gui
-import win32con
+try:
+    import keyboard
+except ImportError:
+    # Only needed to send key presses to the game, so the tests and headless evaluation can run without it
+    keyboard = None
+try:
+    import win32gui
+    import win32con
+except ImportError:
+    # Only needed to manage the game window, so offline evaluation can run on other platforms
+    win32gui = win32con = None
 import numpy as np
+from reset_coordinator import ResetCoordinator
 
 class ModelFunctions:
-    def __init__(self, gamepad):
+    def __init__(self, gamepad, seed=0, reset_coordinator=None):
         """
-        Initialize ModelFunctions with a gamepad and set target positions and deviation.
+        Initialize ModelFunctions with a gamepad and set target positions, deviation and the action head.
 
         Args:
             gamepad (vgamepad.VX360Gamepad): The gamepad instance used for controlling the game.
+            seed (int): Seeds the fixed action head weights, so the same network output always maps to the
+                        same action.
+            reset_coordinator (ResetCoordinator, optional): Sends reset key sequences and waits for the car to be
+                                                            drivable. Defaults to one without telemetry, which
+                                                            waits the full timeout.
+
+        Raises:
+            ImportError: If a gamepad is given, so the game is being driven, but the keyboard package is not
+                         installed.
         """
+        if gamepad is not None and keyboard is None:
+            raise ImportError("The keyboard package is required to drive the game")
         self.gamepad = gamepad
+        self.reset_coordinator = reset_coordinator or ResetCoordinator()
+
+        # Fixed action head: 4 output nodes (steering left/right, speed up/down) driven by the network output
+        rng = np.random.default_rng(seed)
+        self.head_weights = rng.standard_normal(4)
+        self.head_biases = np.zeros(4)
+        self.steering_actions = ["a", "d", "none"]  # Actions for steering
+        self.speed_actions = ["w", "s", "none"]  # Actions for speed
+        self._head = np.empty((3, 4))  # Scratch rows for the activations, probabilities and intensities
+        self._batch = None  # Scratch buffers for action_head_batch, sized on first use
 
         # Target position for the game object with allowed deviation
         self.target_position = {
@@ -22,74 +52,145 @@ class ModelFunctions:
         }
         self.deviation = 20  # Allowed deviation in each dimension
 
-    @staticmethod
-    def sig_soft(input1):
+    def sig_soft(self, input1):
         """
         Apply a custom activation function combining softmax and sigmoid functions.
 
+        Equivalent to applying action_head to the leaky_relu of the input.
+
         Args:
             input1 (np.ndarray or float): The input value(s) to be processed.
 
         Returns:
             tuple: Speed output and steering output, each consisting of action, probability, and intensity.
         """
-        def softmax(x):
-            """Compute softmax values for each row of x."""
-            e_x = np.exp(x - np.max(x))
-            return e_x / e_x.sum(axis=0)
+        return self.action_head(self.leaky_relu(input1))
+
+    @staticmethod
+    def leaky_relu(input1):
+        """
+        Node activation used by the NEAT networks, registered as sig_soft_act.
 
-        def sigmoid(x):
-            """Sigmoid activation function with scaling."""
-            scaled_x = (x - np.min(x)) / (np.max(x) - np.min(x) + 1e-10)  # Scale x to range [0, 1] with a small epsilon
-            return 1 / (1 + np.exp(-scaled_x))
+        Nodes must output a number so their values can feed other nodes on the next activation; the action
+        head is applied to the network output separately.
 
+        Args:
+            input1 (np.ndarray or float): The input value(s) to be processed.
+
+        Returns:
+            float: The leaky ReLU of the input, summed over the elements of an array.
+        """
         alpha = 0.01  # Small constant for handling negative inputs
 
-        # Process input1
         if isinstance(input1, np.ndarray):
-            output1 = np.sum(np.where(input1 > 0, input1, alpha * input1))  # Apply ReLU with alpha
-        else:
-            output1 = max(0, input1) if input1 > 0 else alpha * input1
-
-        combined_input = np.array([output1])  # Only one input
+            return np.sum(np.where(input1 > 0, input1, alpha * input1))  # Apply ReLU with alpha
+        return max(0, input1) if input1 > 0 else alpha * input1
 
-        # Initialize weights and biases for the output layer
-        output_layer_weights = np.random.randn(4, 1)  # 4 output nodes, 1 input node
-        output_layer_biases = np.zeros(4)  # Initialize biases with zeros
+    @staticmethod
+    def leaky_relu_batch(inputs):
+        """
+        Element-wise leaky_relu, used as the vectorized sig_soft_act in MatrixRecurrentNetwork.
 
-        # Calculate activations of the output layer
-        output_activations = np.dot(output_layer_weights, combined_input) + output_layer_biases
+        Args:
+            inputs (np.ndarray): The node inputs.
 
-        # Split the output activations into categorical outputs and intensities
-        categorical_output_activations = output_activations
-        intensity_output_activations = output_activations / 100  # Scale intensity to [0, 1]
+        Returns:
+            np.ndarray: The leaky ReLU of each input.
+        """
+        return np.where(inputs > 0, inputs, 0.01 * inputs)
 
-        # Apply softmax activation function to categorical outputs
-        categorical_probabilities = softmax(categorical_output_activations)
+    def action_head(self, output1):
+        """
+        Map a network output to speed and steering actions using softmax and sigmoid functions.
 
-        # Apply sigmoid activation function to scaled intensity output activations
-        intensity_values = sigmoid(intensity_output_activations)
+        The output drives four head nodes, two for steering and two for speed, through the fixed head weights.
+        Softmax over the head activations gives the action probabilities, and the sigmoid of the min-max scaled
+        activations gives the action intensities.
 
-        # Choose action with highest probability for steering
-        steering_index = np.argmax(categorical_probabilities[:2])  # Selecting from the first two outputs
-        steering_actions = ["a", "d", "none"]  # Actions for steering
-        steering_action = steering_actions[steering_index]
-        steering_prob = categorical_probabilities[steering_index]
-        steering_intensity = intensity_values[steering_index]
+        Args:
+            output1 (float): The activated output node value.
 
-        # Choose action with highest probability for speed
-        speed_index = np.argmax(categorical_probabilities[2:]) + 2  # Selecting from the last two outputs
-        speed_actions = ["w", "s", "none"]  # Actions for speed
-        speed_action = speed_actions[speed_index - 2]
-        speed_prob = categorical_probabilities[speed_index]
-        speed_intensity = intensity_values[speed_index]
+        Returns:
+            tuple: Speed output and steering output, each consisting of action, probability, and intensity.
+        """
+        activations, probabilities, intensities = self._head
 
-        steering_output = [steering_action, round(steering_prob, 2), round(steering_intensity, 2)]
-        speed_output = [speed_action, round(speed_prob, 2), round(speed_intensity, 2)]
+        # Calculate activations of the output layer
+        np.multiply(self.head_weights, output1, out=activations)
+        activations += self.head_biases
+
+        # Apply softmax activation function to the activations
+        np.subtract(activations, activations.max(), out=probabilities)
+        np.exp(probabilities, out=probabilities)
+        probabilities /= probabilities.sum()
+
+        # Apply sigmoid activation function to the scaled intensity activations
+        np.divide(activations, 100, out=intensities)  # Scale intensity
+        intensities -= intensities.min()
+        intensities /= intensities.max() + 1e-10  # Scale to range [0, 1] with a small epsilon
+        np.negative(intensities, out=intensities)
+        np.exp(intensities, out=intensities)
+        intensities += 1
+        np.reciprocal(intensities, out=intensities)
+
+        # Choose the action with the highest probability for steering (first two nodes) and speed (last two)
+        steering_index = 0 if probabilities[0] >= probabilities[1] else 1
+        speed_index = 2 if probabilities[2] >= probabilities[3] else 3
+
+        steering_output = [self.steering_actions[steering_index], round(float(probabilities[steering_index]), 2),
+                           round(float(intensities[steering_index]), 2)]
+        speed_output = [self.speed_actions[speed_index - 2], round(float(probabilities[speed_index]), 2),
+                        round(float(intensities[speed_index]), 2)]
 
         # Return speed and steering outputs
         return speed_output, steering_output
 
+    def action_head_batch(self, outputs):
+        """
+        Vectorized action_head for many network outputs at once, e.g. one per genome.
+
+        The returned arrays are scratch buffers reused by the next call with the same number of outputs.
+
+        Args:
+            outputs (np.ndarray): The activated output node values, one per network.
+
+        Returns:
+            tuple: Speed and steering arrays of shape (len(outputs), 3), each row holding the action index into
+                   speed_actions or steering_actions, the probability and the intensity.
+        """
+        outputs = np.asarray(outputs, dtype=np.float64).reshape(-1)
+        if self._batch is None or len(self._batch[0]) != len(outputs):
+            count = len(outputs)
+            self._batch = (np.empty((count, 4)), np.empty((count, 4)), np.empty((count, 4)), np.empty(count),
+                           np.empty(count, dtype=bool), np.empty((count, 3)), np.empty((count, 3)))
+        activations, probabilities, intensities, reduced, chosen, speed, steering = self._batch
+
+        np.multiply(outputs[:, None], self.head_weights, out=activations)
+        activations += self.head_biases
+
+        np.subtract(activations, activations.max(axis=1, out=reduced)[:, None], out=probabilities)
+        np.exp(probabilities, out=probabilities)
+        probabilities /= probabilities.sum(axis=1, out=reduced)[:, None]
+
+        np.divide(activations, 100, out=intensities)
+        intensities -= intensities.min(axis=1, out=reduced)[:, None]
+        intensities /= intensities.max(axis=1, out=reduced)[:, None] + 1e-10
+        np.negative(intensities, out=intensities)
+        np.exp(intensities, out=intensities)
+        intensities += 1
+        np.reciprocal(intensities, out=intensities)
+
+        for output, first in ((steering, 0), (speed, 2)):
+            # Ties go to the first action, like argmax
+            np.less(probabilities[:, first], probabilities[:, first + 1], out=chosen)
+            output[:, 0] = chosen
+            np.copyto(output[:, 1], probabilities[:, first])
+            np.copyto(output[:, 1], probabilities[:, first + 1], where=chosen)
+            np.copyto(output[:, 2], intensities[:, first])
+            np.copyto(output[:, 2], intensities[:, first + 1], where=chosen)
+            np.round(output[:, 1:], 2, out=output[:, 1:])
+        return speed, steering
+
     def within_deviation(self, current_state):
         """
         Check if the current state is within the allowed deviation from the target position.
@@ -107,31 +208,29 @@ class ModelFunctions:
             and (self.target_position['world_position_z'] - self.deviation <= current_state['world_position_z'] <=
                  self.target_position['world_position_z'] + self.deviation)
 
-    def escape_pits(self):
+    def escape_pits(self, timeout=6):
         """
-        Simulate key presses to escape pits or reset situations in the game.
+        Simulate key presses to escape pits or reset situations in the game, then wait until the car is drivable.
+
+        Args:
+            timeout (float): The longest time to wait for the car to be drivable, in seconds.
+
+        Returns:
+            bool: True if the car became drivable before the timeout.
         """
-        keyboard.press('enter')
-        time.sleep(0.3)
-        keyboard.release('enter')
-        time.sleep(0.3)
-        keyboard.press('enter')
-        time.sleep(0.3)
-        keyboard.release('enter')
-        time.sleep(6)
+        return self.reset_coordinator.reset(['enter', 'enter'], timeout)
 
-    def reset_world(self):
+    def reset_world(self, timeout=6):
         """
-        Simulate key presses to reset the world or game state.
+        Simulate key presses to reset the world or game state, then wait until the car is drivable.
+
+        Args:
+            timeout (float): The longest time to wait for the car to be drivable, in seconds.
+
+        Returns:
+            bool: True if the car became drivable before the timeout.
         """
-        keyboard.press('esc')
-        time.sleep(0.3)
-        keyboard.release('esc')
-        time.sleep(0.3)
-        keyboard.press('enter')
-        time.sleep(0.3)
-        keyboard.release('enter')
-        time.sleep(6)
+        return self.reset_coordinator.reset(['esc', 'enter'], timeout)
 
     def calculate_reward(self, data):
         """
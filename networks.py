@@ -0,0 +1,293 @@
+import neat
+import numpy as np
+from neat.graphs import required_for_output
+
+
+# Vectorized counterparts of neat's built-in activation functions, by name. Activations missing here are applied
+# element by element with the scalar function registered in the genome config.
+VECTOR_ACTIVATIONS = {
+    'sigmoid': lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    'tanh': lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    'sin': lambda z: np.sin(np.clip(5.0 * z, -60.0, 60.0)),
+    'gauss': lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4) ** 2),
+    'relu': lambda z: np.maximum(z, 0.0),
+    'softplus': lambda z: 0.2 * np.log1p(np.exp(np.clip(5.0 * z, -60.0, 60.0))),
+    'identity': lambda z: z,
+    'clamped': lambda z: np.clip(z, -1.0, 1.0),
+    'inv': lambda z: np.divide(1.0, z, out=np.zeros_like(z), where=z != 0),
+    'log': lambda z: np.log(np.maximum(z, 1e-7)),
+    'exp': lambda z: np.exp(np.clip(z, -60.0, 60.0)),
+    'abs': np.abs,
+    'hat': lambda z: np.maximum(0.0, 1.0 - np.abs(z)),
+    'square': np.square,
+    'cube': lambda z: z ** 3,
+}
+
+
+def _maxabs(values, axis):
+    """
+    Row-wise value with the largest magnitude, ignoring NaN padding.
+    """
+    index = np.nanargmax(np.abs(values), axis=axis)
+    return np.take_along_axis(values, np.expand_dims(index, axis), axis).squeeze(axis)
+
+
+# Vectorized reductions of neat's built-in aggregations other than sum and mean, applied to NaN-padded rows
+VECTOR_AGGREGATIONS = {
+    'product': np.nanprod,
+    'max': np.nanmax,
+    'min': np.nanmin,
+    'maxabs': _maxabs,
+    'median': np.nanmedian,
+}
+
+
+class NetworkCache:
+    """
+    Keeps the compiled network of every genome in the current generation, keyed by genome key.
+
+    NEAT gives mutated offspring new keys and carries elites over unchanged under their old keys, so a genome
+    that survives to the next generation reuses its network instead of being compiled again.
+
+    Attributes:
+        network_class (type): The network class, providing create(genome, config) and reset().
+        networks (dict): The compiled network of each cached genome, by genome key.
+        built (int): The number of networks compiled.
+        reused (int): The number of evaluations that reused a cached network.
+    """
+
+    def __init__(self, network_class=neat.nn.RecurrentNetwork):
+        """
+        Initializes the NetworkCache.
+
+        Args:
+            network_class (type): The network class used to compile genomes.
+        """
+        self.network_class = network_class
+        self.networks = {}
+        self.built = 0
+        self.reused = 0
+
+    def prune(self, genomes):
+        """
+        Drops the networks of genomes that are no longer in the population.
+
+        Args:
+            genomes (list of tuple): The genome ID and genome pairs of the current generation.
+        """
+        keys = set(genome_id for genome_id, _ in genomes)
+        for genome_id in list(self.networks):
+            if genome_id not in keys:
+                del self.networks[genome_id]
+
+    def get(self, genome_id, genome, config):
+        """
+        Returns the network of a genome with its recurrent state cleared, compiling it if it is not cached.
+
+        Args:
+            genome_id (int): The genome key.
+            genome (neat.DefaultGenome): The genome.
+            config (neat.Config): The NEAT configuration object.
+
+        Returns:
+            The compiled network, ready for a fresh evaluation.
+        """
+        network = self.networks.get(genome_id)
+        if network is None:
+            network = self.networks[genome_id] = self.network_class.create(genome, config)
+            self.built += 1
+        else:
+            network.reset()
+            self.reused += 1
+        return network
+
+
+class MatrixRecurrentNetwork:
+    """
+    A vectorized equivalent of neat.nn.RecurrentNetwork that can also evaluate many genomes at once.
+
+    The expressed nodes of every genome are laid out in one state vector, with the input nodes shared between
+    genomes, and the connections are stored as sparse (target node, source slot, weight) arrays. One activation
+    multiplies every connection weight by its source value, sums them per node with np.bincount, replaces the
+    sums of nodes using other aggregations with a reduction over NaN-padded rows, and applies each activation
+    function to its group of nodes. Like neat.nn.RecurrentNetwork, every node reads the values of the previous
+    activation, and nodes without expressed inputs stay at 0.
+
+    Attributes:
+        num_networks (int): The number of genomes compiled into the network.
+        input_keys (list of int): The input node keys, in input order.
+        output_keys (list of int): The output node keys, in output order.
+        values (np.ndarray): The node values after the last activation, inputs first.
+    """
+
+    def __init__(self, genomes, config):
+        """
+        Compiles genomes into one vectorized network.
+
+        Args:
+            genomes (list of neat.DefaultGenome): The genomes, evaluated side by side.
+            config (neat.Config): The NEAT configuration object.
+        """
+        genome_config = config.genome_config
+        self.num_networks = len(genomes)
+        self.input_keys = list(genome_config.input_keys)
+        self.output_keys = list(genome_config.output_keys)
+        num_inputs = len(self.input_keys)
+
+        # Input nodes share the first slots; every other node gets a slot per genome
+        input_slots = dict((key, index) for index, key in enumerate(self.input_keys))
+        slots = {}
+
+        def slot(network, key):
+            if key in input_slots:
+                return input_slots[key]
+            return slots.setdefault((network, key), num_inputs + len(slots))
+
+        # Expressed connections by target node, gathered the way neat.nn.RecurrentNetwork.create does
+        nodes = []
+        link_node, link_source, link_weight = [], [], []
+        for network, genome in enumerate(genomes):
+            required = required_for_output(genome_config.input_keys, genome_config.output_keys, genome.connections)
+            node_inputs = {}
+            for connection in genome.connections.values():
+                source, target = connection.key
+                if connection.enabled and (source in required or target in required):
+                    node_inputs.setdefault(target, []).append((source, connection.weight))
+
+            for node_key, links in node_inputs.items():
+                for source, weight in links:
+                    link_node.append(len(nodes))
+                    link_source.append(slot(network, source))
+                    link_weight.append(weight)
+                nodes.append((slot(network, node_key), genome.nodes[node_key]))
+
+        self.output_slots = np.array([[slot(network, key) for key in self.output_keys]
+                                      for network in range(len(genomes))], dtype=np.intp)
+        self.values = np.zeros(num_inputs + len(slots))
+
+        self.node_slots = np.array([node_slot for node_slot, _ in nodes], dtype=np.intp)
+        self.bias = np.array([node.bias for _, node in nodes], dtype=np.float64)
+        self.response = np.array([node.response for _, node in nodes], dtype=np.float64)
+        self.link_node = np.array(link_node, dtype=np.intp)
+        self.link_source = np.array(link_source, dtype=np.intp)
+        self.link_weight = np.array(link_weight, dtype=np.float64)
+        counts = np.bincount(self.link_node, minlength=len(nodes))
+
+        # Sum aggregation covers every node; mean nodes are rescaled and other aggregations replaced per group
+        self.scale = np.ones(len(nodes))
+        self.aggregation_groups = []
+        by_aggregation = {}
+        for index, (_, node) in enumerate(nodes):
+            by_aggregation.setdefault(node.aggregation, []).append(index)
+        for name, indices in by_aggregation.items():
+            indices = np.array(indices, dtype=np.intp)
+            if name == 'mean':
+                self.scale[indices] = 1.0 / counts[indices]
+            elif name != 'sum':
+                # Each row holds the positions of a node's links, padded with the NaN slot at the end
+                width = int(counts[indices].max())
+                rows = np.full((len(indices), width), len(link_node), dtype=np.intp)
+                for row, index in enumerate(indices):
+                    positions = np.flatnonzero(self.link_node == index)
+                    rows[row, :len(positions)] = positions
+                reduce = VECTOR_AGGREGATIONS.get(name)
+                if reduce is None:
+                    function = genome_config.aggregation_function_defs.get(name)
+                    reduce = lambda padded, axis, function=function: np.array(
+                        [function(row[~np.isnan(row)].tolist()) for row in padded])
+                self.aggregation_groups.append((indices, rows, reduce))
+
+        self.activation_groups = []
+        by_activation = {}
+        for index, (_, node) in enumerate(nodes):
+            by_activation.setdefault(node.activation, []).append(index)
+        for name, indices in by_activation.items():
+            activation = VECTOR_ACTIVATIONS.get(name)
+            if activation is None:
+                function = genome_config.activation_defs.get(name)
+                activation = lambda z, function=function: np.fromiter(map(function, z.tolist()), np.float64, len(z))
+            indices = np.array(indices, dtype=np.intp)
+            self.activation_groups.append((indices, self.node_slots[indices], activation))
+
+        # Scratch buffers reused by every activation; the extra product slot holds the NaN padding
+        self._products = np.full(len(link_node) + 1, np.nan)
+        self._sources = np.empty(len(link_node))
+        self._aggregated = np.empty(len(nodes))
+
+    @classmethod
+    def create(cls, genome, config):
+        """
+        Compiles a single genome, mirroring neat.nn.RecurrentNetwork.create.
+
+        Args:
+            genome (neat.DefaultGenome): The genome.
+            config (neat.Config): The NEAT configuration object.
+
+        Returns:
+            MatrixRecurrentNetwork: The compiled network.
+        """
+        return cls([genome], config)
+
+    def reset(self):
+        """
+        Clears the recurrent state.
+        """
+        self.values.fill(0.0)
+
+    def step(self, inputs):
+        """
+        Activates every network once with the same inputs.
+
+        Args:
+            inputs (sequence of float): One value per input node.
+
+        Returns:
+            np.ndarray: The (num_networks, num_outputs) output values.
+        """
+        if len(inputs) != len(self.input_keys):
+            raise RuntimeError(f"Expected {len(self.input_keys)} inputs, got {len(inputs)}")
+
+        values = self.values
+        values[:len(self.input_keys)] = inputs
+        products = self._products[:-1]
+        np.take(values, self.link_source, out=self._sources)
+        np.multiply(self.link_weight, self._sources, out=products)
+
+        aggregated = self._aggregated
+        aggregated[:] = np.bincount(self.link_node, weights=products, minlength=len(aggregated))
+        aggregated *= self.scale
+        for indices, rows, reduce in self.aggregation_groups:
+            aggregated[indices] = reduce(self._products[rows], axis=1)
+
+        aggregated *= self.response
+        aggregated += self.bias
+        for indices, node_slots, activation in self.activation_groups:
+            values[node_slots] = activation(aggregated[indices])
+        return values[self.output_slots]
+
+    def activate(self, inputs):
+        """
+        Activates the network once, like neat.nn.RecurrentNetwork.activate.
+
+        Args:
+            inputs (sequence of float): One value per input node.
+
+        Returns:
+            list of float: The output values of the first network.
+        """
+        return self.step(inputs)[0].tolist()
+
+    def activate_sequence(self, inputs):
+        """
+        Runs every network over a sequence of inputs, carrying the recurrent state from one row to the next.
+
+        Args:
+            inputs (np.ndarray): The (steps, num_inputs) inputs, one row per activation.
+
+        Returns:
+            np.ndarray: The (steps, num_networks, num_outputs) output values.
+        """
+        outputs = np.empty((len(inputs), self.num_networks, len(self.output_keys)))
+        for step, row in enumerate(inputs):
+            outputs[step] = self.step(row)
+        return outputs
@@ -0,0 +1,257 @@
+import argparse
+import multiprocessing
+import numpy as np
+from features import FeatureBuilder, INPUT_SCHEMA
+from model_functions import ModelFunctions
+from networks import MatrixRecurrentNetwork, VECTOR_ACTIVATIONS
+
+
+class OfflineDataset:
+    """
+    Recorded frames prepared for scoring genomes without the game.
+
+    Each frame is turned into the network inputs, the reward calculate_reward gives it and the speed and steering
+    the driver was applying, as read from the throttle, brake and steer telemetry. Frames are treated as one
+    continuous sequence.
+
+    Attributes:
+        inputs (np.ndarray): The (frames, num_inputs) normalized network inputs.
+        rewards (np.ndarray): The reward of each frame.
+        speed_targets (np.ndarray): The speed action applied in each frame, as an index into ['w', 's'].
+        steering_targets (np.ndarray): The steering action applied in each frame, as an index into ['a', 'd'].
+    """
+
+    def __init__(self, inputs, rewards, speed_targets, steering_targets):
+        """
+        Initializes the OfflineDataset.
+
+        Args:
+            inputs (np.ndarray): The (frames, num_inputs) normalized network inputs.
+            rewards (np.ndarray): The reward of each frame.
+            speed_targets (np.ndarray): The speed action index applied in each frame.
+            steering_targets (np.ndarray): The steering action index applied in each frame.
+        """
+        self.inputs = inputs
+        self.rewards = rewards
+        self.speed_targets = speed_targets
+        self.steering_targets = steering_targets
+
+    @classmethod
+    def from_frames(cls, frames, model_functions=None):
+        """
+        Builds a dataset from merged telemetry and screen frames, such as the documents eval_genomes stores or
+        the frames of a TelemetryReplayer. Screen fields missing from a frame are taken as 0.
+
+        Args:
+            frames (iterable of dict): The frames, in order.
+            model_functions (ModelFunctions, optional): Provides calculate_reward. Defaults to one without a
+                                                        gamepad.
+
+        Returns:
+            OfflineDataset: The dataset.
+        """
+        model_functions = model_functions or ModelFunctions(None)
+        features = FeatureBuilder()
+        inputs, rewards, speed_targets, steering_targets = [], [], [], []
+
+        for frame in frames:
+            frame = dict(frame)
+            for name, _, _ in INPUT_SCHEMA:
+                frame.setdefault(name, 0.0)
+            inputs.append(features.build(frame).copy())
+            rewards.append(model_functions.calculate_reward(frame))
+            speed_targets.append(0 if frame['throttle'] >= frame['brake'] else 1)
+            steering_targets.append(0 if frame['steer'] < 0 else 1)
+
+        return cls(np.array(inputs).reshape(-1, len(INPUT_SCHEMA)), np.array(rewards, dtype=np.float64),
+                   np.array(speed_targets, dtype=np.int8), np.array(steering_targets, dtype=np.int8))
+
+    def save(self, path):
+        """
+        Writes the dataset to an .npz file.
+
+        Args:
+            path (str): The file to write.
+        """
+        np.savez(path, inputs=self.inputs, rewards=self.rewards, speed_targets=self.speed_targets,
+                 steering_targets=self.steering_targets)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a dataset written by save.
+
+        Args:
+            path (str): The .npz file.
+
+        Returns:
+            OfflineDataset: The dataset.
+        """
+        with np.load(path) as data:
+            return cls(data['inputs'], data['rewards'], data['speed_targets'], data['steering_targets'])
+
+
+def score_genomes(genomes, config, dataset, model_functions):
+    """
+    Scores genomes by how well their actions agree with the recorded driving, weighted by reward.
+
+    All genomes run side by side through the recorded inputs in one MatrixRecurrentNetwork. At every frame each
+    genome's speed and steering actions are compared with those the driver applied on the next frame. A match
+    earns that next frame's reward minus the mean reward, so agreeing with actions that led to above-average
+    reward scores positively and agreeing with ones that led to below-average reward scores negatively.
+
+    Args:
+        genomes (list of tuple): The genome ID and genome pairs to score.
+        config (neat.Config): The NEAT configuration object.
+        dataset (OfflineDataset): The recorded frames.
+        model_functions (ModelFunctions): Provides action_head_batch.
+
+    Returns:
+        dict: The score of each genome, by genome ID.
+    """
+    if not genomes or len(dataset.inputs) < 2:
+        return dict((genome_id, 0.0) for genome_id, _ in genomes)
+
+    network = MatrixRecurrentNetwork([genome for _, genome in genomes], config)
+    outputs = network.activate_sequence(dataset.inputs[:-1])[:, :, 0]
+    speed, steering = model_functions.action_head_batch(outputs.reshape(-1))
+
+    matches = (speed[:, 0].reshape(outputs.shape) == dataset.speed_targets[1:, None]).astype(np.float64)
+    matches += steering[:, 0].reshape(outputs.shape) == dataset.steering_targets[1:, None]
+    advantages = dataset.rewards[1:] - dataset.rewards.mean()
+    scores = (matches * 0.5 * advantages[:, None]).mean(axis=0)
+    return dict((genome_id, float(score)) for (genome_id, _), score in zip(genomes, scores))
+
+
+# Per-process state of the pool workers, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(dataset_path, config):
+    """
+    Loads the dataset and model functions once per pool worker.
+    """
+    model_functions = ModelFunctions(None)
+    VECTOR_ACTIVATIONS['sig_soft_act'] = model_functions.leaky_relu_batch
+    _worker.update(dataset=OfflineDataset.load(dataset_path), config=config, model_functions=model_functions)
+
+
+def _score_chunk(genomes):
+    """
+    Scores one chunk of genomes in a pool worker.
+    """
+    return score_genomes(genomes, _worker['config'], _worker['dataset'], _worker['model_functions'])
+
+
+class OfflineEvaluator:
+    """
+    Scores whole populations against a recorded dataset across a process pool.
+
+    The population is split into one chunk per worker, and each worker scores its chunk with score_genomes.
+
+    Attributes:
+        dataset_path (str): The OfflineDataset file every worker loads.
+        config (neat.Config): The NEAT configuration object.
+        num_workers (int): The number of worker processes.
+    """
+
+    def __init__(self, dataset_path, config, num_workers=None):
+        """
+        Initializes the OfflineEvaluator. The pool is started on first use.
+
+        Args:
+            dataset_path (str): The OfflineDataset file.
+            config (neat.Config): The NEAT configuration object.
+            num_workers (int, optional): The number of worker processes. Defaults to the number of cores.
+        """
+        self.dataset_path = dataset_path
+        self.config = config
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.pool = None
+
+    def score(self, genomes):
+        """
+        Scores genomes without changing their fitness.
+
+        Args:
+            genomes (list of tuple): The genome ID and genome pairs to score.
+
+        Returns:
+            dict: The score of each genome, by genome ID.
+        """
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.num_workers, _init_worker, (self.dataset_path, self.config))
+        genomes = list(genomes)
+        chunks = [genomes[index::self.num_workers] for index in range(self.num_workers)]
+        scores = {}
+        for chunk_scores in self.pool.map(_score_chunk, [chunk for chunk in chunks if chunk]):
+            scores.update(chunk_scores)
+        return scores
+
+    def eval_genomes(self, genomes, config):
+        """
+        Sets every genome's fitness to its offline score, for use as a neat.Population.run fitness function.
+
+        Args:
+            genomes (list of tuple): The genome ID and genome pairs.
+            config (neat.Config): The NEAT configuration object.
+        """
+        scores = self.score(genomes)
+        for genome_id, genome in genomes:
+            genome.fitness = scores[genome_id]
+
+    def prescreen(self, genomes, fraction=0.25):
+        """
+        Picks the genomes with the best offline scores for live evaluation.
+
+        Args:
+            genomes (list of tuple): The genome ID and genome pairs.
+            fraction (float): The fraction of genomes to keep.
+
+        Returns:
+            tuple: The kept and rejected genome ID and genome pairs, best first, and the scores by genome ID.
+        """
+        scores = self.score(genomes)
+        ranked = sorted(genomes, key=lambda pair: scores[pair[0]], reverse=True)
+        keep = max(1, int(round(len(ranked) * fraction)))
+        return ranked[:keep], ranked[keep:], scores
+
+    def close(self):
+        """
+        Shuts down the worker pool.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+def main():
+    """
+    Builds an offline dataset from a telemetry recording or the MongoDB collection eval_genomes writes to.
+    """
+    parser = argparse.ArgumentParser(description="Build an offline evaluation dataset.")
+    parser.add_argument('output', help="The .npz file to write.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--recording', help="A replay.py telemetry recording.")
+    source.add_argument('--mongo', metavar='COLLECTION', help="A MongoDB collection of evaluation documents.")
+    args = parser.parse_args()
+
+    if args.recording:
+        from data_processing import DataProcessor
+        from replay import TelemetryReplayer
+        frames = TelemetryReplayer(args.recording).frames(DataProcessor())
+    else:
+        from db import MongoDB
+        data_collection = MongoDB(host='localhost', port=27017, db_name='Goatifi', collection_name=args.mongo)
+        data_collection.open_connection()
+        frames = data_collection.find_documents()
+        data_collection.close_connection()
+
+    dataset = OfflineDataset.from_frames(frames)
+    dataset.save(args.output)
+    print(f"Wrote {len(dataset.inputs)} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
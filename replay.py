@@ -0,0 +1,228 @@
+import argparse
+import os
+import socket
+import struct
+import time
+
+# File header: magic and format version
+FILE_HEADER = struct.Struct('<4sH')
+FILE_MAGIC = b'F1TR'
+FILE_VERSION = 1
+
+# Record header: receive time in seconds since the recording started and datagram length
+RECORD_HEADER = struct.Struct('<dH')
+
+
+class TelemetryRecorder:
+    """
+    Writes raw F1 UDP datagrams with their receive timestamps to a compact append-only file.
+
+    Each record is a RECORD_HEADER followed by the datagram bytes. Timestamps are relative to when the recorder
+    was opened, so appending to an existing file continues its timeline from its last record.
+
+    Attributes:
+        path (str): The file being written.
+        records (int): The number of datagrams written by this recorder.
+    """
+
+    def __init__(self, path):
+        """
+        Opens the recording for appending, writing the file header if the file is new. A truncated final record
+        left by an interrupted write is cut off first, so new records are not appended after partial bytes.
+
+        Args:
+            path (str): The file to write.
+        """
+        self.path = path
+        self.records = 0
+
+        offset = 0.0
+        end = 0  # The end of the file header and the last complete record
+        if os.path.exists(path) and os.path.getsize(path) >= FILE_HEADER.size:
+            end = FILE_HEADER.size
+            for timestamp, data in TelemetryReplayer(path).datagrams():
+                offset = timestamp
+                end += RECORD_HEADER.size + len(data)
+        if os.path.exists(path) and os.path.getsize(path) > end:
+            os.truncate(path, end)
+
+        self.file = open(path, 'ab')
+        if end == 0:
+            self.file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION))
+        self.start = time.perf_counter() - offset
+
+    def write(self, data, size=None, timestamp=None):
+        """
+        Appends one datagram.
+
+        Args:
+            data (bytes or memoryview): The datagram, or a receive buffer starting with it.
+            size (int, optional): The length of the datagram within data. Defaults to len(data).
+            timestamp (float, optional): The receive time from time.perf_counter. Defaults to now.
+        """
+        if size is None:
+            size = len(data)
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        self.file.write(RECORD_HEADER.pack(timestamp - self.start, size))
+        self.file.write(data[:size])
+        self.records += 1
+
+    def close(self):
+        """
+        Flushes and closes the recording.
+        """
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TelemetryReplayer:
+    """
+    Reads a recording made by TelemetryRecorder and replays it at 1x, Nx or maximum speed, either into a
+    DataProcessor or over UDP to a local port.
+
+    Attributes:
+        path (str): The recording to replay.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the TelemetryReplayer.
+
+        Args:
+            path (str): The recording to replay.
+        """
+        self.path = path
+
+    def datagrams(self):
+        """
+        Reads every recorded datagram, without pacing.
+
+        Yields:
+            tuple: The receive timestamp in seconds since the recording started and the datagram bytes.
+        """
+        with open(self.path, 'rb') as file:
+            magic, version = FILE_HEADER.unpack(file.read(FILE_HEADER.size))
+            if magic != FILE_MAGIC or version != FILE_VERSION:
+                raise ValueError(f"{self.path} is not a version {FILE_VERSION} telemetry recording")
+
+            while True:
+                header = file.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    return
+                timestamp, size = RECORD_HEADER.unpack(header)
+                data = file.read(size)
+                if len(data) < size:
+                    return  # Truncated final record
+                yield timestamp, data
+
+    def replay(self, speed=1.0):
+        """
+        Yields the recorded datagrams paced against absolute deadlines, so timing errors do not accumulate.
+
+        Args:
+            speed (float or None): The replay speed multiplier. None or 0 replays as fast as possible.
+
+        Yields:
+            bytes: Each recorded datagram, at its scheduled time.
+        """
+        start = None
+        for timestamp, data in self.datagrams():
+            if speed:
+                if start is None:
+                    start = time.perf_counter() - timestamp / speed
+                delay = start + timestamp / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            yield data
+
+    def send(self, ip="127.0.0.1", port=20777, speed=1.0):
+        """
+        Re-sends the recording over UDP, as the game would.
+
+        Args:
+            ip (str): The destination IP address.
+            port (int): The destination port.
+            speed (float or None): The replay speed multiplier. None or 0 replays as fast as possible.
+
+        Returns:
+            int: The number of datagrams sent.
+        """
+        sent = 0
+        udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            for data in self.replay(speed):
+                udp_socket.sendto(data, (ip, port))
+                sent += 1
+        finally:
+            udp_socket.close()
+        return sent
+
+    def frames(self, data_processor, speed=None):
+        """
+        Feeds the recording directly into a DataProcessor, bypassing the network.
+
+        Args:
+            data_processor (DataProcessor): The processor decoding the datagrams.
+            speed (float or None): The replay speed multiplier. None or 0 replays as fast as possible.
+
+        Yields:
+            dict: The processed telemetry data of each complete frame, as from DataProcessor.collect_packet.
+        """
+        return data_processor.collect_packet(self.replay(speed))
+
+
+def main():
+    """
+    Records live telemetry to a file, or replays a recording to a local port.
+    """
+    parser = argparse.ArgumentParser(description="Record or replay F1 UDP telemetry.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help="Record datagrams received on a port.")
+    record_parser.add_argument('path')
+    record_parser.add_argument('--ip', default="127.0.0.1")
+    record_parser.add_argument('--port', type=int, default=20777)
+    record_parser.add_argument('--duration', type=float, default=None, help="Seconds to record for.")
+
+    play_parser = subparsers.add_parser('play', help="Re-send a recording to a port.")
+    play_parser.add_argument('path')
+    play_parser.add_argument('--ip', default="127.0.0.1")
+    play_parser.add_argument('--port', type=int, default=20777)
+    play_parser.add_argument('--speed', type=float, default=1.0, help="Speed multiplier, 0 for maximum speed.")
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp_socket.bind((args.ip, args.port))
+        buffer = bytearray(2048)
+        end = time.perf_counter() + args.duration if args.duration else None
+        with TelemetryRecorder(args.path) as recorder:
+            try:
+                while end is None or time.perf_counter() < end:
+                    if end is not None:
+                        udp_socket.settimeout(max(end - time.perf_counter(), 0.001))
+                    try:
+                        size = udp_socket.recv_into(buffer)
+                    except socket.timeout:
+                        continue
+                    recorder.write(buffer, size)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                udp_socket.close()
+        print(f"Recorded {recorder.records} datagrams to {args.path}")
+    else:
+        sent = TelemetryReplayer(args.path).send(args.ip, args.port, args.speed)
+        print(f"Replayed {sent} datagrams to {args.ip}:{args.port}")
+
+
+if __name__ == "__main__":
+    main()
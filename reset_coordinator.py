@@ -0,0 +1,174 @@
+import math
+import time
+try:
+    import keyboard
+except ImportError:
+    # Only needed to send key presses to the game, so the tests and headless evaluation can run without it
+    keyboard = None
+
+
+class ResetCoordinator:
+    """
+    Sends a menu key sequence to the game and then waits until live telemetry shows the car is drivable again,
+    rather than sleeping for a fixed time.
+
+    The coordinator first waits for telemetry to show the reset actually happening: session_time stalling or
+    going back, telemetry stopping for stall seconds, the lap timer restarting or the car's world position jumping
+    by more than max_jump, each compared with the last frame before the keys were sent. Only then does the car
+    count as drivable, once telemetry frames have been arriving for settle seconds with session_time advancing,
+    so the game is not paused or in a menu, and the car's world position moving continuously, so it is no longer
+    being teleported back onto the track. A car already sitting still and drivable, e.g. in the garage, is not
+    mistaken for a finished reset. The old fixed delay is kept as the timeout, and is what the coordinator waits
+    for when it has no telemetry channel.
+
+    Attributes:
+        telemetry_channel (SharedFrameChannel or None): The channel holding the latest telemetry frame.
+        key_delay (float): Seconds between key presses and releases.
+        min_wait (float): Seconds to wait after the key sequence before checking telemetry, so frames from
+                          before the reset are not mistaken for readiness.
+        settle (float): Seconds telemetry must look drivable for before the car counts as ready.
+        max_jump (float): The largest position change in metres between consecutive frames that still counts as
+                          continuous movement.
+        stall (float): Seconds without a new telemetry frame that count as the game pausing or loading.
+        waits (list of float): How long each reset took, in seconds.
+        timeouts (int): The number of resets that ran into their timeout.
+    """
+
+    def __init__(self, telemetry_channel=None, key_delay=0.3, min_wait=0.5, settle=1.0, max_jump=5.0, stall=1.0):
+        """
+        Initializes the ResetCoordinator.
+
+        Args:
+            telemetry_channel (SharedFrameChannel, optional): The channel holding the latest telemetry frame,
+                                                              including session_time and the world position.
+                                                              Without it, every reset waits for its timeout.
+            key_delay (float): Seconds between key presses and releases.
+            min_wait (float): Seconds to wait after the key sequence before checking telemetry.
+            settle (float): Seconds telemetry must look drivable for before the car counts as ready.
+            max_jump (float): The largest position change in metres between consecutive frames that still counts
+                              as continuous movement.
+            stall (float): Seconds without a new telemetry frame that count as the game pausing or loading.
+
+        Raises:
+            ImportError: If a telemetry channel is given, so the game is being driven, but the keyboard package
+                         is not installed.
+        """
+        if telemetry_channel is not None and keyboard is None:
+            raise ImportError("The keyboard package is required to send reset keys to the game")
+        self.telemetry_channel = telemetry_channel
+        self.key_delay = key_delay
+        self.min_wait = min_wait
+        self.settle = settle
+        self.max_jump = max_jump
+        self.stall = stall
+        self.waits = []
+        self.timeouts = 0
+
+    def press_keys(self, keys):
+        """
+        Presses and releases each key in turn.
+
+        Args:
+            keys (list of str): The keys, e.g. ['esc', 'enter'].
+        """
+        if keyboard is None:
+            raise ImportError("The keyboard package is required to send reset keys to the game")
+        for index, key in enumerate(keys):
+            keyboard.press(key)
+            time.sleep(self.key_delay)
+            keyboard.release(key)
+            if index < len(keys) - 1:
+                time.sleep(self.key_delay)
+
+    def wait_until_ready(self, timeout, before=None):
+        """
+        Waits until telemetry shows a reset has happened and the car is drivable again.
+
+        Args:
+            timeout (float): The longest time to wait, in seconds.
+            before (dict, optional): The last telemetry frame before the reset keys were sent, so a reset that
+                                     completed during min_wait is still seen.
+
+        Returns:
+            bool: True once the car is drivable after a reset, False on timeout.
+        """
+        deadline = time.perf_counter() + timeout
+        if self.telemetry_channel is None:
+            time.sleep(timeout)
+            return False
+
+        time.sleep(min(self.min_wait, timeout))
+        sequence = self.telemetry_channel.sequence
+        previous = before
+        reset_seen = False
+        ready_since = None
+
+        while time.perf_counter() < deadline:
+            remaining = deadline - time.perf_counter()
+            if not self.telemetry_channel.wait(sequence, min(remaining, self.stall)):
+                if self.stall < remaining:
+                    reset_seen = True  # Telemetry stopped while the game paused or loaded
+                continue
+            sequence, _, frame = self.telemetry_channel.read_dict()
+            now = time.perf_counter()
+
+            if previous is not None and not reset_seen and self._reset(previous, frame):
+                reset_seen = True
+            elif reset_seen and previous is not None and self._drivable(previous, frame):
+                if ready_since is None:
+                    ready_since = now
+                if now - ready_since >= self.settle:
+                    return True
+            else:
+                ready_since = None
+            previous = frame
+        return False
+
+    def _reset(self, previous, frame):
+        """
+        Checks whether two telemetry frames show a reset between them: the session pausing or restarting, the
+        lap timer restarting or the car being moved.
+        """
+        if frame.get('session_time', 1.0) <= previous.get('session_time', 0.0):
+            return True
+        if frame.get('current_lap_time_ms', 0) < previous.get('current_lap_time_ms', 0):
+            return True
+        return not self._continuous(previous, frame)
+
+    def _drivable(self, previous, frame):
+        """
+        Checks whether two consecutive telemetry frames look like a car on track in a running session.
+        """
+        if frame.get('session_time', 1.0) <= previous.get('session_time', 0.0):
+            return False  # Paused, in a menu or loading
+        return self._continuous(previous, frame)
+
+    def _continuous(self, previous, frame):
+        """
+        Checks whether the car moved at most max_jump metres between two telemetry frames.
+        """
+        jump = math.sqrt(sum((frame[axis] - previous[axis]) ** 2
+                             for axis in ('world_position_x', 'world_position_y', 'world_position_z')))
+        return jump <= self.max_jump
+
+    def reset(self, keys, timeout):
+        """
+        Sends a key sequence and waits until the car is drivable.
+
+        Args:
+            keys (list of str): The keys to press in turn.
+            timeout (float): The longest time to wait after the key sequence, in seconds.
+
+        Returns:
+            bool: True if the car became drivable before the timeout.
+        """
+        start = time.perf_counter()
+        before = None
+        if self.telemetry_channel is not None and self.telemetry_channel.sequence:
+            before = self.telemetry_channel.read_dict()[2]
+        self.press_keys(keys)
+        ready = self.wait_until_ready(timeout, before)
+        if not ready:
+            self.timeouts += 1
+        self.waits.append(time.perf_counter() - start)
+        return ready
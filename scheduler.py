@@ -0,0 +1,121 @@
+import time
+from metrics import LatencyHistogram
+
+
+class FixedRateScheduler:
+    """
+    Paces a control loop at a fixed rate against absolute deadlines.
+
+    Tick k is due at start + k * period, so time spent working in a tick does not push later ticks back. When a
+    tick overruns its successor's deadline the scheduler either skips the missed ticks and waits for the next
+    deadline, or catches up by starting the following ticks immediately until it is back on schedule. A backlog
+    of more than max_catch_up ticks is always skipped.
+
+    Attributes:
+        rate (float): The target tick rate in Hz.
+        period (float): The target tick period in seconds.
+        catch_up (bool): Whether to catch up on missed ticks rather than skip them.
+        max_catch_up (int): The largest backlog of ticks that is caught up.
+        tick (int): The index of the current tick since start.
+        overruns (int): The number of ticks that ran past the next tick's deadline.
+        skipped (int): The number of ticks skipped because of overruns.
+        latency (LatencyHistogram): The time from the start of each tick to the call to wait.
+        jitter (LatencyHistogram): How late each tick started relative to its deadline.
+    """
+
+    def __init__(self, rate=10.0, catch_up=False, max_catch_up=3, spin=0.001):
+        """
+        Initializes the FixedRateScheduler.
+
+        Args:
+            rate (float): The target tick rate in Hz.
+            catch_up (bool): Whether to catch up on missed ticks rather than skip them.
+            max_catch_up (int): The largest backlog of ticks that is caught up.
+            spin (float): Seconds before a deadline to stop sleeping and spin, for sub-millisecond wake-ups.
+        """
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.catch_up = catch_up
+        self.max_catch_up = max_catch_up
+        self.spin = spin
+        self.overruns = 0
+        self.skipped = 0
+        self.latency = LatencyHistogram()
+        self.jitter = LatencyHistogram()
+        self.start()
+
+    def start(self):
+        """
+        Starts a new run of ticks with tick 0 due now. The histograms and counters carry over.
+        """
+        self.tick = 0
+        self.start_time = time.perf_counter()
+        self.tick_start = self.start_time
+
+    def deadline(self, tick):
+        """
+        The time a tick is due.
+
+        Args:
+            tick (int): The tick index.
+
+        Returns:
+            float: The deadline, from time.perf_counter.
+        """
+        return self.start_time + tick * self.period
+
+    def wait(self):
+        """
+        Ends the current tick and waits until the next one is due.
+
+        Returns:
+            int: The index of the next tick.
+        """
+        now = time.perf_counter()
+        self.latency.record(now - self.tick_start)
+        self.tick += 1
+        deadline = self.deadline(self.tick)
+
+        if now > deadline:
+            self.overruns += 1
+            backlog = int((now - deadline) // self.period)
+            if not self.catch_up or backlog > self.max_catch_up:
+                # Skip every tick whose deadline has passed and wait for the next one
+                self.skipped += backlog + 1
+                self.tick += backlog + 1
+                deadline = self.deadline(self.tick)
+
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin:
+            time.sleep(remaining - self.spin)
+        while time.perf_counter() < deadline:
+            pass
+
+        self.tick_start = time.perf_counter()
+        self.jitter.record(self.tick_start - deadline)
+        return self.tick
+
+    def snapshot(self):
+        """
+        Summarizes the achieved rate and timing.
+
+        Returns:
+            dict: The ticks run, overruns, skipped ticks and latency and jitter snapshots.
+        """
+        return {
+            'ticks': self.latency.count,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'latency': self.latency.snapshot(),
+            'jitter': self.jitter.snapshot(),
+        }
+
+    def log(self):
+        """
+        Prints a one-line summary of the tick timing.
+        """
+        latency = self.latency.snapshot()
+        jitter = self.jitter.snapshot()
+        print(f"Control loop at {self.rate:.0f} Hz: {self.latency.count} ticks, {self.overruns} overruns, "
+              f"{self.skipped} skipped, latency p50 {latency['p50'] * 1e3:.1f} ms p99 {latency['p99'] * 1e3:.1f} ms, "
+              f"jitter p50 {jitter['p50'] * 1e3:.2f} ms p99 {jitter['p99'] * 1e3:.2f} ms")
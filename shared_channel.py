@@ -0,0 +1,177 @@
+import multiprocessing
+import platform
+import time
+import numpy as np
+from multiprocessing import shared_memory
+
+# Processors whose stores become visible to other cores in program order, which the lock-free seqlock relies on
+_ORDERED_STORES = platform.machine().lower() in ('x86_64', 'amd64', 'i386', 'i686', 'x86')
+
+
+class SharedFrameChannel:
+    """
+    A single-writer, latest-value channel for fixed-schema frames in shared memory.
+
+    The producer overwrites the one frame slot in place and readers always see the freshest frame, so nothing is
+    pickled or queued and a slow reader never falls behind. Consistency is kept with a seqlock: the writer makes
+    the sequence counter odd while it writes and even once done, and readers retry if the counter was odd or
+    changed while they copied the values. A reader that keeps finding a write in progress yields to the writer
+    between attempts and gives up with a TimeoutError after max_retries, rather than spinning forever on a writer
+    that died mid-write. The seqlock relies on stores becoming visible in program order, which holds on x86. On
+    other processors writes and reads fall back to a shared lock.
+
+    Every frame carries a capture timestamp from time.perf_counter, which reads the same system-wide monotonic
+    clock in every process, so frames from different channels can be aligned in time.
+
+    The segment holds an int64 sequence counter, a float64 timestamp and one float64 per field.
+
+    Attributes:
+        fields (list of str): The field names, in slot order.
+        name (str): The shared memory segment name, used to attach from other processes.
+        lock (multiprocessing.Lock or None): The lock guarding writes and reads where the seqlock is not safe.
+        max_retries (int): The number of attempts a read makes before raising TimeoutError.
+    """
+
+    def __init__(self, fields, name=None, create=True, lock=None, max_retries=10000):
+        """
+        Creates a channel, or attaches to an existing one.
+
+        Args:
+            fields (iterable of str): The field names, in slot order. Must match across processes.
+            name (str, optional): The segment name. Defaults to a generated name when creating.
+            create (bool): Whether to create the segment rather than attach to it.
+            lock (multiprocessing.Lock, optional): The creator's lock, when attaching. Created automatically on
+                                                   processors without ordered stores.
+            max_retries (int): The number of attempts a read makes before raising TimeoutError.
+        """
+        self.fields = list(fields)
+        self._create = create
+        self.lock = multiprocessing.Lock() if create and not _ORDERED_STORES else lock
+        self.max_retries = max_retries
+        size = 8 * (2 + len(self.fields))
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self.shm.name
+
+        self._sequence = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf, offset=0)
+        self._timestamp = np.ndarray((1,), dtype=np.float64, buffer=self.shm.buf, offset=8)
+        self._values = np.ndarray((len(self.fields),), dtype=np.float64, buffer=self.shm.buf, offset=16)
+        self._out = np.empty(len(self.fields))
+        if create:
+            self._sequence[0] = 0
+
+    def __getstate__(self):
+        return {'fields': self.fields, 'name': self.name, 'lock': self.lock, 'max_retries': self.max_retries}
+
+    def __setstate__(self, state):
+        # Child processes attach to the parent's segment rather than creating their own
+        self.__init__(state['fields'], state['name'], create=False, lock=state['lock'],
+                      max_retries=state['max_retries'])
+
+    def write(self, frame, timestamp=None):
+        """
+        Publishes a frame, replacing the previous one.
+
+        Args:
+            frame (dict): The frame, holding a numeric value for every field.
+            timestamp (float, optional): When the frame was captured, from time.perf_counter. Defaults to now.
+        """
+        self.write_values([frame[field] for field in self.fields], timestamp)
+
+    def write_values(self, values, timestamp=None):
+        """
+        Publishes a frame given as values in slot order.
+
+        Args:
+            values (sequence of float): One value per field.
+            timestamp (float, optional): When the frame was captured, from time.perf_counter. Defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self.lock is not None:
+            with self.lock:
+                self._write(values, timestamp)
+        else:
+            self._write(values, timestamp)
+
+    def _write(self, values, timestamp):
+        sequence = int(self._sequence[0])
+        self._sequence[0] = sequence + 1
+        self._timestamp[0] = timestamp
+        self._values[:] = values
+        self._sequence[0] = sequence + 2
+
+    @property
+    def sequence(self):
+        """
+        The number of frames written so far.
+        """
+        return int(self._sequence[0]) // 2
+
+    def read(self, out=None):
+        """
+        Copies the latest frame into a reusable buffer.
+
+        Args:
+            out (np.ndarray, optional): The buffer to fill. Defaults to a buffer owned by this channel, which is
+                                        overwritten by the next read.
+
+        Returns:
+            tuple: The frame's sequence number, 0 if nothing has been written yet, its capture timestamp and the
+                   values in slot order.
+        """
+        if out is None:
+            out = self._out
+        if self.lock is not None:
+            with self.lock:
+                np.copyto(out, self._values)
+                return int(self._sequence[0]) // 2, float(self._timestamp[0]), out
+
+        for _ in range(self.max_retries):
+            before = int(self._sequence[0])
+            if not before & 1:
+                timestamp = float(self._timestamp[0])
+                np.copyto(out, self._values)
+                # The frame is only consistent if no write started or finished during the copy
+                if int(self._sequence[0]) == before:
+                    return before // 2, timestamp, out
+            time.sleep(0)  # Write in progress: yield to the writer before retrying
+        raise TimeoutError(f"No consistent frame after {self.max_retries} reads; the writer may have stopped "
+                           f"mid-write")
+
+    def read_dict(self):
+        """
+        Reads the latest frame as a dictionary.
+
+        Returns:
+            tuple: The frame's sequence number, its capture timestamp and a dictionary of field values.
+        """
+        sequence, timestamp, values = self.read()
+        return sequence, timestamp, dict(zip(self.fields, values.tolist()))
+
+    def wait(self, last_sequence=0, timeout=None, poll_interval=0.0005):
+        """
+        Waits until a frame newer than last_sequence has been written.
+
+        Args:
+            last_sequence (int): The sequence number of the last frame consumed.
+            timeout (float, optional): Seconds to wait before giving up. Defaults to waiting forever.
+            poll_interval (float): Seconds to sleep between checks.
+
+        Returns:
+            bool: True once a newer frame is available, False on timeout.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.sequence <= last_sequence:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            time.sleep(poll_interval)
+        return True
+
+    def close(self):
+        """
+        Detaches from the segment, unlinking it if this instance created it.
+        """
+        self._sequence = self._timestamp = self._values = None
+        self.shm.close()
+        if self._create:
+            self.shm.unlink()
@@ -0,0 +1,271 @@
+import argparse
+import socket
+import threading
+import time
+import numpy as np
+from data_classes import PacketHeader, CarMotionData, LapData, CarTelemetryData, CarStatusData, NUM_CARS
+from data_processing import DataProcessor
+
+# Packet ID -> (record class, trailing bytes after the 22 car records in an F1 23 packet)
+PACKETS = {
+    0: (CarMotionData, 0),
+    2: (LapData, 2),
+    6: (CarTelemetryData, 3),
+    7: (CarStatusData, 0),
+}
+
+
+class TelemetrySimulator:
+    """
+    Generates valid F1 23 motion, lap, telemetry and status packets for synthetic cars driving an elliptical
+    track, so the collector can be load tested without the game.
+
+    Each packet is a preallocated bytearray. The car records are updated in place every frame through NumPy
+    record views over the datagram, using the same layouts data_classes.py decodes.
+
+    Attributes:
+        num_cars (int): The number of active cars, at most 22. The remaining car slots are left zeroed.
+        rate (float): The packet rate in frames per second.
+        track_length (float): The approximate lap length in metres.
+        session_uid (int): The session identifier written to every header.
+        frame (int): The frame_identifier of the next frame.
+        datagrams (dict): The preallocated datagram of each packet ID.
+    """
+
+    def __init__(self, num_cars=20, rate=60.0, semi_major=900.0, semi_minor=450.0, session_uid=None, seed=0):
+        """
+        Initializes the TelemetrySimulator.
+
+        Args:
+            num_cars (int): The number of active cars, at most 22.
+            rate (float): The packet rate in frames per second.
+            semi_major (float): The semi-major axis of the elliptical track in metres.
+            semi_minor (float): The semi-minor axis of the elliptical track in metres.
+            session_uid (int, optional): The session identifier. Defaults to a random value.
+            seed (int): Seeds the starting positions and per-car pace.
+        """
+        if not 0 < num_cars <= NUM_CARS:
+            raise ValueError(f"num_cars must be between 1 and {NUM_CARS}")
+
+        rng = np.random.default_rng(seed)
+        self.num_cars = num_cars
+        self.rate = rate
+        self.a = semi_major
+        self.b = semi_minor
+        # Ramanujan's approximation of the ellipse circumference
+        self.track_length = np.pi * (3 * (self.a + self.b) - np.sqrt((3 * self.a + self.b) * (self.a + 3 * self.b)))
+        self.session_uid = session_uid if session_uid is not None else int(rng.integers(1, 2 ** 63))
+        self.frame = 0
+
+        # Cars start spread over the first 200 m with slightly different pace
+        self.distance = np.linspace(200.0, 0.0, num_cars)
+        self.pace = rng.uniform(0.95, 1.05, num_cars)
+        self.lap_start = np.zeros(num_cars)
+        self.last_lap = np.zeros(num_cars)
+
+        self.datagrams = {}
+        self.records = {}
+        for packet_id, (record_class, trailer) in PACKETS.items():
+            datagram = bytearray(PacketHeader.LAYOUT.size + NUM_CARS * record_class.LAYOUT.size + trailer)
+            self.datagrams[packet_id] = datagram
+            self.records[packet_id] = np.frombuffer(datagram, dtype=record_class.LAYOUT.dtype, count=NUM_CARS,
+                                                    offset=PacketHeader.LAYOUT.size)[:num_cars]
+
+        status = self.records[7]
+        status['fuel_mix'] = 1
+        status['front_brake_bias'] = 56
+        status['fuel_in_tank'] = 100.0
+        status['fuel_capacity'] = 110.0
+        status['fuel_remaining_laps'] = 40.0
+        status['max_rpm'] = 13000
+        status['idle_rpm'] = 4000
+        status['max_gears'] = 8
+        status['actual_tyre_compound'] = 17
+        status['visual_tyre_compound'] = 17
+        status['ers_store_energy'] = 4.0e6
+
+    def step(self):
+        """
+        Advances every car by one frame and rewrites the packets in place.
+
+        Returns:
+            list of bytearray: The motion, lap, telemetry and status datagrams of the frame.
+        """
+        dt = 1.0 / self.rate
+        session_time = self.frame * dt
+
+        # Position on the ellipse, parameterised by the fraction of the lap completed
+        theta = 2 * np.pi * (self.distance % self.track_length) / self.track_length
+        sin, cos = np.sin(theta), np.cos(theta)
+        dx, dz = -self.a * sin, self.b * cos
+        tangent = np.hypot(dx, dz)
+        forward_x, forward_z = dx / tangent, dz / tangent
+        curvature = self.a * self.b / tangent ** 3
+
+        # Slow down where the track is tight, speed up on the straights
+        speed = self.pace * np.clip(90.0 / np.sqrt(np.maximum(curvature, 1e-6) * 1000.0), 25.0, 90.0)
+        previous = self.records[6]['speed'] / 3.6
+        acceleration = (speed - previous) / dt if self.frame else np.zeros(self.num_cars)
+
+        self.distance += speed * dt
+        self._write_motion(self.a * cos, self.b * sin, forward_x, forward_z, speed, curvature, acceleration)
+        self._write_lap(session_time)
+        self._write_telemetry(speed, curvature, acceleration)
+
+        for packet_id, datagram in self.datagrams.items():
+            PacketHeader.LAYOUT.struct.pack_into(datagram, 0, 2023, 23, 1, 0, 1, packet_id, self.session_uid,
+                                                 session_time, self.frame, self.frame, 0, 255)
+        self.frame += 1
+        return list(self.datagrams.values())
+
+    def _write_motion(self, x, z, forward_x, forward_z, speed, curvature, acceleration):
+        """
+        Writes the motion records of the active cars.
+        """
+        motion = self.records[0]
+        motion['world_position_x'] = x
+        motion['world_position_y'] = 0.0
+        motion['world_position_z'] = z
+        motion['world_velocity_x'] = forward_x * speed
+        motion['world_velocity_z'] = forward_z * speed
+        motion['world_forward_dir_x'] = np.round(forward_x * 32767)
+        motion['world_forward_dir_z'] = np.round(forward_z * 32767)
+        motion['world_right_dir_x'] = np.round(-forward_z * 32767)
+        motion['world_right_dir_z'] = np.round(forward_x * 32767)
+        motion['g_force_lateral'] = speed ** 2 * curvature / 9.81
+        motion['g_force_longitudinal'] = acceleration / 9.81
+        motion['g_force_vertical'] = 1.0
+        motion['yaw'] = np.arctan2(forward_x, forward_z)
+
+    def _write_lap(self, session_time):
+        """
+        Writes the lap records of the active cars, starting a new lap for each car that crossed the line.
+        """
+        lap = self.records[2]
+        lap_num = (self.distance // self.track_length).astype(np.int64) + 1
+        new_lap = lap_num > lap['current_lap_num']
+        started = lap['current_lap_num'] > 0
+        self.last_lap = np.where(new_lap & started, session_time - self.lap_start, self.last_lap)
+        self.lap_start = np.where(new_lap & started, session_time, self.lap_start)
+
+        lap_distance = self.distance % self.track_length
+        lap['last_lap_time_ms'] = self.last_lap * 1000
+        lap['current_lap_time_ms'] = (session_time - self.lap_start) * 1000
+        lap['lap_distance'] = lap_distance
+        lap['total_distance'] = self.distance
+        lap['current_lap_num'] = lap_num
+        lap['car_position'] = np.argsort(np.argsort(-self.distance)) + 1
+        lap['grid_position'] = np.arange(1, self.num_cars + 1)
+        lap['sector'] = np.minimum(3 * lap_distance // self.track_length, 2)
+        lap['driver_status'] = 4  # On track
+        lap['result_status'] = 2  # Active
+
+    def _write_telemetry(self, speed, curvature, acceleration):
+        """
+        Writes the telemetry records of the active cars.
+        """
+        telemetry = self.records[6]
+        speed_kph = speed * 3.6
+        gear = np.clip(speed_kph // 40 + 1, 1, 8)
+        telemetry['speed'] = np.round(speed_kph)
+        telemetry['throttle'] = np.clip(0.6 + acceleration / 10.0, 0.0, 1.0)
+        telemetry['brake'] = np.clip(-acceleration / 20.0, 0.0, 1.0)
+        telemetry['steer'] = np.clip(curvature * 100.0, -1.0, 1.0)
+        telemetry['gear'] = gear
+        telemetry['engine_rpm'] = 4000 + (speed_kph - (gear - 1) * 40) / 40 * 9000
+        telemetry['brakes_temperature'] = 500
+        telemetry['tyres_surface_temperature'] = 95
+        telemetry['tyres_inner_temperature'] = 100
+        telemetry['engine_temperature'] = 110
+        telemetry['tyres_pressure'] = 23.0
+
+    def run(self, ip="127.0.0.1", port=20777, duration=None, frames=None):
+        """
+        Sends frames over UDP at the configured rate, against absolute deadlines.
+
+        Args:
+            ip (str): The destination IP address.
+            port (int): The destination port.
+            duration (float, optional): Seconds to run for.
+            frames (int, optional): The number of frames to send. Runs until interrupted if neither is given.
+
+        Returns:
+            dict: The frames and datagrams sent, the elapsed time and the achieved frame rate.
+        """
+        udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        period = 1.0 / self.rate
+        start = time.perf_counter()
+        sent = 0
+
+        try:
+            while (frames is None or sent < frames) and (duration is None or time.perf_counter() - start < duration):
+                for datagram in self.step():
+                    udp_socket.sendto(datagram, (ip, port))
+                sent += 1
+
+                delay = start + sent * period - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            udp_socket.close()
+
+        elapsed = time.perf_counter() - start
+        return {'frames': sent, 'datagrams': sent * len(PACKETS), 'elapsed': elapsed, 'rate': sent / elapsed}
+
+
+def benchmark(rate=60.0, duration=10.0, num_cars=20, port=20778):
+    """
+    Measures DataProcessor throughput and frame drop rate against the simulator on a local port.
+
+    Args:
+        rate (float): The packet rate in frames per second.
+        duration (float): Seconds to send for.
+        num_cars (int): The number of active cars.
+        port (int): The local port used for the run.
+
+    Returns:
+        dict: The frames sent and collected, the drop rate and the achieved send rate.
+    """
+    data_processor = DataProcessor(port=port)
+    data_processor.open()
+    collected = []
+
+    def consume():
+        for _ in data_processor.collect_packet():
+            collected.append(time.perf_counter())
+
+    threading.Thread(target=consume, daemon=True).start()
+    result = TelemetrySimulator(num_cars=num_cars, rate=rate).run(port=port, duration=duration)
+    time.sleep(0.5)  # Let the collector drain the socket
+
+    result['collected'] = len(collected)
+    result['drop_rate'] = 1 - len(collected) / result['frames'] if result['frames'] else 0.0
+    return result
+
+
+def main():
+    """
+    Runs the simulator, or benchmarks DataProcessor against it.
+    """
+    parser = argparse.ArgumentParser(description="Send synthetic F1 23 telemetry over UDP.")
+    parser.add_argument('--ip', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=20777)
+    parser.add_argument('--rate', type=float, default=60.0, help="Frames per second.")
+    parser.add_argument('--cars', type=int, default=20, help="Number of active cars.")
+    parser.add_argument('--duration', type=float, default=None, help="Seconds to run for.")
+    parser.add_argument('--benchmark', action='store_true', help="Measure DataProcessor throughput and drops.")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = benchmark(args.rate, args.duration or 10.0, args.cars, args.port)
+        print(f"Sent {result['frames']} frames at {result['rate']:.1f} Hz, collected {result['collected']}, "
+              f"drop rate {result['drop_rate']:.2%}")
+    else:
+        result = TelemetrySimulator(num_cars=args.cars, rate=args.rate).run(args.ip, args.port, args.duration)
+        print(f"Sent {result['frames']} frames ({result['datagrams']} datagrams) at {result['rate']:.1f} Hz")
+
+
+if __name__ == "__main__":
+    main()
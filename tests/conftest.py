@@ -0,0 +1,22 @@
+import os
+import sys
+
+import neat
+import pytest
+
+# The modules live at the top level of the repository rather than in a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from model_functions import ModelFunctions
+
+
+@pytest.fixture
+def config():
+    """
+    The training NEAT configuration, with sig_soft_act registered as in main.py.
+    """
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(ROOT, 'neat_config.cfg'))
+    config.genome_config.add_activation("sig_soft_act", ModelFunctions.leaky_relu)
+    return config
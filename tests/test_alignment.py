@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+from alignment import StreamAligner
+from shared_channel import SharedFrameChannel
+
+
+@pytest.fixture
+def channel():
+    channel = SharedFrameChannel(['left', 'right'])
+    yield channel
+    channel.close()
+
+
+def test_joins_the_nearest_result_in_the_history(channel):
+    aligner = StreamAligner(channel, tolerance=0.05, max_wait=0.0)
+    for index, timestamp in enumerate([10.0, 10.03, 10.06]):
+        channel.write_values([index, 0], timestamp=timestamp)
+        aligner.poll()
+
+    data, offset = aligner.align(10.025)  # Older than the newest result, so no wait
+    assert data == {'left': 1.0, 'right': 0.0}
+    assert offset == pytest.approx(0.005)
+    assert aligner.poll() is False  # Nothing new was published
+
+
+def test_drops_frames_without_a_result_within_the_tolerance(channel):
+    aligner = StreamAligner(channel, tolerance=0.01, max_wait=0.0)
+    assert aligner.align(5.0) is None  # Nothing published yet
+    channel.write_values([1, 1], timestamp=5.0)
+    assert aligner.align(5.5) is None
+    assert (aligner.aligned, aligner.dropped) == (0, 2)
+
+
+def test_waits_for_a_result_captured_after_the_frame(channel):
+    now = time.perf_counter()
+    channel.write_values([0, 0], timestamp=now - 0.04)
+    aligner = StreamAligner(channel, tolerance=0.03, max_wait=0.5)
+    writer = threading.Timer(0.05, channel.write_values, args=([1, 1],), kwargs={'timestamp': now + 0.01})
+    writer.start()
+    data, offset = aligner.align(now)
+    writer.join()
+    assert data == {'left': 1.0, 'right': 1.0}
+    assert offset == pytest.approx(0.01)
+
+
+def test_history_is_bounded(channel):
+    aligner = StreamAligner(channel, history=3)
+    for index in range(5):
+        channel.write_values([index, 0], timestamp=float(index))
+        aligner.poll()
+    assert [sample[1] for sample in aligner.history] == [2.0, 3.0, 4.0]
@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+
+from archive import ARCHIVE_COLS, TelemetryArchive, TelemetryArchiveWriter, archive_recording, build_index
+from replay import TelemetryRecorder
+from simulator import TelemetrySimulator
+
+
+def make_frame(session_uid, frame_identifier, lap):
+    """
+    A frame holding every archived field, with values derived from the frame identifier.
+    """
+    frame = {'session_uid': session_uid, 'frame_identifier': frame_identifier, 'session_time': frame_identifier / 60}
+    for packet_type, keys in ARCHIVE_COLS.items():
+        frame[packet_type] = dict((key, frame_identifier % 100) for key in keys)
+    frame['lap_data']['current_lap_num'] = lap
+    return frame
+
+
+def write(path, frames, chunk_size=4):
+    with TelemetryArchiveWriter(path, chunk_size=chunk_size) as writer:
+        for frame in frames:
+            writer.append(make_frame(*frame))
+    return writer
+
+
+def test_append_read_and_index(tmp_path):
+    path = str(tmp_path / 'archive')
+    frames = [(7, frame, 1 + frame // 5) for frame in range(10)] + [(9, frame, 1) for frame in range(3)]
+    write(path, frames)
+
+    archive = TelemetryArchive(path)
+    assert archive.rows == 13
+    np.testing.assert_array_equal(archive.column('frame_identifier'), [frame for _, frame, _ in frames])
+    assert archive.sessions['7'] == {'rows': [0, 10], 'laps': {'1': [0, 5], '2': [5, 10]}}
+    assert archive.sessions['9'] == {'rows': [10, 13], 'laps': {'1': [10, 13]}}
+
+    lap = archive.read(['frame_identifier', 'speed'], session_uid=7, lap=2)
+    np.testing.assert_array_equal(lap['frame_identifier'], [5, 6, 7, 8, 9])
+    assert archive.select(session_uid=7, frames=(2, 4)) == slice(2, 4)
+    assert archive.select() == slice(0, 13)
+
+
+def test_appending_extends_the_index(tmp_path):
+    path = str(tmp_path / 'archive')
+    write(path, [(7, frame, 1) for frame in range(3)])
+    write(path, [(7, frame, 2) for frame in range(3, 6)])
+    archive = TelemetryArchive(path)
+    assert archive.sessions['7'] == {'rows': [0, 6], 'laps': {'1': [0, 3], '2': [3, 6]}}
+
+
+def test_rows_flushed_by_an_unclosed_writer_are_cut_off(tmp_path):
+    path = str(tmp_path / 'archive')
+    write(path, [(7, frame, 1) for frame in range(3)])
+
+    crashed = TelemetryArchiveWriter(path, chunk_size=2)
+    for frame in range(100, 104):
+        crashed.append(make_frame(7, frame, 1))  # Flushed twice, but meta.json is never rewritten
+
+    write(path, [(7, frame, 2) for frame in range(3, 5)])
+    archive = TelemetryArchive(path)
+    np.testing.assert_array_equal(archive.column('frame_identifier'), [0, 1, 2, 3, 4])
+    for name, (dtype, shape) in archive.columns.items():
+        assert os.path.getsize(os.path.join(path, f"{name}.bin")) == 5 * dtype.itemsize * int(np.prod(shape))
+
+
+def test_custom_cols_keep_the_lap_number(tmp_path):
+    path = str(tmp_path / 'archive')
+    writer = TelemetryArchiveWriter(path, cols={'car_motion': ['world_position_x']})
+    assert writer.cols == {'car_motion': ['world_position_x'], 'lap_data': ['current_lap_num']}
+    writer.close()
+
+
+def test_build_index_merges_interleaved_sessions():
+    sessions = build_index(np.array([1, 1, 2, 2, 1]), np.array([1, 2, 1, 1, 2]))
+    assert sessions == {'1': {'rows': [0, 5], 'laps': {'1': [0, 1], '2': [1, 5]}},
+                        '2': {'rows': [2, 4], 'laps': {'1': [2, 4]}}}
+
+
+def test_archive_recording(tmp_path):
+    recording = str(tmp_path / 'session.f1tr')
+    simulator = TelemetrySimulator(seed=4)
+    with TelemetryRecorder(recording) as recorder:
+        for _ in range(5):
+            for data in simulator.step():
+                recorder.write(data)
+    assert archive_recording(recording, str(tmp_path / 'archive')) == 5
+    assert len(TelemetryArchive(str(tmp_path / 'archive')).sessions) == 1
@@ -0,0 +1,66 @@
+import asyncio
+import socket
+
+from async_processing import AsyncDataProcessor
+from data_processing import DataProcessor
+from simulator import TelemetrySimulator
+
+
+async def send_frames(collector, frames):
+    address = collector.transport.get_extra_info('sockname')
+    simulator = TelemetrySimulator(seed=2)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+        for _ in range(frames):
+            for data in simulator.step():
+                sender.sendto(data, address)
+            await asyncio.sleep(0.01)  # Let the event loop receive them
+
+
+def test_frames_are_published_in_order():
+    async def run():
+        async with AsyncDataProcessor(DataProcessor(port=0)) as collector:
+            await send_frames(collector, 3)
+            frames = [await asyncio.wait_for(collector.next_frame(), 1) for _ in range(3)]
+            assert collector.latest_frame() is frames[-1]
+            return frames
+
+    frames = asyncio.run(run())
+    times = [frame['current_lap_time_ms'] for frame in frames]
+    assert times == sorted(times) and len(set(times)) == 3
+    assert set(key for keys in DataProcessor.cols.values() for key in keys) <= set(frames[0])
+
+
+def test_close_drains_buffered_frames_then_stops_iteration():
+    async def run():
+        collector = AsyncDataProcessor(DataProcessor(port=0))
+        await collector.start()
+        await send_frames(collector, 2)
+        collector.close()
+        return [frame async for frame in collector]
+
+    assert len(asyncio.run(asyncio.wait_for(run(), 5))) == 2
+
+
+def test_close_wakes_waiting_consumers():
+    async def run():
+        collector = AsyncDataProcessor(DataProcessor(port=0))
+        await collector.start()
+
+        async def consume():
+            return [frame async for frame in collector]
+
+        consumers = [asyncio.create_task(consume()) for _ in range(2)]
+        await asyncio.sleep(0.05)  # Both consumers are now waiting in __anext__
+        collector.close()
+        return await asyncio.wait_for(asyncio.gather(*consumers), 1)
+
+    assert asyncio.run(run()) == [[], []]
+
+
+def test_full_queue_drops_the_oldest_frame():
+    async def run():
+        async with AsyncDataProcessor(DataProcessor(port=0), maxsize=2) as collector:
+            await send_frames(collector, 4)
+            return collector.dropped, collector.queue.qsize()
+
+    assert asyncio.run(run()) == (2, 2)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+cv = pytest.importorskip('cv2')
+pytest.importorskip('PIL')
+pytest.importorskip('pandas')
+from PIL import ImageGrab
+from CV import ScreenProcessor
+
+
+def make_screen():
+    """
+    Builds a 1920x1080 capture with track edges crossing every side of the ROI.
+    """
+    rng = np.random.default_rng(0)
+    screen = rng.integers(0, 40, (1080, 1920, 3)).astype(np.uint8)
+    for x0, x1 in [(300, 800), (1700, 1150), (640, 700), (1600, 1660)]:
+        cv.line(screen, (x0, 700), (x1, 400), (255, 255, 255), 6)
+    cv.rectangle(screen, (1630, 590), (1700, 650), (200, 200, 200), -1)
+    return screen
+
+
+def test_masked_edges_match_full_screen_pipeline(monkeypatch):
+    screen = make_screen()
+    monkeypatch.setattr(ImageGrab, 'grab', lambda bbox: screen[bbox[1]:bbox[3], bbox[0]:bbox[2]])
+
+    # The full-screen pipeline the ROI capture replaced
+    full = cv.cvtColor(cv.cvtColor(screen, cv.COLOR_BGR2RGB), cv.COLOR_RGB2GRAY)
+    full = cv.Canny(cv.GaussianBlur(full, (5, 5), 5), 100, 150)
+    mask = np.zeros_like(full)
+    cv.fillPoly(mask, [np.array([[(380, 600), (1640, 600), (1640, 500), (380, 500)]])], 255)
+    expected = cv.bitwise_and(full, mask)
+
+    processor = ScreenProcessor(display=False)
+    processor.process_frame()
+    left, top, right, bottom = processor.bbox
+    masked = np.zeros_like(expected)
+    masked[top:bottom, left:right] = processor._masked
+
+    assert expected[:, 1640].any() and expected[600].any()  # The ROI's right and bottom edges hold edges
+    np.testing.assert_array_equal(masked, expected)
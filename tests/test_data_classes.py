@@ -0,0 +1,106 @@
+import pytest
+
+from data_classes import (CarData, CarMotionData, CarStatusData, CarTelemetryData, LapData, NUM_CARS, PacketHeader,
+                          PacketLapData, parse_packet_car_motion_data, parse_packet_car_motion_records,
+                          parse_packet_lap_data, parse_packet_lap_records)
+from data_processing import DataProcessor, FrameAssembler
+from simulator import TelemetrySimulator
+
+CLASSES = {0: CarMotionData, 2: LapData, 6: CarTelemetryData, 7: CarStatusData}
+
+
+def datagrams(frames=5):
+    """
+    Motion, lap, telemetry and status datagrams from a few simulated frames.
+    """
+    simulator = TelemetrySimulator(num_cars=NUM_CARS, seed=1)
+    return [bytes(data) for _ in range(frames) for data in simulator.step()]
+
+
+def test_layout_sizes_match_the_packet_format():
+    assert [PacketHeader.LAYOUT.size] + [CLASSES[packet_id].LAYOUT.size for packet_id in sorted(CLASSES)] == \
+        [29, 60, 50, 60, 55]
+
+
+def test_struct_and_dtype_decodes_agree():
+    for data in datagrams():
+        packet_class = CLASSES[PacketHeader.LAYOUT.unpack(data)['packet_id']]
+        for layout, offset in ((PacketHeader.LAYOUT, 0), (packet_class.LAYOUT, PacketHeader.LAYOUT.size)):
+            unpacked = layout.unpack(data, offset)
+            record = layout.view(data, offset)[0]
+            assert list(unpacked) == layout.names
+            for name in layout.names:
+                value = record[name]
+                assert unpacked[name] == pytest.approx(value.tolist() if hasattr(value, 'tolist') else value)
+
+
+def test_to_dict_decodes_every_field():
+    for data in datagrams(frames=1):
+        header = PacketHeader(data).to_dict()
+        assert header == PacketHeader.LAYOUT.unpack(data)
+        record = CLASSES[header['packet_id']](data, PacketHeader.LAYOUT.size).to_dict()
+        assert list(record) == CLASSES[header['packet_id']].LAYOUT.names
+
+
+def test_records_match_per_car_decode():
+    parsers = {0: (parse_packet_car_motion_records, parse_packet_car_motion_data, 'car_motion_data', CarData),
+               2: (parse_packet_lap_records, parse_packet_lap_data, 'lap_data', PacketLapData)}
+    for data in datagrams(frames=2):
+        packet_id = PacketHeader.LAYOUT.unpack(data)['packet_id']
+        if packet_id not in parsers:
+            continue
+        parse_records, parse_data, key, packet_class = parsers[packet_id]
+        records = parse_records(data)
+        assert len(records) == NUM_CARS
+        for record, car in zip(records, parse_data(data)[key]):
+            assert dict(zip(records.dtype.names, record.item())) == pytest.approx(car)
+        assert (packet_class(data).to_records() == records).all()
+
+
+def test_records_view_the_packet_buffer():
+    data = bytearray(datagrams(frames=1)[0])
+    records = parse_packet_car_motion_records(data)
+    records[0].world_position_x = 12.5
+    assert CarMotionData(data, PacketHeader.LAYOUT.size).to_dict(['world_position_x']) == {'world_position_x': 12.5}
+
+
+def test_projection_matches_full_decode():
+    for data in datagrams():
+        header = PacketHeader(data)
+        full_header = header.to_dict()
+        assert header.to_dict(DataProcessor.header_cols) == \
+            {name: full_header[name] for name in DataProcessor.header_cols}
+
+        packet_class = CLASSES[full_header['packet_id']]
+        record = packet_class(data, PacketHeader.LAYOUT.size)
+        full = record.to_dict()
+        # Reversed, so the projection has to reorder as well as skip fields
+        names = packet_class.LAYOUT.names[::-3]
+        projected = record.to_dict(names)
+        assert list(projected) == names
+        assert projected == {name: full[name] for name in names}
+
+
+def test_projection_is_cached_and_rejects_unknown_fields():
+    assert LapData.LAYOUT.project(['lap_distance']) is LapData.LAYOUT.project(('lap_distance',))
+    with pytest.raises(KeyError):
+        LapData.LAYOUT.project(['lap_distance', 'not_a_field'])
+
+
+def test_process_datagram_decodes_only_the_consumed_fields():
+    processor = DataProcessor()
+    assembler = FrameAssembler(packet_type for packet_type, _ in processor.packet_types.values())
+    simulator = TelemetrySimulator(num_cars=NUM_CARS, seed=1)
+    for _ in range(5):
+        step = [bytes(data) for data in simulator.step()]
+        frames = [processor.process_datagram(data, assembler) for data in step]
+        frame = frames[-1]  # The last packet of a tick completes its frame
+        assert frames[:-1] == [None] * (len(step) - 1)
+
+        for data in step:
+            header = PacketHeader(data).to_dict()
+            packet_type, packet_class = processor.packet_types[header['packet_id']]
+            full = packet_class(data, PacketHeader.LAYOUT.size).to_dict()
+            assert frame[packet_type] == {name: full[name] for name in processor.cols.get(packet_type, ())}
+        assert frame['frame_identifier'] == header['frame_identifier']
+        assert frame['session_time'] == header['session_time']
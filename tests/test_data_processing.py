@@ -0,0 +1,95 @@
+import math
+
+from data_processing import CollectorStats, DataProcessor, FrameAssembler
+from simulator import TelemetrySimulator
+
+
+def header(frame_identifier, session_uid=1):
+    return {'session_uid': session_uid, 'frame_identifier': frame_identifier, 'session_time': frame_identifier / 60}
+
+
+def test_frame_completes_when_every_packet_type_arrives():
+    assembler = FrameAssembler(['car_motion', 'lap_data'])
+    assert assembler.add(header(1), 'car_motion', {'speed': 1}) is None
+    frame = assembler.add(header(1), 'lap_data', {'lap_distance': 2})
+    assert frame == {'session_uid': 1, 'frame_identifier': 1, 'session_time': 1 / 60,
+                     'car_motion': {'speed': 1}, 'lap_data': {'lap_distance': 2}}
+    assert not assembler.pending
+    assert assembler.dropped == 0
+
+
+def test_packets_of_other_ticks_and_sessions_are_not_mixed():
+    assembler = FrameAssembler(['car_motion', 'lap_data'])
+    assert assembler.add(header(1), 'car_motion', {'tick': 1}) is None
+    assert assembler.add(header(2), 'lap_data', {'tick': 2}) is None
+    assert assembler.add(header(1, session_uid=2), 'lap_data', {'tick': 1}) is None
+    frame = assembler.add(header(2), 'car_motion', {'tick': 2})
+    assert frame['car_motion'] == frame['lap_data'] == {'tick': 2}
+
+
+def test_completed_frame_drops_older_partial_frames():
+    assembler = FrameAssembler(['car_motion', 'lap_data'])
+    assembler.add(header(1), 'car_motion', {})
+    assembler.add(header(2), 'car_motion', {})
+    assembler.add(header(3), 'car_motion', {})
+    assert assembler.add(header(2), 'lap_data', {})['frame_identifier'] == 2
+    assert list(assembler.pending) == [(1, 3)]
+    assert assembler.dropped == 1
+
+    # A late packet of a dropped tick starts a new partial frame rather than completing an old one
+    assert assembler.add(header(1), 'lap_data', {}) is None
+
+
+def test_pending_frames_are_bounded():
+    assembler = FrameAssembler(['car_motion', 'lap_data'], max_pending=3)
+    for frame_identifier in range(10):
+        assembler.add(header(frame_identifier), 'car_motion', {})
+    assert list(assembler.pending) == [(1, 7), (1, 8), (1, 9)]
+    assert assembler.dropped == 7
+
+
+def packet(packet_id, frame_identifier, session_uid=1):
+    return {'packet_id': packet_id, 'session_uid': session_uid, 'frame_identifier': frame_identifier}
+
+
+def test_gaps_are_counted_against_the_send_stride():
+    stats = CollectorStats([0, 2])
+    for frame_identifier in (0, 2, 4, 8, 10):
+        stats.record_packet(packet(0, frame_identifier))
+    assert stats.gaps == 1  # Frame 6 is missing
+    assert stats.out_of_order == 0
+
+    stats.record_packet(packet(0, 9))
+    assert stats.out_of_order == 1
+    stats.record_packet(packet(0, 3, session_uid=2))  # A new session restarts the sequence
+    stats.record_packet(packet(99, 0))  # Untracked packets are only counted
+    stats.record_packet(packet(99, 50))
+    assert (stats.gaps, stats.out_of_order) == (1, 1)
+    assert stats.packets == {0: 7, 99: 2}
+
+
+def test_values_follow_fields():
+    stats = CollectorStats([0])
+    stats.record_packet(packet(0, 0))
+    stats.decode_time.record(0.00001)
+    values = dict(zip(CollectorStats.fields, stats.values()))
+    assert values['packets'] == 1 and values['decode_p50'] > 0
+    assert math.isnan(values['socket_overflows'])
+    stats.socket_overflows = 3
+    assert dict(zip(CollectorStats.fields, stats.values()))['socket_overflows'] == 3
+
+
+def test_collector_counts_lost_and_broken_datagrams():
+    simulator = TelemetrySimulator(seed=5)
+    datagrams = [bytes(data) for _ in range(6) for data in simulator.step()]
+    del datagrams[9]  # The lap packet of frame 2
+    datagrams.insert(12, b'\0' * 10)  # Shorter than a header
+
+    processor = DataProcessor(log_interval=None)
+    frames = list(processor.collect_frames(datagrams))
+    assert len(frames) == 5
+    assert processor.stats.frames == 5
+    assert processor.stats.incomplete_frames == 1
+    assert processor.stats.gaps == 1
+    assert processor.stats.decode_errors == 1
+    assert processor.stats.decode_time.count == len(datagrams) - 1
@@ -0,0 +1,119 @@
+import random
+import socket
+import threading
+
+import neat
+import pytest
+
+import distributed
+from distributed import (AuthenticationError, EvaluationCoordinator, EvaluationWorker, StandInBackend, load_secret,
+                         parse_address, recv_message, send_message)
+from evaluation import SuccessiveHalving
+
+SECRET = b'test secret'
+
+
+@pytest.fixture
+def pair():
+    left, right = socket.socketpair()
+    yield left, right
+    left.close()
+    right.close()
+
+
+def test_message_round_trip(pair):
+    message = {'type': 'task', 'task_id': 3, 'budget': 15.0, 'payload': b'\x00' * 100000}
+    send_message(pair[0], message, SECRET)
+    assert recv_message(pair[1], SECRET) == message
+    pair[0].close()
+    assert recv_message(pair[1], SECRET) is None
+
+
+def test_rejects_a_bad_signature(pair):
+    send_message(pair[0], {'type': 'hello'}, b'other secret')
+    with pytest.raises(AuthenticationError):
+        recv_message(pair[1], SECRET)
+
+
+def test_rejects_a_tampered_payload(pair):
+    send_message(pair[0], {'type': 'result', 'result': 1.0}, SECRET)
+    data = bytearray(pair[1].recv(1 << 16))
+    data[-2] ^= 1  # Flip a bit of the pickled message
+    pair[1].sendall(bytes(data))
+    with pytest.raises(AuthenticationError):
+        recv_message(pair[0], SECRET)
+
+
+def test_rejects_oversized_messages_before_reading_them(pair):
+    pair[0].sendall(distributed._HEADER.pack(distributed.MAX_MESSAGE_SIZE + 1) + b'\x00' * distributed._DIGEST_SIZE)
+    with pytest.raises(AuthenticationError, match='exceeds'):
+        recv_message(pair[1], SECRET)
+
+
+def test_load_secret(monkeypatch):
+    monkeypatch.delenv(distributed.SECRET_ENV, raising=False)
+    with pytest.raises(ValueError):
+        load_secret()
+    assert load_secret('given') == b'given'
+    monkeypatch.setenv(distributed.SECRET_ENV, 'from env')
+    assert load_secret() == b'from env'
+
+
+def test_parse_address():
+    assert parse_address('192.168.0.10:5555') == ('192.168.0.10', 5555)
+    assert parse_address(':5555') == ('localhost', 5555)
+
+
+@pytest.fixture
+def genomes(config):
+    random.seed(0)
+    return list(neat.Population(config).population.items())[:9]
+
+
+@pytest.fixture
+def coordinator():
+    coordinator = EvaluationCoordinator(port=0, heartbeat_timeout=2.0, worker_wait=1.0, secret=SECRET)
+    coordinator.start()
+    yield coordinator
+    coordinator.close()
+
+
+def start_worker(coordinator, secret=SECRET, **kwargs):
+    backend = StandInBackend(**kwargs)
+    worker = EvaluationWorker(('127.0.0.1', coordinator.port), backend, heartbeat_interval=0.2, secret=secret)
+    backend.worker = worker
+    thread = threading.Thread(target=worker.run, kwargs={'reconnect': False}, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_workers_evaluate_a_generation_on_localhost(coordinator, genomes):
+    threads = [start_worker(coordinator, seed=index) for index in range(2)]
+    results = coordinator.evaluate_many(genomes, budget=15.0)
+    expected = StandInBackend(time_scale=0.0)
+    assert results == dict((genome_id, expected(genome_id, genome, 15.0)) for genome_id, genome in genomes)
+
+    SuccessiveHalving(15, 45, 3).evaluate(genomes, evaluate_many=coordinator.evaluate_many)
+    assert all(genome.fitness is not None for _, genome in genomes)
+
+    coordinator.close()
+    for thread in threads:
+        thread.join(timeout=5.0)
+        assert not thread.is_alive()
+
+
+def test_failed_evaluations_are_retried(coordinator, genomes):
+    coordinator.max_retries = 10
+    start_worker(coordinator, failure_rate=0.5, seed=1)
+    results = coordinator.evaluate_many(genomes[:4], budget=15.0)
+    assert set(results) == set(genome_id for genome_id, _ in genomes[:4])
+    assert coordinator.retries > 0
+
+
+def test_workers_without_the_secret_are_dropped(coordinator, genomes):
+    thread = start_worker(coordinator, secret=b'wrong secret')
+    with pytest.raises(RuntimeError, match='No evaluation workers'):
+        coordinator.evaluate_many(genomes[:1], budget=15.0)
+    thread.join(timeout=5.0)
+    assert not thread.is_alive()
+    assert coordinator.workers == []
@@ -0,0 +1,150 @@
+import copy
+
+import neat
+import pytest
+
+from evaluation import FitnessCache, SuccessiveHalving, budget_invariant_fitness, fingerprint, genome_hash
+
+
+@pytest.fixture
+def genome(config):
+    genome = neat.DefaultGenome(1)
+    genome.configure_new(config.genome_config)
+    return genome
+
+
+def result(mean_reward, elapsed=15.0, budget=15.0):
+    return {'mean_reward': mean_reward, 'elapsed': elapsed, 'budget': budget}
+
+
+def make_genomes(config, count):
+    genomes = []
+    for key in range(count):
+        genome = neat.DefaultGenome(key)
+        genome.configure_new(config.genome_config)
+        genomes.append((key, genome))
+    return genomes
+
+
+def test_genome_hash_ignores_key_and_disabled_connections(genome):
+    clone = copy.deepcopy(genome)
+    clone.key = 2
+    assert genome_hash(clone) == genome_hash(genome)
+
+    connection = next(iter(clone.connections.values()))
+    connection.enabled = False
+    disabled = genome_hash(clone)
+    assert disabled != genome_hash(genome)
+    connection.weight += 1
+    assert genome_hash(clone) == disabled
+
+    next(iter(clone.nodes.values())).bias += 1e-12
+    assert genome_hash(clone) != disabled
+
+
+def test_lookup_needs_enough_runs_and_averages_them(genome):
+    cache = FitnessCache(evaluations=2)
+    cache.store(genome, result(10.0), generation=0)
+    assert cache.lookup(genome, 0, 15.0) is None
+    cache.store(genome, result(20.0, elapsed=7.5), generation=0)
+    expected = (budget_invariant_fitness(10.0, 15.0, 15.0, 45.0) + budget_invariant_fitness(20.0, 7.5, 15.0, 45.0)) / 2
+    assert cache.lookup(genome, 0, 45.0) == pytest.approx(expected)
+
+    # Only the last evaluations runs are kept
+    cache.store(genome, result(30.0), generation=0)
+    assert [run['mean_reward'] for run in cache.entries[genome_hash(genome)]['results']] == [20.0, 30.0]
+
+    assert FitnessCache(evaluations=1, reuse=False).lookup(genome, 0, 15.0) is None
+
+
+def test_split_scores_cache_hits(config, genome):
+    other = neat.DefaultGenome(2)
+    other.configure_new(config.genome_config)
+    cache = FitnessCache()
+    cache.store(genome, result(10.0), generation=0)
+    pending = cache.split([(1, genome), (2, other)], generation=1, max_budget=15.0)
+    assert pending == [(2, other)]
+    assert genome.fitness == budget_invariant_fitness(10.0, 15.0, 15.0, 15.0)
+    assert cache.hits == 1
+
+
+def test_stale_entries(genome):
+    cache = FitnessCache(max_age=2)
+    cache.store(genome, result(10.0), generation=5)
+    assert cache.lookup(genome, 7, 15.0) is not None
+    assert cache.lookup(genome, 8, 15.0) is None  # Aged out
+    assert cache.lookup(genome, 4, 15.0) is None  # Left by an earlier run that got further
+
+    # A run stored over a stale entry starts a new one
+    cache.store(genome, result(20.0), generation=0)
+    assert [run['mean_reward'] for run in cache.entries[genome_hash(genome)]['results']] == [20.0]
+    cache.save(generation=3)
+    assert cache.entries == {}
+
+
+def test_save_and_load(tmp_path, genome, capsys):
+    path = str(tmp_path / 'cache' / 'fitness_cache.json')
+    setup = fingerprint(b'config', 'reward')
+    cache = FitnessCache(path, fingerprint=setup)
+    cache.store(genome, result(10.0), generation=0)
+    cache.save(0)
+
+    assert FitnessCache(path, fingerprint=setup).lookup(genome, 1, 15.0) == cache.lookup(genome, 1, 15.0)
+    assert FitnessCache(path, fingerprint=fingerprint(b'config', 'other reward')).entries == {}
+    assert 'Ignoring' in capsys.readouterr().out
+
+
+def test_fingerprint_separates_parts():
+    assert fingerprint('ab', 'c') != fingerprint('a', 'bc')
+    assert fingerprint('ab', 'c') == fingerprint(b'ab', b'c')
+
+
+def test_store_skips_runs_short_of_the_full_budget(genome):
+    cache = FitnessCache()
+    cache.store(genome, result(50.0, elapsed=15.0, budget=15.0), generation=0, max_budget=45.0)
+    assert cache.lookup(genome, 0, 45.0) is None
+    cache.store(genome, result(10.0, elapsed=45.0, budget=45.0), generation=0, max_budget=45.0)
+    assert cache.lookup(genome, 0, 45.0) == budget_invariant_fitness(10.0, 45.0, 45.0, 45.0)
+
+
+@pytest.mark.parametrize('min_budget, max_budget, eta, expected', [
+    (15, 120, 3, [15, 45, 120]),
+    (15, 135, 3, [15, 45, 135]),
+    (15, 40, 3, [40]),
+    (15, 15, 3, [15]),
+])
+def test_budgets(min_budget, max_budget, eta, expected):
+    assert SuccessiveHalving(min_budget, max_budget, eta).budgets() == expected
+
+
+def test_successive_halving_promotes_the_best(config):
+    genomes = make_genomes(config, 9)
+    runs = []
+
+    def evaluate_many(pairs, budget):
+        runs.append((budget, sorted(genome_id for genome_id, _ in pairs)))
+        return dict((genome_id, result(float(genome_id), budget=budget, elapsed=budget)) for genome_id, _ in pairs)
+
+    results = SuccessiveHalving(15, 120, 3).evaluate(genomes, evaluate_many=evaluate_many)
+    assert runs == [(15, list(range(9))), (45, [6, 7, 8]), (120, [8])]
+    assert results[8]['budget'] == 120 and results[0]['budget'] == 15
+    assert [genome.fitness for _, genome in genomes] == \
+        [budget_invariant_fitness(float(key), 1, 1, 120) for key in range(9)]
+
+
+def test_eliminated_genomes_rank_below_promoted_ones(config):
+    genomes = make_genomes(config, 3)
+    # Genome 2 wins the short rung but crashes late in the long one, scoring less than genome 1 did on the short run
+    rewards = {0: 4.0, 1: 5.0, 2: 5.1}
+
+    def evaluate(genome_id, genome, budget):
+        elapsed = 40.0 if budget == 45 and genome_id == 2 else budget
+        return result(rewards[genome_id], elapsed=elapsed, budget=budget)
+
+    SuccessiveHalving(15, 45, 3).evaluate(genomes, evaluate)
+    fitness = dict((genome_id, genome.fitness) for genome_id, genome in genomes)
+    assert budget_invariant_fitness(5.0, 15.0, 15.0, 45.0) > budget_invariant_fitness(5.1, 40.0, 45.0, 45.0)
+    assert fitness[2] == pytest.approx(budget_invariant_fitness(5.1, 40.0, 45.0, 45.0))
+    assert fitness[0] < fitness[1] < fitness[2]
+    # Genomes eliminated at the same rung keep their differences
+    assert fitness[1] - fitness[0] == pytest.approx(1.0)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from data_processing import DataProcessor
+from features import FeatureBuilder, INPUT_SCHEMA
+
+SCHEMA = [('speed', 0.0, 350.0), ('gear', 1.0, 8.0), ('left', 0.0, 1.0)]
+
+
+def test_default_schema_matches_the_network_and_frames(config):
+    cv = pytest.importorskip('CV')
+    fields = [key for keys in DataProcessor.cols.values() for key in keys] + cv.ScreenProcessor.fields
+    builder = FeatureBuilder(num_inputs=config.genome_config.num_inputs, fields=fields)
+    assert builder.names == [name for name, _, _ in INPUT_SCHEMA]
+
+
+def test_build_normalizes_by_name():
+    builder = FeatureBuilder(SCHEMA)
+    # Dictionary order does not matter and extra fields are ignored
+    inputs = builder.build({'left': 1.0, 'session_time': 5.0, 'gear': 5, 'speed': 175.0})
+    np.testing.assert_array_equal(inputs, [0.5, 0.5, 1.0])
+    assert builder.build({'speed': 0.0, 'gear': 1, 'left': 0.0}) is inputs
+    np.testing.assert_array_equal(inputs, [0.0, 0.0, 0.0])
+
+
+def test_build_rejects_a_frame_missing_a_field():
+    with pytest.raises(KeyError):
+        FeatureBuilder(SCHEMA).build({'speed': 100.0, 'gear': 3})
+
+
+@pytest.mark.parametrize('schema, num_inputs, fields, message', [
+    (SCHEMA, 4, None, 'expects 4'),
+    (SCHEMA + [('speed', 0.0, 1.0)], None, None, 'more than once'),
+    (SCHEMA, None, ['speed', 'gear'], r"missing \['left'\]"),
+    (SCHEMA, None, ['speed', 'gear', 'left', 'brake'], r"unused \['brake'\]"),
+])
+def test_schema_validation(schema, num_inputs, fields, message):
+    with pytest.raises(ValueError, match=message):
+        FeatureBuilder(schema, num_inputs=num_inputs, fields=fields)
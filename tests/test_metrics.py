@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from metrics import LatencyHistogram, RewardAccumulator
+
+
+def test_histogram_buckets_and_percentiles():
+    histogram = LatencyHistogram()
+    for microseconds in [0.5] + [3] * 90 + [100] * 9:
+        histogram.record(microseconds / 1e6)
+    assert histogram.buckets[:3] == [1, 0, 90]  # Under 1 us, then [1, 2) and [2, 4) us
+    assert histogram.percentile(50) == 4e-6
+    assert histogram.percentile(99) == pytest.approx(100e-6)  # Capped at the largest duration
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 100
+    assert snapshot['min'] == 0.5e-6 and snapshot['max'] == 100e-6
+    assert snapshot['mean'] == pytest.approx((0.5 + 270 + 900) / 100 / 1e6)
+
+
+def test_empty_histogram():
+    assert LatencyHistogram().snapshot()['p99'] == 0.0
+    assert LatencyHistogram().snapshot()['min'] == 0.0
+
+
+def test_durations_beyond_the_range_go_to_the_last_bucket():
+    histogram = LatencyHistogram(num_buckets=4)
+    histogram.record(1.0)
+    assert histogram.buckets == [0, 0, 0, 1]
+
+
+def test_rewards_match_batch_statistics():
+    rewards = np.random.default_rng(0).normal(5, 20, 1000)
+    accumulator = RewardAccumulator(alpha=0.2, window=50)
+    ewma = rewards[0]
+    for count, reward in enumerate(rewards, start=1):
+        accumulator.add(reward)
+        ewma = ewma + 0.2 * (reward - ewma) if count > 1 else reward
+        window = rewards[max(0, count - 50):count]
+        assert accumulator.window_min == window.min()
+        assert accumulator.window_max == window.max()
+        assert accumulator.ewma == pytest.approx(ewma)
+
+    assert accumulator.count == len(rewards)
+    assert accumulator.last == rewards[-1]
+    assert accumulator.mean == pytest.approx(rewards.mean())
+    assert accumulator.std == pytest.approx(rewards.std())
+
+
+def test_empty_reward_snapshot():
+    assert RewardAccumulator().snapshot() == {'count': 0, 'mean': 0.0, 'std': 0.0, 'ewma': 0.0, 'last': 0.0,
+                                              'window_min': 0.0, 'window_max': 0.0}
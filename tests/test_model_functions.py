@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import model_functions as model_functions_module
+from model_functions import ModelFunctions
+
+
+@pytest.fixture
+def model_functions():
+    return ModelFunctions(None)
+
+
+def test_action_head_batch_matches_action_head(model_functions):
+    # 0 makes every head activation equal, so ties go to the first action in both
+    outputs = np.concatenate([np.random.default_rng(0).uniform(-50, 50, 200), [0.0, 1e-12, -1e-12, 500.0]])
+    speed, steering = model_functions.action_head_batch(outputs)
+    for output, speed_row, steering_row in zip(outputs, speed, steering):
+        expected_speed, expected_steering = model_functions.action_head(output)
+        assert [model_functions.speed_actions[int(speed_row[0])]] + speed_row[1:].tolist() == expected_speed
+        assert [model_functions.steering_actions[int(steering_row[0])]] + steering_row[1:].tolist() == \
+            expected_steering
+
+
+def test_action_head_batch_reuses_buffers_per_size(model_functions):
+    first = model_functions.action_head_batch([0.5, -0.5])
+    second = model_functions.action_head_batch([1.5, -1.5])
+    assert first[0] is second[0]
+    assert len(model_functions.action_head_batch([0.5])[0]) == 1
+
+
+def test_sig_soft_applies_the_head_to_leaky_relu(model_functions):
+    for value in (-3.0, -0.1, 0.0, 0.7, 12.0):
+        assert model_functions.sig_soft(value) == model_functions.action_head(model_functions.leaky_relu(value))
+    np.testing.assert_array_equal(model_functions.leaky_relu_batch(np.array([-3.0, 0.0, 2.0])),
+                                  [model_functions.leaky_relu(value) for value in (-3.0, 0.0, 2.0)])
+
+
+def test_driving_the_game_requires_keyboard(monkeypatch):
+    monkeypatch.setattr(model_functions_module, 'keyboard', None)
+    with pytest.raises(ImportError, match='keyboard'):
+        ModelFunctions(object())
@@ -0,0 +1,87 @@
+import random
+
+import neat
+import numpy as np
+import pytest
+
+from model_functions import ModelFunctions
+from networks import MatrixRecurrentNetwork, NetworkCache, VECTOR_ACTIVATIONS
+
+# Activations whose outputs stay bounded over a few steps, so both networks are compared at full precision
+ACTIVATIONS = ['sig_soft_act', 'sigmoid', 'tanh', 'relu', 'sin', 'gauss', 'identity', 'clamped', 'abs', 'hat',
+               'softplus']
+AGGREGATIONS = ['sum', 'mean', 'median', 'max', 'min', 'maxabs', 'product']
+
+
+@pytest.fixture
+def population(config):
+    random.seed(0)
+    return list(neat.Population(config).population.items())
+
+
+def test_cache_compiles_each_genome_once(config, population):
+    cache = NetworkCache()
+    genome_id, genome = population[0]
+    network = cache.get(genome_id, genome, config)
+    inputs = [0.5] * config.genome_config.num_inputs
+    first = network.activate(inputs)
+    network.activate(inputs)
+    # A second evaluation reuses the network with its recurrent state cleared, so it starts from the same outputs
+    assert cache.get(genome_id, genome, config) is network
+    assert network.activate(inputs) == first
+    assert (cache.built, cache.reused) == (1, 1)
+
+
+def test_cache_prunes_genomes_left_out_of_the_population(config, population):
+    cache = NetworkCache()
+    for genome_id, genome in population[:3]:
+        cache.get(genome_id, genome, config)
+    cache.prune(population[1:])
+    assert set(cache.networks) == set(genome_id for genome_id, _ in population[1:3])
+    genome_id, genome = population[0]
+    cache.get(genome_id, genome, config)
+    assert cache.built == 4
+
+
+@pytest.fixture
+def genomes(config, monkeypatch):
+    """
+    A population mutated away from the initial topology, with mixed activations and aggregations.
+    """
+    monkeypatch.setitem(VECTOR_ACTIVATIONS, 'sig_soft_act', ModelFunctions.leaky_relu_batch)
+    random.seed(0)
+    population = neat.Population(config).population
+    rng = random.Random(1)
+    for genome in list(population.values())[:20]:
+        for _ in range(5):
+            genome.mutate(config.genome_config)
+        for node in genome.nodes.values():
+            node.activation = rng.choice(ACTIVATIONS)
+            node.aggregation = rng.choice(AGGREGATIONS)
+    return list(population.values())[:20]
+
+
+def test_matches_neat_recurrent_network(config, genomes):
+    inputs = np.random.default_rng(0).uniform(-1, 1, (6, config.genome_config.num_inputs))
+    matrix = MatrixRecurrentNetwork(genomes, config)
+    outputs = matrix.activate_sequence(inputs)
+    for index, genome in enumerate(genomes):
+        network = neat.nn.RecurrentNetwork.create(genome, config)
+        expected = [network.activate(row) for row in inputs]
+        np.testing.assert_allclose(outputs[:, index], expected, rtol=1e-9, atol=1e-12)
+
+
+def test_single_genome_activate_and_reset(config, genomes):
+    inputs = np.random.default_rng(1).uniform(-1, 1, (3, config.genome_config.num_inputs))
+    matrix = MatrixRecurrentNetwork.create(genomes[0], config)
+    network = neat.nn.RecurrentNetwork.create(genomes[0], config)
+    for _ in range(2):
+        for row in inputs:
+            np.testing.assert_allclose(matrix.activate(row), network.activate(row), rtol=1e-9, atol=1e-12)
+        matrix.reset()
+        network.reset()
+
+
+def test_rejects_wrong_input_count(config, genomes):
+    with pytest.raises(RuntimeError):
+        MatrixRecurrentNetwork(genomes, config).step([0.0])
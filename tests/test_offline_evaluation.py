@@ -0,0 +1,83 @@
+import random
+
+import neat
+import numpy as np
+import pytest
+
+from data_processing import DataProcessor
+from features import INPUT_SCHEMA
+from model_functions import ModelFunctions
+from networks import VECTOR_ACTIVATIONS
+from offline_evaluation import OfflineDataset, OfflineEvaluator, score_genomes
+from simulator import TelemetrySimulator
+
+
+@pytest.fixture
+def dataset():
+    """
+    A dataset built from simulated telemetry, with the throttle, brake and steer the simulated cars apply.
+    """
+    simulator = TelemetrySimulator(num_cars=1, seed=0)
+    datagrams = [bytes(data) for _ in range(40) for data in simulator.step()]
+    return OfflineDataset.from_frames(DataProcessor().collect_packet(datagrams))
+
+
+@pytest.fixture
+def genomes(config, monkeypatch):
+    monkeypatch.setitem(VECTOR_ACTIVATIONS, 'sig_soft_act', ModelFunctions.leaky_relu_batch)
+    random.seed(0)
+    population = list(neat.Population(config).population.items())[:8]
+    for _, genome in population:
+        for _ in range(3):
+            genome.mutate(config.genome_config)
+    return population
+
+
+def test_dataset_from_frames(dataset, tmp_path):
+    assert dataset.inputs.shape == (40, len(INPUT_SCHEMA))
+    assert len(dataset.rewards) == len(dataset.speed_targets) == len(dataset.steering_targets) == 40
+    assert set(np.unique(dataset.speed_targets)) <= {0, 1}
+
+    path = str(tmp_path / 'dataset.npz')
+    dataset.save(path)
+    loaded = OfflineDataset.load(path)
+    for name in ('inputs', 'rewards', 'speed_targets', 'steering_targets'):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(dataset, name))
+
+
+def test_scores_do_not_depend_on_the_batch(config, genomes, dataset):
+    model_functions = ModelFunctions(None)
+    scores = score_genomes(genomes, config, dataset, model_functions)
+    for genome_id, genome in genomes[:3]:
+        alone = score_genomes([(genome_id, genome)], config, dataset, model_functions)
+        assert alone[genome_id] == pytest.approx(scores[genome_id], abs=1e-12)
+    assert len(set(scores.values())) > 1
+
+
+def test_too_few_frames_score_zero(config, genomes, dataset):
+    single = OfflineDataset(dataset.inputs[:1], dataset.rewards[:1], dataset.speed_targets[:1],
+                            dataset.steering_targets[:1])
+    assert set(score_genomes(genomes, config, single, ModelFunctions(None)).values()) == {0.0}
+
+
+def test_pool_scores_and_prescreens_the_population(config, genomes, dataset, tmp_path):
+    path = str(tmp_path / 'dataset.npz')
+    dataset.save(path)
+    expected = score_genomes(genomes, config, dataset, ModelFunctions(None))
+    evaluator = OfflineEvaluator(path, config, num_workers=2)
+    try:
+        scores = evaluator.score(genomes)
+        assert scores.keys() == expected.keys()
+        for genome_id in expected:
+            assert scores[genome_id] == pytest.approx(expected[genome_id], abs=1e-12)
+
+        evaluator.eval_genomes(genomes, config)
+        assert [genome.fitness for _, genome in genomes] == [scores[genome_id] for genome_id, _ in genomes]
+
+        kept, rejected, prescreen_scores = evaluator.prescreen(genomes, fraction=0.25)
+        ranked = [scores[genome_id] for genome_id, _ in kept + rejected]
+        assert len(kept) == 2 and len(rejected) == 6
+        assert ranked == sorted(scores.values(), reverse=True)
+        assert prescreen_scores == scores
+    finally:
+        evaluator.close()
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from data_processing import DataProcessor
+from replay import FILE_HEADER, TelemetryRecorder, TelemetryReplayer
+from simulator import TelemetrySimulator
+
+
+def record(path, frames=3, timestamps=None):
+    """
+    Records simulated datagrams, returning them in order.
+    """
+    simulator = TelemetrySimulator(seed=3)
+    datagrams = [bytes(data) for _ in range(frames) for data in simulator.step()]
+    with TelemetryRecorder(path) as recorder:
+        start = time.perf_counter()
+        for index, data in enumerate(datagrams):
+            # A receive buffer longer than the datagram, as from the packet ring
+            recorder.write(bytearray(data) + b'\0' * 16, len(data),
+                           timestamp=None if timestamps is None else start + timestamps[index])
+    return datagrams
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    path = str(tmp_path / 'session.f1tr')
+    datagrams = record(path, timestamps=[index * 0.01 for index in range(12)])
+    replayed = list(TelemetryReplayer(path).datagrams())
+    assert [data for _, data in replayed] == datagrams
+    assert [timestamp for timestamp, _ in replayed] == pytest.approx([index * 0.01 for index in range(12)], abs=1e-3)
+
+
+def test_replay_paces_against_the_recorded_timeline(tmp_path):
+    path = str(tmp_path / 'session.f1tr')
+    record(path, frames=1, timestamps=[0.0, 0.05, 0.1, 0.15])
+    start = time.perf_counter()
+    assert len(list(TelemetryReplayer(path).replay(speed=1.0))) == 4
+    assert time.perf_counter() - start == pytest.approx(0.15, abs=0.05)
+
+    start = time.perf_counter()
+    list(TelemetryReplayer(path).replay(speed=None))
+    assert time.perf_counter() - start < 0.05
+
+
+def test_appending_continues_after_a_truncated_record(tmp_path):
+    path = str(tmp_path / 'session.f1tr')
+    first = record(path, frames=1)
+    with open(path, 'ab') as file:
+        file.write(b'\x01\x02\x03')  # An interrupted write
+    second = record(path, frames=1)
+    assert [data for _, data in TelemetryReplayer(path).datagrams()] == first + second
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'\0' * FILE_HEADER.size)
+    with pytest.raises(ValueError):
+        list(TelemetryReplayer(str(path)).datagrams())
+
+
+def test_frames_feed_a_data_processor(tmp_path):
+    path = str(tmp_path / 'session.f1tr')
+    record(path, frames=3)
+    frames = list(TelemetryReplayer(path).frames(DataProcessor()))
+    assert len(frames) == 3
+    assert set(key for keys in DataProcessor.cols.values() for key in keys) <= set(frames[0])
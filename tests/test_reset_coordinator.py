@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+import reset_coordinator
+from reset_coordinator import ResetCoordinator
+from shared_channel import SharedFrameChannel
+
+FIELDS = ['session_time', 'current_lap_time_ms', 'world_position_x', 'world_position_y', 'world_position_z']
+
+
+class FakeKeyboard:
+    def __init__(self):
+        self.events = []
+
+    def press(self, key):
+        self.events.append(('press', key))
+
+    def release(self, key):
+        self.events.append(('release', key))
+
+
+@pytest.fixture
+def keyboard(monkeypatch):
+    fake = FakeKeyboard()
+    monkeypatch.setattr(reset_coordinator, 'keyboard', fake)
+    return fake
+
+
+@pytest.fixture
+def channel():
+    channel = SharedFrameChannel(FIELDS)
+    yield channel
+    channel.close()
+
+
+class Game:
+    """
+    Publishes telemetry at 100 Hz from a thread. frame(t) returns the frame t seconds in, or None for no frame.
+    """
+
+    def __init__(self, channel, frame):
+        self.channel = channel
+        self.frame = frame
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        start = time.perf_counter()
+        while not self.stop.wait(0.01):
+            frame = self.frame(time.perf_counter() - start)
+            if frame is not None:
+                self.channel.write(frame)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop.set()
+        self.thread.join()
+
+
+def driving(t, offset=0.0, lap_start=0.0):
+    return {'session_time': 100 + t, 'current_lap_time_ms': (t - lap_start) * 1000, 'world_position_x': offset + t,
+            'world_position_y': 0.0, 'world_position_z': 0.0}
+
+
+def coordinator(channel, keyboard):
+    return ResetCoordinator(channel, key_delay=0.0, min_wait=0.0, settle=0.2, max_jump=5.0, stall=0.15)
+
+
+def test_parked_car_is_not_a_finished_reset(channel, keyboard):
+    with Game(channel, driving):
+        assert coordinator(channel, keyboard).reset(['esc', 'enter'], timeout=0.6) is False
+    assert keyboard.events == [('press', 'esc'), ('release', 'esc'), ('press', 'enter'), ('release', 'enter')]
+
+
+def test_teleport_then_settle(channel, keyboard):
+    resets = coordinator(channel, keyboard)
+    with Game(channel, lambda t: driving(t) if t < 0.2 else driving(t, offset=500.0, lap_start=0.2)):
+        start = time.perf_counter()
+        assert resets.reset(['esc', 'enter'], timeout=2.0) is True
+        assert 0.2 <= time.perf_counter() - start < 1.0
+    assert resets.timeouts == 0 and len(resets.waits) == 1
+
+
+def test_pause_then_settle(channel, keyboard):
+    # Telemetry stops for half a second, as while the game loads, then resumes without a jump
+    with Game(channel, lambda t: None if 0.1 < t < 0.6 else driving(t)):
+        assert coordinator(channel, keyboard).reset(['enter'], timeout=2.0) is True
+
+
+def test_unsettled_car_times_out(channel, keyboard):
+    # The car keeps being moved back onto the track, so it never drives continuously for settle seconds
+    resets = coordinator(channel, keyboard)
+    with Game(channel, lambda t: driving(t, offset=100.0 * int(t / 0.1))):
+        assert resets.reset(['esc'], timeout=0.8) is False
+    assert resets.timeouts == 1
+
+
+def test_without_telemetry_waits_for_the_timeout(keyboard):
+    start = time.perf_counter()
+    assert ResetCoordinator(key_delay=0.0).reset(['esc'], timeout=0.1) is False
+    assert time.perf_counter() - start >= 0.1
+
+
+def test_driving_the_game_requires_keyboard(channel, monkeypatch):
+    monkeypatch.setattr(reset_coordinator, 'keyboard', None)
+    with pytest.raises(ImportError, match='keyboard'):
+        ResetCoordinator(channel)
+    with pytest.raises(ImportError, match='keyboard'):
+        ResetCoordinator().press_keys(['esc'])
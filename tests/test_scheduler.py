@@ -0,0 +1,49 @@
+import time
+
+from scheduler import FixedRateScheduler
+
+
+def test_ticks_keep_to_the_rate():
+    scheduler = FixedRateScheduler(rate=100)
+    start = time.perf_counter()
+    for _ in range(20):
+        time.sleep(0.003)  # Work shorter than the period does not push later deadlines back
+        scheduler.wait()
+    # A busy machine can still overrun the odd tick, which is skipped rather than delaying the rest
+    assert scheduler.tick == 20 + scheduler.skipped
+    assert scheduler.deadline(scheduler.tick) <= time.perf_counter() < scheduler.deadline(scheduler.tick) + 0.05
+    assert time.perf_counter() - start < 0.3
+    assert scheduler.snapshot()['ticks'] == 20
+
+
+def test_overruns_skip_missed_ticks():
+    scheduler = FixedRateScheduler(rate=100)
+    time.sleep(0.035)  # Overruns the deadlines of ticks 1 to 3
+    assert scheduler.wait() == 1 + scheduler.skipped
+    assert scheduler.overruns == 1 and scheduler.skipped >= 3
+    assert time.perf_counter() >= scheduler.deadline(4)
+
+
+def test_catch_up_runs_missed_ticks_back_to_back():
+    scheduler = FixedRateScheduler(rate=100, catch_up=True)
+    time.sleep(0.035)
+    ticks = [scheduler.wait() for _ in range(3)]
+    # Every deadline had already passed, so none of the ticks waited
+    assert ticks == [1, 2, 3]
+    assert (scheduler.overruns, scheduler.skipped) == (3, 0)
+
+
+def test_large_backlogs_are_skipped_even_when_catching_up():
+    scheduler = FixedRateScheduler(rate=100, catch_up=True, max_catch_up=2)
+    time.sleep(0.055)
+    assert scheduler.wait() == 1 + scheduler.skipped
+    assert scheduler.skipped >= 5
+
+
+def test_start_restarts_the_ticks():
+    scheduler = FixedRateScheduler(rate=100)
+    scheduler.wait()
+    time.sleep(0.05)
+    scheduler.start()
+    assert scheduler.wait() == 1
+    assert scheduler.overruns == 0
@@ -0,0 +1,61 @@
+import multiprocessing
+
+import pytest
+
+from shared_channel import SharedFrameChannel
+
+
+@pytest.fixture(params=[False, True], ids=['seqlock', 'lock'])
+def channel(request):
+    channel = SharedFrameChannel(['speed', 'steer'], lock=multiprocessing.Lock() if request.param else None)
+    yield channel
+    channel.close()
+
+
+def test_write_and_read(channel):
+    assert channel.read()[0] == 0
+    channel.write({'speed': 120.0, 'steer': -0.5, 'unused': 1.0}, timestamp=3.0)
+    channel.write_values([130.0, 0.25], timestamp=4.0)
+    sequence, timestamp, frame = channel.read_dict()
+    assert (sequence, timestamp, frame) == (2, 4.0, {'speed': 130.0, 'steer': 0.25})
+    assert channel.sequence == 2
+    assert channel.wait(last_sequence=1, timeout=0)
+    assert not channel.wait(last_sequence=2, timeout=0.01)
+
+
+def test_attached_copy_sees_writes(channel):
+    # How a child process attaches when the channel is passed to it
+    attached = SharedFrameChannel(channel.fields, channel.name, create=False, lock=channel.lock)
+    channel.write_values([1.0, 2.0])
+    assert attached.read_dict()[2] == {'speed': 1.0, 'steer': 2.0}
+    attached.write_values([3.0, 4.0])
+    assert channel.read_dict()[2] == {'speed': 3.0, 'steer': 4.0}
+    attached.close()
+
+
+def test_read_gives_up_on_a_stalled_write():
+    channel = SharedFrameChannel(['speed'], lock=None, max_retries=5)
+    if channel.lock is not None:
+        pytest.skip("reads are serialized by a lock on this platform")
+    channel._sequence[0] = 1  # A writer stopped between its two sequence updates
+    with pytest.raises(TimeoutError):
+        channel.read()
+    channel.close()
+
+
+def write_pairs(channel, count):
+    for value in range(1, count + 1):
+        channel.write_values([value, -value])
+
+
+def test_reads_are_consistent_while_another_process_writes(channel):
+    writer = multiprocessing.Process(target=write_pairs, args=(channel, 20000))
+    writer.start()
+    last = 0
+    while writer.is_alive() or last < channel.sequence:
+        sequence, _, values = channel.read()
+        assert values[0] == -values[1]  # Never half of one frame and half of another
+        assert sequence >= last
+        last = sequence
+    writer.join()
+    assert channel.read_dict()[2] == {'speed': 20000.0, 'steer': -20000.0}
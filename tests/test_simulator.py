@@ -0,0 +1,43 @@
+import socket
+
+import numpy as np
+import pytest
+
+from data_classes import NUM_CARS, PacketHeader, parse_packet_car_motion_records, parse_packet_lap_records
+from simulator import TelemetrySimulator
+
+
+def test_headers_advance_every_frame():
+    simulator = TelemetrySimulator(rate=50.0, session_uid=42)
+    for frame in range(3):
+        headers = [PacketHeader.LAYOUT.unpack(data) for data in simulator.step()]
+        assert [header['packet_id'] for header in headers] == [0, 2, 6, 7]
+        for header in headers:
+            assert (header['session_uid'], header['frame_identifier']) == (42, frame)
+            assert header['session_time'] == pytest.approx(frame / 50.0)
+
+
+def test_cars_drive_the_ellipse():
+    simulator = TelemetrySimulator(num_cars=3, semi_major=900.0, semi_minor=450.0)
+    for _ in range(60):
+        motion, lap, _, _ = simulator.step()
+    cars = parse_packet_car_motion_records(motion)
+    x, z = cars.world_position_x[:3], cars.world_position_z[:3]
+    np.testing.assert_allclose((x / 900.0) ** 2 + (z / 450.0) ** 2, 1.0, rtol=1e-4)
+    assert (cars.world_position_x[3:] == 0).all()  # Inactive car slots stay zeroed
+    assert (parse_packet_lap_records(lap).lap_distance[:3] > 0).all()
+
+
+def test_rejects_too_many_cars():
+    with pytest.raises(ValueError):
+        TelemetrySimulator(num_cars=NUM_CARS + 1)
+
+
+def test_run_sends_every_datagram():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as receiver:
+        receiver.bind(('127.0.0.1', 0))
+        receiver.settimeout(1.0)
+        stats = TelemetrySimulator(rate=200.0).run(port=receiver.getsockname()[1], frames=5)
+        received = [receiver.recv(2048) for _ in range(stats['datagrams'])]
+    assert stats['frames'] == 5 and stats['datagrams'] == 20
+    assert [PacketHeader.LAYOUT.unpack(data)['frame_identifier'] for data in received[::4]] == list(range(5))
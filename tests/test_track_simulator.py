@@ -0,0 +1,101 @@
+import random
+
+import neat
+import numpy as np
+import pytest
+
+from model_functions import ModelFunctions
+from networks import VECTOR_ACTIVATIONS
+from track_simulator import FRAME_FIELDS, SimulatorEvaluator, Track, TrackSimulator, run_episode
+
+THROTTLE = ['w', 1.0, 1.0]
+STRAIGHT = ['none', 1.0, 0.0]
+
+
+def circle(radius, points=2000):
+    angle = np.linspace(0.0, 2 * np.pi, points, endpoint=False)
+    return radius * np.cos(angle), radius * np.sin(angle)
+
+
+@pytest.fixture
+def track():
+    return Track.from_positions(*circle(300.0))
+
+
+def test_track_from_positions(track, tmp_path):
+    assert track.length == pytest.approx(2 * np.pi * 300.0, rel=1e-3)
+    assert track.spacing == pytest.approx(2.0, rel=1e-2)
+    np.testing.assert_allclose(np.hypot(track.x, track.z), 300.0, rtol=1e-3)
+
+    # A point off the centre-line projects back onto it, with the offset along the right normal
+    index = 100
+    x, z = np.array([track.x[index], track.z[index]]) + 3.0 * track.normal[index]
+    assert track.locate(x, z) == (index, pytest.approx(track.distance[index]), pytest.approx(3.0))
+    assert track.locate(x, z, hint=index + 20)[0] == index
+
+    path = str(tmp_path / 'track.npz')
+    track.save(path)
+    loaded = Track.load(path)
+    np.testing.assert_array_equal(loaded.x, track.x)
+    assert loaded.half_width == track.half_width
+
+
+def test_simulator_frames(track):
+    simulator = TrackSimulator(track)
+    frame = simulator.reset()
+    assert set(frame) == set(FRAME_FIELDS)
+    assert simulator.offset == pytest.approx(0.0, abs=1e-6)
+
+    for _ in range(10):
+        frame = simulator.step((THROTTLE, STRAIGHT), 0.1)
+    assert frame['session_time'] == pytest.approx(1.0)
+    assert frame['throttle'] == 1.0 and frame['brake'] == 0.0
+    assert frame['speed'] > simulator.start_speed * 3.6
+    assert frame['lap_distance'] > 30.0
+
+
+def test_steering_and_leaving_the_track(track):
+    offsets = {}
+    for key in ('a', 'd'):
+        simulator = TrackSimulator(Track.from_positions(*circle(3000.0), spacing=5.0))
+        for _ in range(10):
+            simulator.step((THROTTLE, [key, 1.0, 1.0]), 0.1)
+        offsets[key] = simulator.offset
+    assert offsets['d'] > offsets['a']
+
+    simulator = TrackSimulator(track)
+    for _ in range(50):
+        frame = simulator.step((THROTTLE, ['d', 1.0, 1.0]), 0.1)
+    assert abs(simulator.offset) > track.half_width + 1.0
+    assert frame['surface_type'] == 28 and frame['current_lap_invalid'] == 1
+
+
+@pytest.fixture
+def genomes(config, monkeypatch):
+    monkeypatch.setitem(VECTOR_ACTIVATIONS, 'sig_soft_act', ModelFunctions.leaky_relu_batch)
+    random.seed(0)
+    return list(neat.Population(config).population.items())[:6]
+
+
+def test_run_episode_stays_within_the_budget(config, genomes, track):
+    result = run_episode(genomes[0][1], config, TrackSimulator(track), ModelFunctions(None), budget=5.0)
+    assert result['budget'] == 5.0
+    assert result['elapsed'] == pytest.approx(result['ticks'] / 10.0)
+    assert result['elapsed'] <= 5.0 + 1e-9
+
+
+def test_evaluator_runs_episodes_in_a_pool(config, genomes, track, tmp_path):
+    path = str(tmp_path / 'track.npz')
+    track.save(path)
+    evaluator = SimulatorEvaluator(path, config, num_workers=2)
+    try:
+        results = evaluator.evaluate_many(genomes[:2], budget=3.0)
+        genome_id, genome = genomes[0]
+        assert results[genome_id] == run_episode(genome, config, TrackSimulator(Track.load(path)),
+                                                 ModelFunctions(None), budget=3.0)
+
+        evaluator.eval_genomes(genomes, config)
+        assert all(genome.fitness is not None for _, genome in genomes)
+        assert evaluator.generation == 1
+    finally:
+        evaluator.close()
@@ -0,0 +1,579 @@
+import argparse
+import multiprocessing
+import time
+import numpy as np
+from data_processing import DataProcessor
+from evaluation import SuccessiveHalving
+from features import FeatureBuilder
+from metrics import RewardAccumulator
+from model_functions import ModelFunctions
+from networks import MatrixRecurrentNetwork, VECTOR_ACTIVATIONS
+
+# Matches ScreenProcessor.fields; CV.py is not imported so the simulator runs without OpenCV or a display
+SCREEN_FIELDS = ['left', 'right', 'midleft', 'midright']
+
+# Every key of a simulated frame: the DataProcessor columns, the screen flags and the session time
+FRAME_FIELDS = [key for keys in DataProcessor.cols.values() for key in keys] + SCREEN_FIELDS + ['session_time']
+
+
+class Track:
+    """
+    A closed track centre-line reconstructed from recorded world positions.
+
+    The trace is resampled to evenly spaced points, smoothed and treated as a loop, so one clean lap of
+    world_position_x and world_position_z is enough to build a track.
+
+    Attributes:
+        x (np.ndarray): The x coordinate of each centre-line point.
+        z (np.ndarray): The z coordinate of each centre-line point.
+        distance (np.ndarray): The distance along the track of each point.
+        length (float): The lap length in metres.
+        tangent (np.ndarray): The (points, 2) unit direction of travel at each point, in x and z.
+        normal (np.ndarray): The (points, 2) unit vector pointing to the right of the direction of travel.
+        half_width (float): Half the track width in metres.
+        spacing (float): The distance between centre-line points in metres.
+    """
+
+    def __init__(self, x, z, half_width=7.0):
+        """
+        Initializes the Track from an evenly spaced, closed centre-line.
+
+        Args:
+            x (np.ndarray): The x coordinate of each centre-line point.
+            z (np.ndarray): The z coordinate of each centre-line point.
+            half_width (float): Half the track width in metres.
+        """
+        self.x = np.asarray(x, dtype=np.float64)
+        self.z = np.asarray(z, dtype=np.float64)
+        self.half_width = half_width
+
+        dx = np.roll(self.x, -1) - self.x
+        dz = np.roll(self.z, -1) - self.z
+        segment = np.hypot(dx, dz)
+        self.distance = np.concatenate(([0.0], np.cumsum(segment)[:-1]))
+        self.length = float(segment.sum())
+        self.spacing = self.length / len(self.x)
+        self.tangent = np.stack((dx, dz), axis=1) / segment[:, None]
+        # Matches the right direction the telemetry simulator writes: (-forward_z, forward_x)
+        self.normal = np.stack((-self.tangent[:, 1], self.tangent[:, 0]), axis=1)
+
+    @classmethod
+    def from_positions(cls, x, z, spacing=2.0, smoothing=5, half_width=7.0):
+        """
+        Builds a track from a recorded position trace covering one lap.
+
+        Args:
+            x (np.ndarray): The recorded world_position_x values, in order.
+            z (np.ndarray): The recorded world_position_z values, in order.
+            spacing (float): The distance between centre-line points in metres.
+            smoothing (int): The half-width, in points, of the moving average applied to the centre-line.
+            half_width (float): Half the track width in metres.
+
+        Returns:
+            Track: The track.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        z = np.asarray(z, dtype=np.float64)
+        step = np.hypot(np.diff(x), np.diff(z))
+        keep = np.concatenate(([True], step > 1e-3))  # Drop samples taken while stationary
+        x, z = x[keep], z[keep]
+
+        travelled = np.concatenate(([0.0], np.cumsum(np.hypot(np.diff(x), np.diff(z)))))
+        samples = np.arange(0.0, travelled[-1], spacing)
+        x = np.interp(samples, travelled, x)
+        z = np.interp(samples, travelled, z)
+
+        if smoothing:
+            # Circular moving average, since the trace is a loop
+            kernel = np.ones(2 * smoothing + 1) / (2 * smoothing + 1)
+            x = np.convolve(np.concatenate((x[-smoothing:], x, x[:smoothing])), kernel, mode='valid')
+            z = np.convolve(np.concatenate((z[-smoothing:], z, z[:smoothing])), kernel, mode='valid')
+        return cls(x, z, half_width)
+
+    @classmethod
+    def from_archive(cls, path, session_uid, lap, **kwargs):
+        """
+        Builds a track from one lap of a TelemetryArchive.
+
+        Args:
+            path (str): The archive directory.
+            session_uid (int): The session holding the lap.
+            lap (int): The lap number.
+            **kwargs: Passed on to from_positions.
+
+        Returns:
+            Track: The track.
+        """
+        from archive import TelemetryArchive
+        columns = TelemetryArchive(path).read(['world_position_x', 'world_position_z'], session_uid, lap)
+        return cls.from_positions(columns['world_position_x'], columns['world_position_z'], **kwargs)
+
+    def save(self, path):
+        """
+        Writes the centre-line to an .npz file.
+
+        Args:
+            path (str): The file to write.
+        """
+        np.savez(path, x=self.x, z=self.z, half_width=self.half_width)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a track written by save.
+
+        Args:
+            path (str): The .npz file.
+
+        Returns:
+            Track: The track.
+        """
+        with np.load(path) as data:
+            return cls(data['x'], data['z'], float(data['half_width']))
+
+    def locate(self, x, z, hint=None, window=50):
+        """
+        Projects a position onto the centre-line.
+
+        Args:
+            x (float): The x coordinate.
+            z (float): The z coordinate.
+            hint (int, optional): The centre-line point found last time. Only points within window of it are
+                                  searched. Defaults to searching the whole track.
+            window (int): The number of points searched either side of hint.
+
+        Returns:
+            tuple: The nearest point's index, the distance along the track and the lateral offset, positive to
+                   the right of the centre-line.
+        """
+        if hint is None:
+            indices = np.arange(len(self.x))
+        else:
+            indices = np.arange(hint - window, hint + window + 1) % len(self.x)
+        index = int(indices[np.argmin((self.x[indices] - x) ** 2 + (self.z[indices] - z) ** 2)])
+
+        dx, dz = x - self.x[index], z - self.z[index]
+        along = dx * self.tangent[index, 0] + dz * self.tangent[index, 1]
+        offset = dx * self.normal[index, 0] + dz * self.normal[index, 1]
+        return index, (self.distance[index] + along) % self.length, offset
+
+
+class KinematicCar:
+    """
+    A kinematic bicycle model of the car, with simple longitudinal dynamics.
+
+    The heading follows the F1 convention used elsewhere in this project: yaw = atan2(forward_x, forward_z), so
+    the forward direction is (sin(yaw), cos(yaw)) and positive steering turns towards the right direction.
+
+    Attributes:
+        x (float): The x position in metres.
+        z (float): The z position in metres.
+        yaw (float): The heading in radians.
+        speed (float): The forward speed in metres per second.
+        acceleration (float): The longitudinal acceleration of the last step in metres per second squared.
+        yaw_rate (float): The yaw rate of the last step in radians per second.
+    """
+
+    wheelbase = 3.6  # Metres
+    max_steer = 0.35  # Front wheel angle at full lock in radians, at low speed
+    max_acceleration = 12.0  # Metres per second squared at full throttle from rest
+    max_deceleration = 40.0  # Metres per second squared at full brake
+    max_speed = 95.0  # Metres per second
+    drag = 0.6  # Rolling and aerodynamic drag, metres per second squared at rest
+    off_track_drag = 8.0  # Extra drag on grass and gravel
+
+    def __init__(self, x=0.0, z=0.0, yaw=0.0, speed=0.0):
+        """
+        Initializes the KinematicCar.
+
+        Args:
+            x (float): The x position in metres.
+            z (float): The z position in metres.
+            yaw (float): The heading in radians.
+            speed (float): The forward speed in metres per second.
+        """
+        self.x = x
+        self.z = z
+        self.yaw = yaw
+        self.speed = speed
+        self.acceleration = 0.0
+        self.yaw_rate = 0.0
+
+    def step(self, throttle, brake, steer, dt, off_track=False):
+        """
+        Advances the car.
+
+        Args:
+            throttle (float): Throttle between 0 and 1.
+            brake (float): Brake between 0 and 1.
+            steer (float): Steering between -1 (full left) and 1 (full right).
+            dt (float): The time step in seconds.
+            off_track (bool): Whether the car is off the track, which adds drag.
+        """
+        # Less steering lock at speed keeps the model stable
+        angle = steer * self.max_steer / (1.0 + self.speed / 30.0)
+        self.yaw_rate = -self.speed / self.wheelbase * np.tan(angle)
+
+        drive = throttle * self.max_acceleration * (1.0 - self.speed / self.max_speed)
+        resistance = brake * self.max_deceleration + self.drag + (self.off_track_drag if off_track else 0.0)
+        resistance += self.drag * (self.speed / 30.0) ** 2
+        self.acceleration = drive - resistance if self.speed > 0 or drive > resistance else 0.0
+        self.speed = max(0.0, self.speed + self.acceleration * dt)
+
+        self.yaw += self.yaw_rate * dt
+        self.x += np.sin(self.yaw) * self.speed * dt
+        self.z += np.cos(self.yaw) * self.speed * dt
+
+
+class TrackSimulator:
+    """
+    A headless driving environment that stands in for the game.
+
+    It takes the (speed_output, steering_output) action tuple perform_action handles and returns frames with the
+    keys DataProcessor and ScreenProcessor produce, so the same network inputs and calculate_reward apply. The
+    screen flags mimic the CV sensors: a left or right flag is set when the track edge at the look-ahead point is
+    within far_sensor metres, and a mid flag when it is within near_sensor metres.
+
+    Attributes:
+        track (Track): The track driven.
+        car (KinematicCar): The simulated car.
+        time (float): The simulated session time in seconds.
+        index (int): The centre-line point nearest the car.
+        offset (float): The car's lateral offset from the centre-line in metres, positive to the right.
+        frame (dict): The latest frame, updated in place by every step.
+    """
+
+    def __init__(self, track, physics_rate=60.0, look_ahead=20.0, far_sensor=9.0, near_sensor=4.0,
+                 start_speed=30.0):
+        """
+        Initializes the TrackSimulator.
+
+        Args:
+            track (Track): The track to drive.
+            physics_rate (float): The physics update rate in Hz. Each step is split into updates at this rate.
+            look_ahead (float): The distance ahead of the car, in metres, at which the screen flags are measured.
+            far_sensor (float): The edge distance in metres that sets the left and right flags.
+            near_sensor (float): The edge distance in metres that sets the midleft and midright flags.
+            start_speed (float): The speed the car starts each episode at, in metres per second.
+        """
+        self.track = track
+        self.physics_dt = 1.0 / physics_rate
+        self.look_ahead = look_ahead
+        self.far_sensor = far_sensor
+        self.near_sensor = near_sensor
+        self.start_speed = start_speed
+        self.frame = dict((field, 0.0) for field in FRAME_FIELDS)
+        self.reset()
+
+    def reset(self, start_distance=0.0):
+        """
+        Starts a new episode with the car on the centre-line.
+
+        Args:
+            start_distance (float): The distance along the track to start at, in metres.
+
+        Returns:
+            dict: The first frame.
+        """
+        index = int(start_distance / self.track.spacing) % len(self.track.x)
+        tangent = self.track.tangent[index]
+        self.car = KinematicCar(self.track.x[index], self.track.z[index], np.arctan2(tangent[0], tangent[1]),
+                                self.start_speed)
+        self.time = 0.0
+        self.lap = 1
+        self.lap_start = 0.0
+        self.last_lap = 0.0
+        self.lap_invalid = 0
+        self.index, self.previous_distance, self.offset = self.track.locate(self.car.x, self.car.z, index)
+        self._update_frame(0.0, 0.0, 0.0)
+        return self.frame
+
+    @staticmethod
+    def controls(action):
+        """
+        Converts a perform_action tuple into throttle, brake and steering.
+
+        Args:
+            action (tuple): The speed output and steering output, each holding an action, probability and
+                            intensity, as from ModelFunctions.action_head.
+
+        Returns:
+            tuple: Throttle and brake between 0 and 1 and steering between -1 (left) and 1 (right).
+        """
+        speed_output, steering_output = action
+        throttle = float(speed_output[2]) if speed_output[0] == "w" else 0.0
+        brake = float(speed_output[2]) if speed_output[0] == "s" else 0.0
+        if steering_output[0] == "a":
+            steer = -float(steering_output[2])
+        elif steering_output[0] == "d":
+            steer = float(steering_output[2])
+        else:
+            steer = 0.0
+        return throttle, brake, steer
+
+    def step(self, action, dt):
+        """
+        Applies an action for dt seconds.
+
+        Args:
+            action (tuple): The speed output and steering output, as handled by perform_action.
+            dt (float): The simulated time to advance, in seconds.
+
+        Returns:
+            dict: The new frame.
+        """
+        throttle, brake, steer = self.controls(action)
+        remaining = dt
+        while remaining > 1e-9:
+            step = min(self.physics_dt, remaining)
+            off_track = abs(self.offset) > self.track.half_width
+            self.car.step(throttle, brake, steer, step, off_track)
+            self.index, distance, self.offset = self.track.locate(self.car.x, self.car.z, self.index)
+            self.time += step
+            remaining -= step
+
+            # Crossing the line from the end of the lap back to the start begins a new lap
+            if distance < self.previous_distance - self.track.length / 2:
+                self.last_lap = self.time - self.lap_start
+                self.lap_start = self.time
+                self.lap += 1
+                self.lap_invalid = 0
+            self.previous_distance = distance
+            if abs(self.offset) > self.track.half_width + 1.0:
+                self.lap_invalid = 1
+
+        self._update_frame(throttle, brake, steer)
+        return self.frame
+
+    def _edge_distances(self):
+        """
+        Distances from the look-ahead point to the left and right track edges, in metres.
+        """
+        car = self.car
+        ahead_x = car.x + np.sin(car.yaw) * self.look_ahead
+        ahead_z = car.z + np.cos(car.yaw) * self.look_ahead
+        hint = (self.index + int(self.look_ahead / self.track.spacing)) % len(self.track.x)
+        _, _, offset = self.track.locate(ahead_x, ahead_z, hint)
+        return self.track.half_width + offset, self.track.half_width - offset
+
+    def _update_frame(self, throttle, brake, steer):
+        """
+        Writes the car state into the frame.
+        """
+        car, frame = self.car, self.frame
+        forward_x, forward_z = np.sin(car.yaw), np.cos(car.yaw)
+        off_track = abs(self.offset) > self.track.half_width
+
+        frame['last_lap_time_ms'] = self.last_lap * 1000
+        frame['current_lap_time_ms'] = (self.time - self.lap_start) * 1000
+        frame['lap_distance'] = self.previous_distance
+        frame['current_lap_invalid'] = self.lap_invalid
+
+        frame['world_position_x'] = car.x
+        frame['world_position_z'] = car.z
+        frame['world_velocity_x'] = forward_x * car.speed
+        frame['world_velocity_z'] = forward_z * car.speed
+        frame['world_forward_dir_x'] = round(forward_x * 32767)
+        frame['world_forward_dir_z'] = round(forward_z * 32767)
+        frame['world_right_dir_x'] = round(-forward_z * 32767)
+        frame['world_right_dir_z'] = round(forward_x * 32767)
+        frame['g_force_lateral'] = car.speed * car.yaw_rate / 9.81
+        frame['g_force_longitudinal'] = car.acceleration / 9.81
+        frame['g_force_vertical'] = 1.0
+        frame['yaw'] = car.yaw
+
+        speed_kph = car.speed * 3.6
+        frame['speed'] = round(speed_kph)
+        frame['throttle'] = throttle
+        frame['brake'] = brake
+        frame['steer'] = steer
+        frame['surface_type'] = 4 * 7 if off_track else 0  # Grass under all four wheels
+        frame['gear'] = min(int(speed_kph // 40) + 1, 8)
+
+        left, right = self._edge_distances()
+        frame['left'] = int(left <= self.far_sensor)
+        frame['midleft'] = int(left <= self.near_sensor)
+        frame['right'] = int(right <= self.far_sensor)
+        frame['midright'] = int(right <= self.near_sensor)
+        frame['session_time'] = self.time
+
+
+def run_episode(genome, config, simulator, model_functions, budget, rate=10.0, features=None):
+    """
+    Drives one genome in the simulator the way eval_genomes drives it in the game.
+
+    Args:
+        genome (neat.DefaultGenome): The genome.
+        config (neat.Config): The NEAT configuration object.
+        simulator (TrackSimulator): The simulator, reset at the start of the episode.
+        model_functions (ModelFunctions): Provides action_head and calculate_reward.
+        budget (float): The simulated time budget in seconds.
+        rate (float): The control rate in Hz.
+        features (FeatureBuilder, optional): Builds the network inputs. Defaults to the standard schema.
+
+    Returns:
+        dict: The mean reward, the simulated elapsed time, the number of control ticks and the budget.
+    """
+    features = features or FeatureBuilder(num_inputs=config.genome_config.num_inputs)
+    network = MatrixRecurrentNetwork.create(genome, config)
+    rewards = RewardAccumulator()
+    frame = simulator.reset()
+
+    while simulator.time < budget and rewards.mean >= -2:
+        output = network.activate(features.build(frame))
+        frame = simulator.step(model_functions.action_head(output[0]), 1.0 / rate)
+        rewards.add(model_functions.calculate_reward(frame))
+    return {'mean_reward': rewards.mean, 'elapsed': simulator.time, 'ticks': rewards.count, 'budget': budget}
+
+
+# Per-process state of the pool workers, set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(track_path, config):
+    """
+    Loads the track and builds a simulator once per pool worker.
+    """
+    model_functions = ModelFunctions(None)
+    VECTOR_ACTIVATIONS['sig_soft_act'] = model_functions.leaky_relu_batch
+    _worker.update(simulator=TrackSimulator(Track.load(track_path)), config=config, model_functions=model_functions,
+                   features=FeatureBuilder(num_inputs=config.genome_config.num_inputs))
+
+
+def _run_episode(task):
+    """
+    Runs one genome's episode in a pool worker.
+    """
+    genome_id, genome, budget = task
+    return genome_id, run_episode(genome, _worker['config'], _worker['simulator'], _worker['model_functions'],
+                                  budget, features=_worker['features'])
+
+
+class SimulatorEvaluator:
+    """
+    Runs genome episodes in track simulators across a process pool, one simulator per worker.
+
+    Attributes:
+        track_path (str): The Track file every worker loads.
+        config (neat.Config): The NEAT configuration object.
+        num_workers (int): The number of worker processes.
+        generation (int): The number of generations eval_genomes has scored, which sets the episode length.
+    """
+
+    def __init__(self, track_path, config, num_workers=None):
+        """
+        Initializes the SimulatorEvaluator. The pool is started on first use.
+
+        Args:
+            track_path (str): The Track file.
+            config (neat.Config): The NEAT configuration object.
+            num_workers (int, optional): The number of worker processes. Defaults to the number of cores.
+        """
+        self.track_path = track_path
+        self.config = config
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.pool = None
+        self.generation = 0
+
+    def evaluate_many(self, genomes, budget):
+        """
+        Runs an episode for each genome in parallel.
+
+        Args:
+            genomes (list of tuple): The genome ID and genome pairs.
+            budget (float): The simulated time budget in seconds.
+
+        Returns:
+            dict: The result of each genome, as from run_episode, by genome ID.
+        """
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.num_workers, _init_worker, (self.track_path, self.config))
+        tasks = [(genome_id, genome, budget) for genome_id, genome in genomes]
+        return dict(self.pool.imap_unordered(_run_episode, tasks))
+
+    def eval_genomes(self, genomes, config):
+        """
+        Sets every genome's fitness from simulated runs, for use as a neat.Population.run fitness function.
+
+        Every genome is driven on a short run and the best are promoted to longer runs, with the run time growing
+        over the generations as in live training.
+
+        Args:
+            genomes (list of tuple): The genome ID and genome pairs.
+            config (neat.Config): The NEAT configuration object.
+        """
+        run_time = 15 + (self.generation * 5) if self.generation < 20 else 120  # Set runtime based on generation
+        SuccessiveHalving(min_budget=15, max_budget=run_time, eta=3).evaluate(genomes,
+                                                                              evaluate_many=self.evaluate_many)
+        self.generation += 1
+
+    def close(self):
+        """
+        Shuts down the worker pool.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+def main():
+    """
+    Builds a track from recorded telemetry, benchmarks the simulator with random genomes, or trains NEAT against it.
+    """
+    parser = argparse.ArgumentParser(description="Build a simulator track, benchmark the track simulator or train "
+                                                 "against it.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Build a track from one recorded lap.")
+    build_parser.add_argument('output', help="The .npz file to write.")
+    build_parser.add_argument('--archive', required=True, help="A TelemetryArchive directory.")
+    build_parser.add_argument('--session', type=int, required=True, help="The session_uid of the lap.")
+    build_parser.add_argument('--lap', type=int, required=True, help="The lap number.")
+    build_parser.add_argument('--half-width', type=float, default=7.0, help="Half the track width in metres.")
+
+    benchmark_parser = subparsers.add_parser('benchmark', help="Time episodes of a random population.")
+    benchmark_parser.add_argument('track', help="A track built with the build command.")
+    benchmark_parser.add_argument('--budget', type=float, default=120.0, help="Simulated seconds per episode.")
+    benchmark_parser.add_argument('--workers', type=int, default=None)
+
+    train_parser = subparsers.add_parser('train', help="Run NEAT against the simulator, without the game.")
+    train_parser.add_argument('track', help="A track built with the build command.")
+    train_parser.add_argument('--generations', type=int, default=100, help="The number of generations to run.")
+    train_parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        track = Track.from_archive(args.archive, args.session, args.lap, half_width=args.half_width)
+        track.save(args.output)
+        print(f"Wrote a {track.length:.0f} m track with {len(track.x)} points to {args.output}")
+        return
+
+    import neat
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet,
+                         neat.DefaultStagnation, 'neat_config.cfg')
+    config.genome_config.add_activation("sig_soft_act", ModelFunctions.leaky_relu)
+    evaluator = SimulatorEvaluator(args.track, config, args.workers)
+    if args.command == 'train':
+        p = neat.Population(config)
+        p.add_reporter(neat.StdOutReporter(True))
+        p.add_reporter(neat.StatisticsReporter())
+        p.add_reporter(neat.Checkpointer(1, filename_prefix="neat_models/"))
+        try:
+            winner = p.run(evaluator.eval_genomes, args.generations)
+        finally:
+            evaluator.close()
+        print(f"Best genome {winner.key} with fitness {winner.fitness:.2f}")
+    else:
+        genomes = list(neat.Population(config).population.items())
+        start = time.perf_counter()
+        results = evaluator.evaluate_many(genomes, args.budget)
+        elapsed = time.perf_counter() - start
+        evaluator.close()
+        simulated = sum(result['elapsed'] for result in results.values())
+        print(f"{len(results)} episodes, {simulated:.0f} simulated seconds in {elapsed:.1f} s "
+              f"({simulated / elapsed:.0f}x real time)")
+
+
+if __name__ == "__main__":
+    main()